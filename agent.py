@@ -1,12 +1,20 @@
 """
 Build and compile the LangGraph workflow using all nodes defined in agent_nodes.py.
-Exports `enhanced_graph`, `InMemoryStore`, `MemorySaver`, and `RunnableConfig` for downstream use.
+Profiles, topics and summaries persist in a SQLite-backed store (see sqlite_store.py).
+Exports `enhanced_graph` (compiled lazily, see `get_enhanced_graph`), its native async twin
+`async_enhanced_graph` (see `get_async_enhanced_graph`), `InMemoryStore`, `MemorySaver`, and `RunnableConfig` for downstream use.
 """
 
+import threading
+from typing import Callable, Dict
+
 from langgraph.graph import StateGraph, START, END
 from langgraph.store.memory import InMemoryStore
 from langgraph.checkpoint.memory import MemorySaver
 
+from sqlite_store import SQLiteStore
+from tracing import traced_node
+
 from langchain_core.runnables import RunnableConfig
 
 from agent_nodes import (
@@ -16,72 +24,149 @@ from agent_nodes import (
     generate_topic_integrated,
     update_topic,
     select_single_topic,
-    fetch_articles_for_topic,
-    evaluate_articles,
+    research_articles,
     analyze_competitor_content,
+    collect_research,
     create_linkedin_content_with_articles,
     optimize_linkedin_content,
+    create_optimized_linkedin_content,
     post_to_linkedin,
     route_message,
     route_after_topic_generation,
     route_after_topic_selection_enhanced,
-    route_after_article_fetching,
-    route_after_article_evaluation,
-    route_after_competitor_analysis,
+    route_content_mode,
     route_after_content_creation,
     route_after_optimization,
     route_after_approval_response,
 )
+from async_nodes import (
+    amaster_node,
+    aupdate_profile,
+    agenerate_topic_integrated,
+    aselect_single_topic,
+    aresearch_articles,
+    aanalyze_competitor_content,
+    acreate_linkedin_content_with_articles,
+    aoptimize_linkedin_content,
+    acreate_optimized_linkedin_content,
+    apost_to_linkedin,
+)
 
 # ─────── Build StateGraph ─────────────────────────────────────────────────────────
-builder = StateGraph(IntegratedContentState)
-
-# ── Add core nodes
-builder.add_node("master_node", master_node)
-builder.add_node("update_profile", update_profile)
-builder.add_node("generate_topic", generate_topic_integrated)
-builder.add_node("update_topic", update_topic)
-
-# ── Add content workflow nodes
-builder.add_node("select_single_topic", select_single_topic)
-builder.add_node("fetch_articles_for_topic", fetch_articles_for_topic)
-builder.add_node("evaluate_articles", evaluate_articles)
-builder.add_node("analyze_competitor_content", analyze_competitor_content)
-builder.add_node("create_linkedin_content_with_articles", create_linkedin_content_with_articles)
-builder.add_node("optimize_linkedin_content", optimize_linkedin_content)
-
-#builder.add_node("post_to_linkedin", post_to_linkedin)
-
-# ─────── Define Edges & Routing ───────────────────────────────────────────────────
-builder.add_edge(START, "master_node")
-builder.add_conditional_edges("master_node", route_message)
-builder.add_edge("update_profile", "master_node")
-
-# Topic generation flow
-builder.add_conditional_edges("generate_topic", route_after_topic_generation)
-builder.add_conditional_edges("select_single_topic", route_after_topic_selection_enhanced)
-builder.add_conditional_edges("fetch_articles_for_topic", route_after_article_fetching)
-builder.add_conditional_edges("evaluate_articles", route_after_article_evaluation)
-builder.add_conditional_edges("analyze_competitor_content", route_after_competitor_analysis)
-builder.add_conditional_edges("create_linkedin_content_with_articles", route_after_content_creation)
-#builder.add_conditional_edges("optimize_linkedin_content", route_after_optimization)
-builder.add_edge("optimize_linkedin_content", END)
-#builder.add_edge("post_to_linkedin", END)
-
-builder.add_edge("update_topic", "master_node")
+# The sync graph and the async graph share this topology; only the node callables differ
+def build_state_graph(nodes: Dict[str, Callable]) -> StateGraph:
+    builder = StateGraph(IntegratedContentState)
+    # Every node is wrapped with traced_node so its wall time, LLM tokens and Exa calls are recorded
+    for name, node in nodes.items():
+        builder.add_node(name, traced_node(name, node))
+
+    # ─────── Define Edges & Routing ───────────────────────────────────────────────
+    builder.add_edge(START, "master_node")
+    builder.add_conditional_edges("master_node", route_message)
+    builder.add_edge("update_profile", "master_node")
+
+    # Topic generation flow
+    builder.add_conditional_edges("generate_topic", route_after_topic_generation)
+    builder.add_conditional_edges("select_single_topic", route_after_topic_selection_enhanced)
+    # Fan-out: the article branch (fetch -> dedupe -> evaluate) and competitor analysis run in
+    # parallel. Each branch is a single node, so neither waits on the other's supersteps, and
+    # research_articles always returns (it handles an empty fetch) so the join below fires.
+    # Fan-in: content creation waits for both branches, then config["configurable"]["content_mode"]
+    # picks draft -> optimize (two LLM calls) or the single-call fast path
+    builder.add_edge(["research_articles", "analyze_competitor_content"], "collect_research")
+    builder.add_conditional_edges("collect_research", route_content_mode)
+    builder.add_conditional_edges("create_linkedin_content_with_articles", route_after_content_creation)
+    builder.add_edge("create_optimized_linkedin_content", END)
+    #builder.add_conditional_edges("optimize_linkedin_content", route_after_optimization)
+    builder.add_edge("optimize_linkedin_content", END)
+    #builder.add_edge("post_to_linkedin", END)
+
+    builder.add_edge("update_topic", "master_node")
+    return builder
+
+SYNC_NODES = {
+    # ── Core nodes
+    "master_node": master_node,
+    "update_profile": update_profile,
+    "generate_topic": generate_topic_integrated,
+    "update_topic": update_topic,
+    # ── Content workflow nodes
+    "select_single_topic": select_single_topic,
+    "research_articles": research_articles,
+    "analyze_competitor_content": analyze_competitor_content,
+    "collect_research": collect_research,
+    "create_linkedin_content_with_articles": create_linkedin_content_with_articles,
+    "optimize_linkedin_content": optimize_linkedin_content,
+    "create_optimized_linkedin_content": create_optimized_linkedin_content,
+    #"post_to_linkedin": post_to_linkedin,
+}
+
+ASYNC_NODES = {
+    "master_node": amaster_node,
+    "update_profile": aupdate_profile,
+    "generate_topic": agenerate_topic_integrated,
+    # No async topic extractor exists; LangGraph runs this sync node in its executor
+    "update_topic": update_topic,
+    "select_single_topic": aselect_single_topic,
+    "research_articles": aresearch_articles,
+    "analyze_competitor_content": aanalyze_competitor_content,
+    "collect_research": collect_research,
+    "create_linkedin_content_with_articles": acreate_linkedin_content_with_articles,
+    "optimize_linkedin_content": aoptimize_linkedin_content,
+    "create_optimized_linkedin_content": acreate_optimized_linkedin_content,
+    #"post_to_linkedin": apost_to_linkedin,
+}
+
+builder = build_state_graph(SYNC_NODES)
+async_builder = build_state_graph(ASYNC_NODES)
 
 # ─────── Compile Graph ────────────────────────────────────────────────────────────
-enhanced_memory = InMemoryStore()
-checkpointer = MemorySaver()
+# Compiled on first use and then shared, so importing this module stays cheap.
+# Both graphs use the same store and checkpointer, so a thread can move between them.
+_graph_lock = threading.Lock()
+_enhanced_graph = None
+_async_enhanced_graph = None
+_store = None
+_checkpointer = None
 
-enhanced_graph = builder.compile(
-    checkpointer=checkpointer,
-    store=enhanced_memory
-)
+def _compile(graph_builder: StateGraph):
+    global _store, _checkpointer
+    if _store is None:
+        _store = SQLiteStore()
+        _checkpointer = MemorySaver()
+    return graph_builder.compile(checkpointer=_checkpointer, store=_store)
+
+def get_enhanced_graph():
+    global _enhanced_graph
+    if _enhanced_graph is None:
+        with _graph_lock:
+            if _enhanced_graph is None:
+                _enhanced_graph = _compile(builder)
+    return _enhanced_graph
+
+def get_async_enhanced_graph():
+    """The graph built from async_nodes.py; run it with `ainvoke`/`astream`."""
+    global _async_enhanced_graph
+    if _async_enhanced_graph is None:
+        with _graph_lock:
+            if _async_enhanced_graph is None:
+                _async_enhanced_graph = _compile(async_builder)
+    return _async_enhanced_graph
+
+def __getattr__(name):
+    # Keeps `from agent import enhanced_graph` working without compiling at import time
+    if name == "enhanced_graph":
+        return get_enhanced_graph()
+    if name == "async_enhanced_graph":
+        return get_async_enhanced_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ─────── Export ───────────────────────────────────────────────────────────────────
 __all__ = [
     "enhanced_graph",
+    "get_enhanced_graph",
+    "async_enhanced_graph",
+    "get_async_enhanced_graph",
     "InMemoryStore",
     "MemorySaver",
     "RunnableConfig"
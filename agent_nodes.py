@@ -2,10 +2,14 @@
 import os
 import uuid
 import json
-import requests
+import hashlib
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from typing import List, Optional, Dict, Any, Literal
+from typing import Callable, List, Optional, Dict, Any, Literal
 
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
@@ -20,19 +24,61 @@ from langgraph.store.base import BaseStore
 from langgraph.store.memory import InMemoryStore
 from langgraph.checkpoint.memory import MemorySaver
 
-from langchain_openai import AzureChatOpenAI
-from exa_py import Exa
-from trustcall import create_extractor
+
+from clients import HTTP_TIMEOUT, build_guarded_http_clients, get_exa_client, get_http_session
+from exa_cache import CachedExa, exa_search_cache, served_from_cache
+from llm_cache import cached_invoke, cached_batch
+from prompt_budget import (
+    PROMPT_TOKEN_BUDGETS,
+    WEB_RESEARCH_BUDGET_SHARE,
+    compact_json,
+    fit_to_budget,
+    rank_documents,
+    format_prompt_usage,
+    prompt_usage,
+)
+from text_utils import estimate_tokens
+from article_dedup import ARTICLE_DEDUP_THRESHOLD, deduplicate_articles
+from exa_planner import (
+    ARTICLE_FETCH_TARGET,
+    COMPETITOR_POST_TARGET,
+    EXA_PAGE_SIZE,
+    ExaResultPlanner,
+    format_plan_report,
+    record_plan,
+)
+from article_prefilter import (
+    PREFILTER_AUDIT_RATE,
+    PREFILTER_BAD_THRESHOLD,
+    PREFILTER_GOOD_THRESHOLD,
+    format_prefilter_stats,
+    prefilter_articles,
+    prefilter_stats,
+)
+from article_prefetch import (
+    SPECULATIVE_PREFETCH_MAX_SEARCHES,
+    SPECULATIVE_PREFETCH_TOPICS,
+    article_prefetcher,
+)
+from research_cache import (
+    RESEARCH_CACHE_FRESH_SECONDS,
+    RESEARCH_CACHE_STALE_SECONDS,
+    format_research_cache_hit,
+    get_research_cache,
+)
+from resilience import CircuitOpenError
+from tracing import llm_trace_handler, record_external_call, traced_node
 
 from prompts import (
     TOPIC_SELECTION_PROMPT,
-    WEB_RESEARCH_PROMPT,
     COMPETITOR_CONTENT_ANALYSIS_PROMPT,
     CONTENT_OPTIMIZATION_PROMPT,
     ARTICLE_EVALUATION_PROMPT,
     ENHANCED_CONTENT_CREATION_PROMPT,
+    FAST_CONTENT_CREATION_PROMPT,
     SUMMARY_INSTRUCTION,
     TOPIC_GENERATION_INSTRUCTION,
+    FUSED_TOPIC_GENERATION_INSTRUCTION,
     TRUSTCALL_INSTRUCTION,
     MODEL_SYSTEM_MESSAGE,
 )
@@ -48,15 +94,71 @@ EXA_KEY = os.getenv("EXA_KEY")
 LINKEDIN_ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN")
 LINKEDIN_PERSON_URN = os.getenv("LINKEDIN_PERSON_URN")
 
+# Number of article evaluations sent to the model concurrently. Can be
+# overridden per run with config["configurable"]["article_eval_batch_size"].
+ARTICLE_EVAL_BATCH_SIZE = int(os.getenv("ARTICLE_EVAL_BATCH_SIZE", "5"))
 
+# Stop evaluating once this many good articles are found (content creation uses
+# three); the rest are recorded as "skipped". 0 evaluates every article. Can be
+# overridden per run with config["configurable"]["article_eval_target_good"].
+ARTICLE_EVAL_TARGET_GOOD = int(os.getenv("ARTICLE_EVAL_TARGET_GOOD", "3"))
 
-# ─────── Instantiate the LLM model ────────────────────────────────────────────────
-model = AzureChatOpenAI(
-    api_version=AZURE_API_VERSION,
-    api_key=AZURE_API_KEY,
-    azure_endpoint=AZURE_ENDPOINT,
-    model="gpt4o",
-)
+# Extra evaluations per wave beyond the good articles still needed, covering those
+# that come back bad. Can be overridden per run with
+# config["configurable"]["article_eval_overprovision"].
+ARTICLE_EVAL_OVERPROVISION = int(os.getenv("ARTICLE_EVAL_OVERPROVISION", "1"))
+
+# "separate" picks the topic with its own TOPIC_SELECTION_PROMPT call; "fused" has the
+# topic-generation call name its best topic, which select_single_topic passes through.
+# Override per run with config["configurable"]["topic_selection_mode"].
+TOPIC_SELECTION_MODE = os.getenv("TOPIC_SELECTION_MODE", "separate")
+
+# "standard" drafts and then optimizes the post in two LLM calls; "fast" writes the
+# optimized post in one. Override per run with config["configurable"]["content_mode"].
+CONTENT_MODE = os.getenv("CONTENT_MODE", "standard")
+
+# Number of Exa searches a node may have in flight at once. Can be overridden
+# per run with config["configurable"]["exa_max_concurrency"].
+EXA_MAX_CONCURRENCY = int(os.getenv("EXA_MAX_CONCURRENCY", "3"))
+
+# Shared deadline (seconds) for the competitor-analysis searches; whatever has
+# arrived by then is used. Override with config["configurable"]["exa_search_deadline"].
+EXA_SEARCH_DEADLINE = float(os.getenv("EXA_SEARCH_DEADLINE", "20"))
+
+
+
+# ─────── Lazily instantiate the LLM model ─────────────────────────────────────────
+# The model and extractors are built on first use so importing this module stays cheap
+_factory_lock = threading.Lock()
+_model = None
+_profile_extractor = None
+
+def get_model():
+    global _model
+    if _model is None:
+        with _factory_lock:
+            if _model is None:
+                from langchain_openai import AzureChatOpenAI
+                # Retries, throttling and circuit breaking happen in the guarded transport
+                http_client, http_async_client = build_guarded_http_clients("azure_openai")
+                _model = AzureChatOpenAI(
+                    api_version=AZURE_API_VERSION,
+                    api_key=AZURE_API_KEY,
+                    azure_endpoint=AZURE_ENDPOINT,
+                    model="gpt4o",
+                    callbacks=[llm_trace_handler],
+                    max_retries=0,
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                )
+    return _model
+
+
+
+# ─────── Helper: Read Run Configuration ───────────────────────────────────────────
+def get_config_value(config: RunnableConfig, key: str, default: Any) -> Any:
+    value = config.get("configurable", {}).get(key)
+    return default if value is None else value
 
 
 
@@ -92,11 +194,19 @@ class Profile(BaseModel):
 
 
 # ─────── Trustcall Extractors ──────────────────────────────────────────────────────
-profile_extractor = create_extractor(
-    model,
-    tools=[Profile],
-    tool_choice="Profile",
-)
+def get_profile_extractor():
+    global _profile_extractor
+    if _profile_extractor is None:
+        model = get_model()
+        with _factory_lock:
+            if _profile_extractor is None:
+                from trustcall import create_extractor
+                _profile_extractor = create_extractor(
+                    model,
+                    tools=[Profile],
+                    tool_choice="Profile",
+                )
+    return _profile_extractor
 
 
 
@@ -104,12 +214,17 @@ profile_extractor = create_extractor(
 from typing import Annotated
 from operator import add
 
+# The article branch (fetch/evaluate) and the competitor branch run in parallel.
+# `messages` is the only key both write and it merges through add_messages; every
+# other key has a single writer, so no further reducers are needed at the join.
 class IntegratedContentState(MessagesState):
     feedback: Annotated[List[str], add]
     confirmed: bool = False
     temporary_topics: List[List[str]] = []
     final_topics: List[str] = []
     selected_topic: str = ""
+    # Topic picked by the topic-generation call in fused mode; empty otherwise
+    best_topic: str = ""
     competitor_insights: Dict[str, Any] = {}
     sentiment_data: Dict[str, Any] = {}
     content_draft: str = ""
@@ -117,36 +232,54 @@ class IntegratedContentState(MessagesState):
     posted_content_id: str = ""
     evaluated_articles: List[Dict[str, Any]] = []
     fetched_articles: List[Any] = []
+    unique_articles: List[Any] = []
+    duplicate_articles: List[Dict[str, Any]] = []
+    prefilter_stats: Dict[str, Any] = {}
     good_articles: List[Dict[str, Any]] = []
     web_research_data: str = ""
     approved_for_posting: bool = False
     pending_approval: bool = False
 
 
+# ─────── Helpers: Prompts & Parsing Shared with async_nodes.py ─────────────────────
+def get_user_profile(store: BaseStore, user_id: str) -> Dict[str, Any]:
+    profile_memories = store.search(("profile", user_id))
+    return profile_memories[0].value if profile_memories else {}
+
+def build_topic_selection_prompt(topics: List[Any], user_profile: Dict[str, Any]) -> str:
+    topics_list = topics[0] if isinstance(topics[0], list) else [topics[0]]
+    return TOPIC_SELECTION_PROMPT.format(
+        topics=topics_list,
+        user_profile=user_profile
+    )
+
+def pass_through_best_topic(best_topic: str) -> Dict[str, Any]:
+    return {
+        "selected_topic": best_topic,
+        "messages": [f"Selected topic for content creation: {best_topic} (chosen during topic generation)"]
+    }
+
 # ─────── Node: Select Single Topic ─────────────────────────────────────────────────
 def select_single_topic(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
     """Select one topic from generated topics for content creation"""
     user_id = config["configurable"]["user_id"]
 
     # Get user profile
-    namespace = ("profile", user_id)
-    profile_memories = store.search(namespace)
-    user_profile = profile_memories[0].value if profile_memories else {}
+    user_profile = get_user_profile(store, user_id)
 
     # Get generated topics from temporary_topics
     topics = state.get("final_topics", [])
     if not topics or not topics[0]:
         return {"messages": ["No topics found to select from"], "selected_topic": ""}
 
-    topics_list = topics[0] if isinstance(topics[0], list) else [topics[0]]
+    # Fused mode: topic generation already picked one
+    if state.get("best_topic"):
+        return pass_through_best_topic(state["best_topic"])
 
     # Use LLM to select the best topic
-    selection_prompt = TOPIC_SELECTION_PROMPT.format(
-        topics=topics_list,
-        user_profile=user_profile
-    )
+    selection_prompt = build_topic_selection_prompt(topics, user_profile)
 
-    selected_topic_response = model.invoke([SystemMessage(content=selection_prompt)])
+    selected_topic_response = cached_invoke(get_model(), "topic_selection", [SystemMessage(content=selection_prompt)])
     selected_topic = selected_topic_response.content.strip()
 
     return {
@@ -155,78 +288,269 @@ def select_single_topic(state: IntegratedContentState, config: RunnableConfig, s
     }
 
 
-# ─────── Node: Analyze Competitor Content ──────────────────────────────────────────
-def analyze_competitor_content(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
-    user_id = config["configurable"]["user_id"]
-    topic = state.get("selected_topic", "")
-    if not topic:
-        return {"messages": ["No topic selected for competitor analysis"]}
+# ─────── Helper: Run Exa Searches Concurrently ─────────────────────────────────────
+def run_exa_searches(exa: Any, searches: List[tuple], max_workers: int, deadline: Optional[float] = None, method: str = "search_and_contents") -> List[Dict[str, Any]]:
+    """Run (query, search_kwargs) pairs on a thread pool and report one outcome per search.
 
-    exa = Exa(api_key=EXA_KEY)
-    # Web research
-    try:
-        research_prompt = WEB_RESEARCH_PROMPT.format(topic=topic)
-        research_results = exa.search_and_contents(
-            f"{topic} trending LinkedIn discussions 2025",
+    Outcomes are returned in input order as dicts with `query`, `results`,
+    `seconds` and `status` ("ok", "error", "circuit_open" or "timeout"). A failing or late
+    search yields an empty result list without affecting the others. `method`
+    names the Exa client method to call ("search" for metadata only).
+    """
+    def run(query: str, search_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        started_at, started = time.time(), time.perf_counter()
+        cache_hit = False
+        try:
+            response = getattr(exa, method)(query, **search_kwargs)
+            results, status, cache_hit = response.results, "ok", served_from_cache(response)
+        except CircuitOpenError:
+            results, status = [], "circuit_open"
+        except Exception:
+            results, status = [], "error"
+        seconds = time.perf_counter() - started
+        # Cache hits get their own span status so they don't count as Exa calls
+        record_external_call("exa", query, started_at, seconds, status="cache_hit" if cache_hit else status, results=len(results))
+        return {"query": query, "results": results, "seconds": seconds, "status": status}
+
+    started = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)))
+    # Each search runs in a copy of the caller's context so its trace span lands on the calling node
+    futures = [
+        pool.submit(contextvars.copy_context().run, run, query, search_kwargs)
+        for query, search_kwargs in searches
+    ]
+    wait(futures, timeout=deadline)
+    # Don't block on stragglers past the deadline; their results are dropped
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    outcomes = []
+    for (query, _), future in zip(searches, futures):
+        if future.done() and not future.cancelled():
+            outcomes.append(future.result())
+        else:
+            outcomes.append({"query": query, "results": [], "seconds": time.perf_counter() - started, "status": "timeout"})
+    return outcomes
+
+def run_exa_plan(exa: Any, planner: ExaResultPlanner, label: str, max_workers: int, deadline: Optional[float] = None) -> tuple:
+    """Drive an ExaResultPlanner to completion; returns (consumed results, plan report).
+
+    Each round's metadata searches run concurrently. Contents are fetched once,
+    for the consumed results. `deadline` bounds the whole plan, contents call
+    included: a contents call that would start after it is skipped, and one
+    that runs past it is abandoned, leaving the metadata-only results.
+    """
+    started_at, started = time.time(), time.perf_counter()
+    remaining = lambda: None if deadline is None else deadline - (time.perf_counter() - started)
+    while searches := planner.next_searches():
+        left = remaining()
+        if left is not None and left <= 0:
+            break
+        planner.add_outcomes(run_exa_searches(exa, searches, max_workers, left, method="search"))
+
+    contents = None
+    urls, contents_kwargs = planner.contents_request()
+    if urls:
+        call_started_at, call_started = time.time(), time.perf_counter()
+        timeout = remaining()
+        if timeout is not None and timeout <= 0:
+            status = "skipped"
+        else:
+            pool = ThreadPoolExecutor(max_workers=1)
+            future = pool.submit(contextvars.copy_context().run, exa.get_contents, urls, **contents_kwargs)
+            try:
+                response = future.result(timeout=timeout)
+                contents, status = response.results, "cache_hit" if served_from_cache(response) else "ok"
+            except FuturesTimeoutError:
+                status = "timeout"
+            except Exception:
+                status = "error"
+            # Don't block on a late contents call; its results are dropped
+            pool.shutdown(wait=False, cancel_futures=True)
+        record_external_call(
+            "exa", f"contents for {len(urls)} {label}", call_started_at, time.perf_counter() - call_started,
+            status=status, results=len(contents or []),
+        )
+    consumed = planner.finish(contents)
+    return consumed, record_plan(label, planner, started_at, time.perf_counter() - started)
+
+def prefetch_article_plan(exa: Any, prefetch: Any, max_workers: int) -> ExaResultPlanner:
+    """Run a speculative plan's metadata search rounds (see article_prefetch.py); contents are left to the fetch node."""
+    while searches := prefetch.next_searches():
+        prefetch.planner.add_outcomes(run_exa_searches(exa, searches, max_workers, method="search"))
+    return prefetch.planner
+
+def format_search_timings(outcomes: List[Dict[str, Any]]) -> str:
+    return "Exa search timings: " + "; ".join(
+        f"{o['query']} -> {o['status']} in {o['seconds']:.2f}s ({len(o['results'])} results)"
+        for o in outcomes
+    )
+
+# ─────── Helpers: Competitor Research ───────────────────────────────────────────────
+def build_competitor_searches(topic: str) -> List[tuple]:
+    """The web-research search followed by the three competitor searches, as (query, kwargs) pairs.
+
+    A competitor search's num_results is the most the planner may ask that query for.
+    """
+    today = datetime.today().date()
+    prev = today - relativedelta(months=3)
+    research_search = (
+        f"{topic} trending LinkedIn discussions 2025",
+        dict(
             num_results=10,
             start_published_date="2024-11-01T00:00:00.000Z",
             include_domains=["linkedin.com"],
             summary=True
         )
-        web_research = " ".join([res.summary for res in research_results.results if res.summary])
-    except Exception:
-        web_research = f"Current discussions around {topic}"
-
+    )
     competitor_queries = [
         f'"{topic}" LinkedIn viral posts high engagement 2024 2025',
         f'"{topic}" thought leadership LinkedIn content',
         f'"{topic}" professional discussion LinkedIn'
     ]
-    competitor_content = []
-    today = datetime.today().date()
-    prev = today - relativedelta(months=3)
-
-    for query in competitor_queries:
-        try:
-            resp = exa.search_and_contents(
-                query,
-                num_results=25,
-                use_autoprompt=True,
-                start_published_date=prev.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                end_published_date=today.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                include_domains=["linkedin.com"],
-                summary=True
-            ).results
-            competitor_content.extend(resp)
-        except Exception:
-            continue
-
-    competitor_text = "\n\n".join([
-        f"Title: {c.title}\nSummary: {c.summary}"
-        for c in competitor_content[:20]
-    ])
-
-    analysis_prompt = COMPETITOR_CONTENT_ANALYSIS_PROMPT.format(
-        topic=topic,
-        competitor_content=competitor_text,
-        web_research_data=web_research
+    competitor_kwargs = dict(
+        num_results=25,
+        start_published_date=prev.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        end_published_date=today.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        include_domains=["linkedin.com"],
+        summary=True
     )
-    analysis_response = model.invoke([SystemMessage(content=analysis_prompt)])
+    return [research_search] + [(q, competitor_kwargs) for q in competitor_queries]
+
+def web_research_from(topic: str, research_outcome: Dict[str, Any]) -> str:
+    if research_outcome["status"] == "ok":
+        return " ".join([res.summary for res in research_outcome["results"] if res.summary])
+    return f"Current discussions around {topic}"
+
+def build_competitor_analysis_prompt(topic: str, competitor_content: List[Any], web_research: str) -> tuple:
+    """Format COMPETITOR_CONTENT_ANALYSIS_PROMPT within its token budget; returns (prompt, usage)."""
+    posts = competitor_content[:20]
+
+    def render(summaries: List[str], research: str) -> str:
+        # A post whose summary was compacted away entirely keeps just its title
+        competitor_text = "\n\n".join([
+            f"Title: {c.title}\nSummary: {summary}" if summary else f"Title: {c.title}"
+            for c, summary in zip(posts, summaries)
+        ])
+        return COMPETITOR_CONTENT_ANALYSIS_PROMPT.format(
+            topic=topic,
+            competitor_content=competitor_text,
+            web_research_data=research
+        )
+
+    summaries = [c.summary or "" for c in posts]
+    prompt = render(summaries, web_research)
+    original_tokens = estimate_tokens(prompt)
+    budget = PROMPT_TOKEN_BUDGETS["competitor_analysis"]
+    if original_tokens > budget:
+        # Titles and the template are kept verbatim; summaries and web research share what is left.
+        # Both are ranked once; each render only cuts the rankings to a budget.
+        ranked_summaries = rank_documents(summaries, focus=topic)
+        ranked_research = rank_documents([web_research], focus=topic)
+
+        def render_compacted(available: int) -> str:
+            research_share = min(ranked_research.tokens, int(available * WEB_RESEARCH_BUDGET_SHARE))
+            compacted = ranked_summaries.take(available - research_share)
+            research = ranked_research.take(available - sum(estimate_tokens(s) for s in compacted))[0]
+            return render(compacted, research)
+
+        # One-token placeholders count the "Summary:" labels along with the rest of the template
+        overhead = estimate_tokens(render(["x"] * len(posts), "x")) - len(posts) - 1
+        prompt = fit_to_budget(render_compacted, budget, budget - overhead)
+    return prompt, prompt_usage("competitor_analysis", prompt, original_tokens)
+
+def parse_competitor_insights(content: str) -> Dict[str, Any]:
     try:
-        insights = json.loads(analysis_response.content)
+        return json.loads(content)
     except Exception:
-        insights = {
+        return {
             "high_performing_formats": ["story posts", "insight posts"],
             "viral_hooks": ["surprising statistics", "contrarian views"],
             "engagement_triggers": ["questions", "personal experience"],
             "optimal_tone": "professional yet conversational"
         }
 
+# ─────── Helpers: Shared Research Cache ────────────────────────────────────────────
+def serve_cached_research(topic: str, config: RunnableConfig, compute: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """The competitor-analysis update from the cross-user research cache, or None on a miss.
+
+    A stale entry is served as is while `compute` refreshes it in the background.
+    """
+    research_cache = get_research_cache()
+    if research_cache is None:
+        return None
+    hit = research_cache.get(
+        topic,
+        get_config_value(config, "research_cache_fresh_seconds", RESEARCH_CACHE_FRESH_SECONDS),
+        get_config_value(config, "research_cache_stale_seconds", RESEARCH_CACHE_STALE_SECONDS),
+    )
+    if hit is None:
+        return None
+    value, status, age = hit
+    refreshing = status == "stale" and research_cache.refresh_in_background(topic, compute)
     return {
+        "competitor_insights": value["competitor_insights"],
+        "web_research_data": value["web_research_data"],
+        "messages": [format_research_cache_hit(topic, status, age, refreshing)]
+    }
+
+def store_shared_research(topic: str, value: Optional[Dict[str, Any]]) -> None:
+    research_cache = get_research_cache()
+    if research_cache is not None and value is not None:
+        research_cache.put(topic, value)
+
+def research_cache_value(competitor_content: List[Any], insights: Dict[str, Any], web_research: str) -> Optional[Dict[str, Any]]:
+    # Research with no competitor posts is a degraded result; it is not shared
+    if not competitor_content:
+        return None
+    return {"competitor_insights": insights, "web_research_data": web_research}
+
+# ─────── Node: Analyze Competitor Content ──────────────────────────────────────────
+def analyze_competitor_content(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    topic = state.get("selected_topic", "")
+    if not topic:
+        return {"messages": ["No topic selected for competitor analysis"]}
+
+    # The result depends only on the topic, so it is shared across users
+    cached = serve_cached_research(topic, config, lambda: research_competitor_content(topic, config)[1])
+    if cached is not None:
+        return cached
+    update, value = research_competitor_content(topic, config)
+    store_shared_research(topic, value)
+    return update
+
+def research_competitor_content(topic: str, config: RunnableConfig) -> tuple:
+    """Run the competitor searches and analysis; returns (node update, shareable cache value or None)."""
+    exa = CachedExa(get_exa_client(), exa_search_cache)
+    deadline = get_config_value(config, "exa_search_deadline", EXA_SEARCH_DEADLINE)
+    research_search, *competitor_searches = build_competitor_searches(topic)
+    # Web research runs alongside the competitor plan, which fetches only as many posts as the prompt uses
+    pool = ThreadPoolExecutor(max_workers=1)
+    research_future = pool.submit(contextvars.copy_context().run, run_exa_searches, exa, [research_search], 1, deadline)
+    planner = ExaResultPlanner(
+        competitor_searches,
+        target=get_config_value(config, "competitor_post_target", COMPETITOR_POST_TARGET),
+        page_size=get_config_value(config, "exa_page_size", EXA_PAGE_SIZE),
+    )
+    competitor_content, plan_report = run_exa_plan(exa, planner, "competitor posts", len(competitor_searches), deadline)
+    research_outcome = research_future.result()[0]
+    pool.shutdown(wait=False)
+    web_research = web_research_from(topic, research_outcome)
+
+    analysis_prompt, prompt_tokens = build_competitor_analysis_prompt(topic, competitor_content, web_research)
+    analysis_response = cached_invoke(get_model(), "competitor_analysis", [SystemMessage(content=analysis_prompt)])
+    insights = parse_competitor_insights(analysis_response.content)
+
+    update = {
         "competitor_insights": insights,
         "web_research_data": web_research,
-        "messages": [f"Enhanced analysis completed: {len(competitor_content)} posts analyzed."]
+        "messages": [
+            f"Enhanced analysis completed: {len(competitor_content)} posts analyzed.",
+            format_search_timings([research_outcome] + planner.outcomes),
+            format_plan_report("competitor posts", plan_report),
+            format_prompt_usage(prompt_tokens)
+        ]
     }
+    return update, research_cache_value(competitor_content, insights, web_research)
 
 # ─────── Node: Optimize LinkedIn Content ───────────────────────────────────────────
 def optimize_linkedin_content(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
@@ -235,7 +559,7 @@ def optimize_linkedin_content(state: IntegratedContentState, config: RunnableCon
         return {"messages": ["No content draft found to optimize"]}
 
     optimization_prompt = CONTENT_OPTIMIZATION_PROMPT.format(content=draft)
-    optimized_response = model.invoke([SystemMessage(content=optimization_prompt)])
+    optimized_response = cached_invoke(get_model(), "content_optimization", [SystemMessage(content=optimization_prompt)])
     optimized_content = optimized_response.content.strip()
 
     return {
@@ -243,82 +567,288 @@ def optimize_linkedin_content(state: IntegratedContentState, config: RunnableCon
         "messages": [f"{optimized_content}"]
     }
 
-# ─────── Node: Fetch Articles for Topic ────────────────────────────────────────────
-def fetch_articles_for_topic(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
-    topic = state.get("selected_topic", "")
-    if not topic:
-        return {"messages": ["No topic selected for article fetching"]}
-
-    exa = Exa(api_key=EXA_KEY)
-    fetched = []
+# ─────── Helper: Article Search Queries ────────────────────────────────────────────
+def build_article_searches(topic: str) -> List[tuple]:
     today = datetime.today().date()
     prev = today - relativedelta(months=2)
-
     queries = [
         f'"{topic}" insights analysis trends',
         f'"{topic}" industry news developments',
         f'"{topic}" expert opinions research'
     ]
-    for q in queries:
+    # num_results is the most the planner may ask each query for
+    search_kwargs = dict(
+        num_results=10,
+        start_published_date=prev.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        end_published_date=today.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        summary=True
+    )
+    return [(q, search_kwargs) for q in queries]
+
+def build_article_planner(topic: str, config: RunnableConfig) -> ExaResultPlanner:
+    return ExaResultPlanner(
+        build_article_searches(topic),
+        target=get_config_value(config, "article_fetch_target", ARTICLE_FETCH_TARGET),
+        page_size=get_config_value(config, "exa_page_size", EXA_PAGE_SIZE),
+    )
+
+# ─────── Helpers: Speculative Article Prefetch ─────────────────────────────────────
+def prefetch_candidates(topics: List[str], best_topic: str, config: RunnableConfig) -> List[str]:
+    """The top-k generated topics to prefetch articles for, the fused-mode pick first."""
+    k = int(get_config_value(config, "speculative_prefetch_topics", SPECULATIVE_PREFETCH_TOPICS))
+    if k <= 0 or not config["configurable"].get("thread_id"):
+        return []
+    return list(dict.fromkeys([best_topic] + topics if best_topic else topics))[:k]
+
+def start_article_prefetch(update: Dict[str, Any], config: RunnableConfig, spawn: Callable) -> Dict[str, Any]:
+    """Start speculative article plans for a topic-generation update's candidates; `spawn(prefetch)` runs one."""
+    topics = prefetch_candidates(update["final_topics"], update.get("best_topic", ""), config)
+    if topics:
+        started = article_prefetcher.start(
+            config["configurable"]["thread_id"],
+            topics,
+            lambda topic: build_article_planner(topic, config),
+            get_config_value(config, "speculative_prefetch_max_searches", SPECULATIVE_PREFETCH_MAX_SEARCHES),
+            spawn,
+        )
+        update["messages"].append(f"Prefetching articles speculatively for: {started}")
+    return update
+
+def claim_article_prefetch(topic: str, config: RunnableConfig) -> Optional[Any]:
+    run_key = config["configurable"].get("thread_id")
+    return article_prefetcher.claim(run_key, topic) if run_key else None
+
+def format_prefetch_claim(prefetch: Any) -> str:
+    return f"Speculative prefetch hit: reused {prefetch.searches} searches started during topic selection"
+
+# ─────── Node: Fetch Articles for Topic ────────────────────────────────────────────
+def fetch_articles_for_topic(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    topic = state.get("selected_topic", "")
+    if not topic:
+        return {"messages": ["No topic selected for article fetching"]}
+
+    exa = CachedExa(get_exa_client(), exa_search_cache)
+    max_workers = get_config_value(config, "exa_max_concurrency", EXA_MAX_CONCURRENCY)
+    messages = []
+    # Continue the selected topic's speculative plan when there is one; its contents are fetched here
+    prefetch = claim_article_prefetch(topic, config)
+    planner = None
+    if prefetch is not None:
         try:
-            resp = exa.search_and_contents(
-                q,
-                num_results=5,
-                use_autoprompt=True,
-                start_published_date=prev.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                end_published_date=today.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                summary=True
-            ).results
-            fetched.extend(resp)
+            planner = prefetch.handle.result()
+            messages.append(format_prefetch_claim(prefetch))
         except Exception:
-            continue
+            planner = None
+    planner = planner or build_article_planner(topic, config)
+    fetched, plan_report = run_exa_plan(exa, planner, "articles", max_workers)
 
     return {
         "fetched_articles": fetched,
-        "messages": [f"Fetched {len(fetched)} articles for topic: {topic}"]
+        "messages": [
+            f"Fetched {len(fetched)} articles for topic: {topic}",
+            *messages,
+            format_plan_report("articles", plan_report),
+        ]
     }
 
-# ─────── Node: Evaluate Articles ──────────────────────────────────────────────────
-def evaluate_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
-    articles_list = state.get("fetched_articles", [])
-    if not articles_list:
-        return {"messages": ["No articles to evaluate"]}
+# ─────── Helper: Deduplicate Articles ─────────────────────────────────────────────
+def deduplicate_fetched_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    """Drop repeated and syndicated copies so each story is evaluated once (see article_dedup.py)."""
+    fetched = state.get("fetched_articles", [])
+    threshold = get_config_value(config, "article_dedup_threshold", ARTICLE_DEDUP_THRESHOLD)
+    unique, duplicates = deduplicate_articles(fetched, threshold=float(threshold))
+    return {
+        "unique_articles": unique,
+        "duplicate_articles": duplicates,
+        "messages": [
+            f"Deduplicated {len(fetched)} articles to {len(unique)} unique; "
+            f"{len(duplicates)} evaluation calls saved."
+        ]
+    }
+
+# ─────── Helpers: Article Evaluation ───────────────────────────────────────────────
+def build_article_eval_inputs(articles_list: List[Any]) -> List[List[SystemMessage]]:
+    return [
+        [SystemMessage(content=ARTICLE_EVALUATION_PROMPT.format(
+            article=f"Title: {art.title}\nSummary: {art.summary}\nURL: {art.url}"
+        ))]
+        for art in articles_list
+    ]
 
+def evaluation_verdict(content: Any) -> Optional[str]:
+    """"good" or "bad" from an ARTICLE_EVALUATION_PROMPT response, or None when it has no verdict."""
+    try:
+        verdict = json.loads(content).get("evaluation")
+    except Exception:
+        return None
+    verdict = verdict.lower() if isinstance(verdict, str) else None
+    return verdict if verdict in ("good", "bad") else None
+
+def has_evaluation_verdict(content: Any) -> bool:
+    # Responses without a verdict are not cached, so a rerun asks the model again
+    return evaluation_verdict(content) is not None
+
+def parse_evaluation_verdict(eval_resp) -> str:
+    if isinstance(eval_resp, Exception):
+        return "bad"
+    return evaluation_verdict(eval_resp.content) or "bad"
+
+def plan_article_evaluations(articles_list: List[Any], topic: str, config: RunnableConfig) -> tuple:
+    """Score articles locally; returns (decisions, indexes the LLM must evaluate, most promising first).
+
+    Priority is the pre-filter score, then recency, then query rank (fetch order).
+    """
+    decisions = prefilter_articles(
+        articles_list,
+        topic,
+        bad_threshold=float(get_config_value(config, "prefilter_bad_threshold", PREFILTER_BAD_THRESHOLD)),
+        good_threshold=float(get_config_value(config, "prefilter_good_threshold", PREFILTER_GOOD_THRESHOLD)),
+        audit_rate=float(get_config_value(config, "prefilter_audit_rate", PREFILTER_AUDIT_RATE)),
+    )
+    queue = [i for i, d in enumerate(decisions) if d.verdict is None or d.audit]
+    # Stable sorts: the last one is the primary key
+    queue.sort(key=lambda i: getattr(articles_list[i], "published_date", None) or "", reverse=True)
+    queue.sort(key=lambda i: decisions[i].score, reverse=True)
+    return decisions, queue
+
+def count_good_articles(decisions: List[Any], eval_responses: Dict[int, Any]) -> int:
+    found = sum(1 for i, d in enumerate(decisions) if d.verdict == "good" and i not in eval_responses and not d.audit)
+    found += sum(1 for r in eval_responses.values() if not isinstance(r, Exception) and parse_evaluation_verdict(r) == "good")
+    return found
+
+def enough_good_articles(decisions: List[Any], eval_responses: Dict[int, Any], target_good: int) -> bool:
+    if target_good <= 0:
+        return False
+    return count_good_articles(decisions, eval_responses) >= target_good
+
+def next_wave_size(decisions: List[Any], eval_responses: Dict[int, Any], target_good: int, batch_size: int, queued: int, config: RunnableConfig) -> int:
+    """Articles to evaluate in the next wave: the good ones still needed plus a small margin, at most one batch.
+
+    Without a target everything queued goes in one wave.
+    """
+    if target_good <= 0:
+        return queued
+    overprovision = max(0, int(get_config_value(config, "article_eval_overprovision", ARTICLE_EVAL_OVERPROVISION)))
+    still_needed = target_good - count_good_articles(decisions, eval_responses)
+    return max(1, min(batch_size, still_needed + overprovision))
+
+def collect_evaluations(articles_list: List[Any], decisions: List[Any], eval_responses: Dict[int, Any]) -> tuple:
+    """Merge local and LLM verdicts; returns (evaluated, good, prefilter stats).
+
+    `eval_responses` maps article index to its LLM response. The LLM verdict
+    wins whenever there is one, including for audited articles the pre-filter
+    had already decided; uncertain articles left unevaluated by an early stop
+    are "skipped".
+    """
+    llm_verdicts = {
+        i: parse_evaluation_verdict(resp)
+        for i, resp in eval_responses.items()
+        if not isinstance(resp, Exception)
+    }
     evaluated = []
     good = []
-    for art in articles_list:
-        article_snippet = f"Title: {art.title}\nSummary: {art.summary}\nURL: {art.url}"
-        eval_prompt = ARTICLE_EVALUATION_PROMPT.format(article=article_snippet)
-        eval_resp = model.invoke([SystemMessage(content=eval_prompt)])
-        try:
-            parsed = json.loads(eval_resp.content)
-            verdict = parsed.get("evaluation", "bad").lower()
-        except Exception:
-            verdict = "bad"
-
+    for i, (art, decision) in enumerate(zip(articles_list, decisions)):
+        if i in eval_responses:
+            verdict, decided_by = llm_verdicts.get(i, "bad"), "llm"
+        elif decision.verdict is not None:
+            verdict, decided_by = decision.verdict, "prefilter"
+        else:
+            verdict, decided_by = "skipped", None
         entry = {
             "title": art.title,
             "summary": art.summary,
             "url": art.url,
-            "evaluation": verdict
+            "evaluation": verdict,
+            "decided_by": decided_by,
+            "prefilter_score": decision.score,
         }
         evaluated.append(entry)
         if verdict == "good":
             good.append(entry)
+    return evaluated, good, prefilter_stats.record(decisions, llm_verdicts)
+
+def format_evaluation_summary(evaluated: List[Dict[str, Any]], good: List[Dict[str, Any]], target_good: int) -> str:
+    skipped = sum(1 for e in evaluated if e["evaluation"] == "skipped")
+    line = f"Evaluated {len(evaluated) - skipped} articles. Found {len(good)} good articles."
+    if skipped:
+        line += f" Stopped after reaching {target_good} good; {skipped} skipped."
+    return line
+
+# ─────── Node: Evaluate Articles ──────────────────────────────────────────────────
+def evaluate_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    # Dedup runs here rather than as a node of its own, which would add a superstep to the article branch
+    dedup = deduplicate_fetched_articles(state, config, store)
+    articles_list = dedup["unique_articles"]
+    if not articles_list:
+        return {**dedup, "messages": dedup["messages"] + ["No articles to evaluate"]}
+
+    decisions, queue = plan_article_evaluations(articles_list, state.get("selected_topic", ""), config)
+    batch_size = max(1, int(get_config_value(config, "article_eval_batch_size", ARTICLE_EVAL_BATCH_SIZE)))
+    target_good = int(get_config_value(config, "article_eval_target_good", ARTICLE_EVAL_TARGET_GOOD))
+    # With a target, evaluate in priority order, each wave sized to the good articles
+    # still needed, and stop once enough are in; otherwise everything goes in one batch
+    eval_responses: Dict[int, Any] = {}
+    while queue and not enough_good_articles(decisions, eval_responses, target_good):
+        wave_size = next_wave_size(decisions, eval_responses, target_good, batch_size, len(queue), config)
+        wave, queue = queue[:wave_size], queue[wave_size:]
+        # Fan out with bounded concurrency; a failed call only costs that article its verdict
+        responses = cached_batch(
+            get_model(),
+            "article_evaluation",
+            build_article_eval_inputs([articles_list[i] for i in wave]),
+            config={"max_concurrency": batch_size},
+            return_exceptions=True,
+            cacheable=has_evaluation_verdict,
+        )
+        eval_responses.update(zip(wave, responses))
+    evaluated, good, stats = collect_evaluations(articles_list, decisions, eval_responses)
 
     return {
+        **dedup,
         "evaluated_articles": evaluated,
         "good_articles": good,
-        "messages": [f"Evaluated {len(evaluated)} articles. Found {len(good)} good articles."]
+        "prefilter_stats": stats,
+        "messages": dedup["messages"] + [
+            format_evaluation_summary(evaluated, good, target_good),
+            format_prefilter_stats(stats),
+        ]
     }
 
-# ─────── Node: Create LinkedIn Content with Articles ──────────────────────────────
-def create_linkedin_content_with_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
-    user_id = config["configurable"]["user_id"]
-    namespace = ("profile", user_id)
-    profile_memories = store.search(namespace)
-    user_profile = profile_memories[0].value if profile_memories else {}
+# ─────── Node: Research Articles (fetch -> evaluate) ───────────────────────────────
+def merge_branch_update(state: Dict[str, Any], combined: Dict[str, Any], update: Optional[Dict[str, Any]]) -> None:
+    """Fold one branch step's update into the branch's running state and combined update; messages accumulate."""
+    for key, value in (update or {}).items():
+        if key == "messages":
+            combined["messages"] = combined.get("messages", []) + list(value)
+        else:
+            state[key] = combined[key] = value
 
+# Each step keeps its own trace span inside the branch node's
+ARTICLE_BRANCH_STEPS = (
+    traced_node("fetch_articles_for_topic", fetch_articles_for_topic),
+    traced_node("evaluate_articles", evaluate_articles),
+)
+
+def research_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    """The whole article branch as one node.
+
+    LangGraph advances in supersteps, so with fetch and evaluate as separate
+    nodes each step waited for analyze_competitor_content to finish. As one
+    node the branch runs straight through and only joins at collect_research.
+    """
+    state, combined = dict(state), {}
+    for step in ARTICLE_BRANCH_STEPS:
+        merge_branch_update(state, combined, step(state, config, store))
+    return combined
+
+# ─────── Helper: Content Creation Prompt ───────────────────────────────────────────
+def build_content_creation_prompt(
+    state: IntegratedContentState,
+    user_profile: Dict[str, Any],
+    template: str = ENHANCED_CONTENT_CREATION_PROMPT,
+    prompt_type: str = "content_creation",
+) -> tuple:
+    """Format a content-creation template within its token budget; returns (prompt, usage)."""
     topic = state.get("selected_topic", "")
     competitor_insights = state.get("competitor_insights", {})
     good_articles = state.get("good_articles", [])
@@ -330,19 +860,66 @@ def create_linkedin_content_with_articles(state: IntegratedContentState, config:
     else:
         article_insights = "No high-quality articles found. Focus on original insights and competitor analysis."
 
-    content_prompt = ENHANCED_CONTENT_CREATION_PROMPT.format(
-        topic=topic,
-        user_profile=json.dumps(user_profile),
-        competitor_insights=json.dumps(competitor_insights),
-        article_insights=article_insights
-    )
-    content_response = model.invoke([SystemMessage(content=content_prompt)])
+    def render(profile_json: str, insights_json: str) -> str:
+        return template.format(
+            topic=topic,
+            user_profile=profile_json,
+            competitor_insights=insights_json,
+            article_insights=article_insights
+        )
+
+    prompt = render(json.dumps(user_profile), json.dumps(competitor_insights))
+    original_tokens = estimate_tokens(prompt)
+    budget = PROMPT_TOKEN_BUDGETS[prompt_type]
+    if original_tokens > budget:
+        def render_compacted(available: int) -> str:
+            profile_json = compact_json(user_profile, available // 2, focus=topic)
+            insights_json = compact_json(competitor_insights, available - estimate_tokens(profile_json), focus=topic)
+            return render(profile_json, insights_json)
+
+        prompt = fit_to_budget(render_compacted, budget, budget - estimate_tokens(render("{}", "{}")))
+    return prompt, prompt_usage(prompt_type, prompt, original_tokens)
+
+# ─────── Node: Create LinkedIn Content with Articles ──────────────────────────────
+def create_linkedin_content_with_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    user_id = config["configurable"]["user_id"]
+    user_profile = get_user_profile(store, user_id)
+    good_articles = state.get("good_articles", [])
+
+    content_prompt, prompt_tokens = build_content_creation_prompt(state, user_profile)
+    content_response = cached_invoke(get_model(), "content_creation", [SystemMessage(content=content_prompt)])
     draft = content_response.content.strip()
 
     return {
         "content_draft": draft,
-        "messages": [f"Created LinkedIn content incorporating {len(good_articles)} quality articles"]
+        "messages": [
+            f"Created LinkedIn content incorporating {len(good_articles)} quality articles",
+            format_prompt_usage(prompt_tokens)
+        ]
+    }
+# ─────── Node: Create Optimized LinkedIn Content (fast mode) ───────────────────────
+def create_optimized_linkedin_content(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    """Write the final post in one call; it fills both content_draft and optimized_content."""
+    user_id = config["configurable"]["user_id"]
+    user_profile = get_user_profile(store, user_id)
+    good_articles = state.get("good_articles", [])
+
+    content_prompt, prompt_tokens = build_content_creation_prompt(
+        state, user_profile, FAST_CONTENT_CREATION_PROMPT, "content_creation_fast"
+    )
+    content_response = cached_invoke(get_model(), "content_creation_fast", [SystemMessage(content=content_prompt)])
+    optimized_content = content_response.content.strip()
+
+    return {
+        "content_draft": optimized_content,
+        "optimized_content": optimized_content,
+        "messages": [
+            f"Created optimized LinkedIn content in a single call incorporating {len(good_articles)} quality articles",
+            format_prompt_usage(prompt_tokens),
+            f"{optimized_content}"
+        ]
     }
+
 from typing import TypedDict, Literal
 # Update memory tool
 class UpdateMemory(TypedDict):
@@ -360,12 +937,19 @@ def master_node(state: IntegratedContentState, config: RunnableConfig, store: Ba
     topics = topic_mems[0].value if topic_mems else []
 
     system_msg = MODEL_SYSTEM_MESSAGE
-    response = model.bind_tools([UpdateMemory], parallel_tool_calls=False).invoke(
+    response = get_model().bind_tools([UpdateMemory], parallel_tool_calls=False).invoke(
         [SystemMessage(content=system_msg)] + state["messages"]
     )
 
     return {"messages": [response]}
 
+# ─────── Helper: Trustcall Input Messages ─────────────────────────────────────────
+def build_trustcall_messages(state: IntegratedContentState) -> list:
+    TRUSTCALL_FMT = TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat())
+    return list(merge_message_runs(
+        messages=[SystemMessage(content=TRUSTCALL_FMT)] + state["messages"][:-1]
+    ))
+
 # ─────── Node: Update Profile ─────────────────────────────────────────────────────
 def update_profile(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
     user_id = config["configurable"]["user_id"]
@@ -375,12 +959,9 @@ def update_profile(state: IntegratedContentState, config: RunnableConfig, store:
         [(item.key, "Profile", item.value) for item in existing]
         if existing else None
     )
-    TRUSTCALL_FMT = TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat())
-    merged_msgs = list(merge_message_runs(
-        messages=[SystemMessage(content=TRUSTCALL_FMT)] + state["messages"][:-1]
-    ))
+    merged_msgs = build_trustcall_messages(state)
 
-    result = profile_extractor.invoke({
+    result = get_profile_extractor().invoke({
         "messages": merged_msgs,
         "existing": existing_memories
     })
@@ -390,6 +971,9 @@ def update_profile(state: IntegratedContentState, config: RunnableConfig, store:
             meta.get("json_doc_id", str(uuid.uuid4())),
             r.model_dump(mode="json")
         )
+    if result["responses"]:
+        # The memoized summary describes the old profile
+        store.delete(("profile_summary", user_id), PROFILE_SUMMARY_KEY)
 
     tool_calls = state["messages"][-1].tool_calls
     return {"messages": [{"role": "tool", "content": "updated profile", "tool_call_id": tool_calls[0]["id"]}]}
@@ -403,10 +987,7 @@ def update_topic(state: IntegratedContentState, config: RunnableConfig, store: B
         [(item.key, "topic", item.value) for item in existing]
         if existing else None
     )
-    TRUSTCALL_FMT = TRUSTCALL_INSTRUCTION.format(time=datetime.now().isoformat())
-    merged_msgs = list(merge_message_runs(
-        messages=[SystemMessage(content=TRUSTCALL_FMT)] + state["messages"][:-1]
-    ))
+    merged_msgs = build_trustcall_messages(state)
 
     result = topic_extractor.invoke({
         "messages": merged_msgs,
@@ -422,48 +1003,55 @@ def update_topic(state: IntegratedContentState, config: RunnableConfig, store: B
     tool_calls = state["messages"][-1].tool_calls
     return {"messages": [{"role": "tool", "content": "updated topics list", "tool_call_id": tool_calls[0]["id"]}]}
 
-# ─────── Node: Post to LinkedIn ───────────────────────────────────────────────────
-def post_to_linkedin(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
-    optimized_content = state.get("optimized_content", "")
-    
-    try:
-        # LinkedIn API credentials and settings
-        ACCESS_TOKEN = LINKEDIN_ACCESS_TOKEN
-        AUTHOR_URN = 'urn:li:person:4UPDA8Ukrx'
-        
-        url = 'https://api.linkedin.com/v2/ugcPosts'
-
-        post_data = {
-            "author": AUTHOR_URN,
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": optimized_content
-                    },
-                    "shareMediaCategory": "NONE"
-                }
-            },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+# ─────── Helpers: LinkedIn Post Request ──────────────────────────────────────────
+LINKEDIN_UGC_POSTS_URL = 'https://api.linkedin.com/v2/ugcPosts'
+
+def build_linkedin_post_request(optimized_content: str) -> tuple:
+    """Headers and UGC post body for publishing `optimized_content`."""
+    # LinkedIn API credentials and settings
+    ACCESS_TOKEN = LINKEDIN_ACCESS_TOKEN
+    AUTHOR_URN = 'urn:li:person:4UPDA8Ukrx'
+
+    post_data = {
+        "author": AUTHOR_URN,
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {
+                    "text": optimized_content
+                },
+                "shareMediaCategory": "NONE"
             }
+        },
+        "visibility": {
+            "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
         }
+    }
 
-        headers = {
-            'Authorization': f'Bearer {ACCESS_TOKEN}',
-            'Content-Type': 'application/json',
-            'X-Restli-Protocol-Version': '2.0.0'
+    headers = {
+        'Authorization': f'Bearer {ACCESS_TOKEN}',
+        'Content-Type': 'application/json',
+        'X-Restli-Protocol-Version': '2.0.0'
+    }
+    return headers, post_data
+
+def linkedin_post_result(response, optimized_content: str) -> Dict[str, Any]:
+    if response.status_code == 201:
+        return {
+            "posted_content_id": response.headers.get('x-restli-id', 'unknown'),
+            "messages": [f"✅ Successfully posted to LinkedIn!\n\nContent:\n{optimized_content}"]
         }
+    else:
+        return {"messages": [f"❌ Failed to post to LinkedIn. Error: {response.status_code} - {response.text}"]}
 
-        response = requests.post(url, headers=headers, json=post_data)
-        
-        if response.status_code == 201:
-            return {
-                "posted_content_id": response.headers.get('x-restli-id', 'unknown'),
-                "messages": [f"✅ Successfully posted to LinkedIn!\n\nContent:\n{optimized_content}"]
-            }
-        else:
-            return {"messages": [f"❌ Failed to post to LinkedIn. Error: {response.status_code} - {response.text}"]}
+# ─────── Node: Post to LinkedIn ───────────────────────────────────────────────────
+def post_to_linkedin(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    optimized_content = state.get("optimized_content", "")
+    
+    try:
+        headers, post_data = build_linkedin_post_request(optimized_content)
+        response = get_http_session().post(LINKEDIN_UGC_POSTS_URL, headers=headers, json=post_data, timeout=HTTP_TIMEOUT)
+        return linkedin_post_result(response, optimized_content)
 
     except Exception as e:
         return {"messages": [f"❌ Error posting to LinkedIn: {str(e)}"]}
@@ -480,7 +1068,60 @@ def extract_topics(llm_output: str) -> List[str]:
     lines = [line.strip("- ").strip() for line in inner.split("\n") if line.strip().startswith("-")]
     return lines
 
+def extract_best_topic(llm_output: str, topics: List[str]) -> str:
+    """The <best_topic> of a fused topic-generation reply, or "" unless it names one of `topics`."""
+    match = re.search(r"<best_topic>(.*?)</best_topic>", llm_output, re.DOTALL)
+    if not match:
+        return ""
+    best = match.group(1).strip().strip("- ").strip().lower()
+    return next((topic for topic in topics if topic.lower() == best), "")
+
+def build_topic_generation_prompt(summary_paragraph: str, existing_topics: Any, config: RunnableConfig) -> tuple:
+    """The topic-generation prompt and whether it asks for a <best_topic> (fused selection)."""
+    fused = get_config_value(config, "topic_selection_mode", TOPIC_SELECTION_MODE) == "fused"
+    template = FUSED_TOPIC_GENERATION_INSTRUCTION if fused else TOPIC_GENERATION_INSTRUCTION
+    prompt = template.format(
+        summary_paragraph=summary_paragraph,
+        topics=json.dumps(existing_topics),
+        feedback=""
+    )
+    return prompt, fused
+
+def parse_generated_topics(llm_output: str, fused: bool) -> Dict[str, Any]:
+    parsed = extract_topics(llm_output)
+    if not parsed:
+        parsed = [llm_output.strip()]
+    best_topic = extract_best_topic(llm_output, parsed) if fused else ""
+    return {
+        "temporary_topics": [parsed],
+        "final_topics": parsed,
+        "best_topic": best_topic,
+        "messages": [f"Generated topics for content creation: {parsed}"]
+    }
+
+
+
+# ─────── Helper: Memoized Profile Summary ─────────────────────────────────────────
+PROFILE_SUMMARY_KEY = "summary"
+
+def hash_profile(user_profile: Optional[List[Any]]) -> tuple:
+    profile_json = json.dumps(user_profile) if user_profile else "{}"
+    return profile_json, hashlib.sha256(profile_json.encode("utf-8")).hexdigest()
 
+def get_profile_summary(store: BaseStore, user_id: str, user_profile: Optional[List[Any]]) -> str:
+    """Return the SUMMARY_INSTRUCTION paragraph for this profile, reusing the stored one when the profile is unchanged."""
+    profile_json, profile_hash = hash_profile(user_profile)
+
+    namespace = ("profile_summary", user_id)
+    memo = store.get(namespace, PROFILE_SUMMARY_KEY)
+    if memo and memo.value.get("profile_hash") == profile_hash:
+        return memo.value["summary"]
+
+    summary_msg = SUMMARY_INSTRUCTION.format(user_profile=profile_json)
+    summary_response = cached_invoke(get_model(), "summary", [SystemMessage(content=summary_msg)])
+    summary_paragraph = summary_response.content.strip()
+    store.put(namespace, PROFILE_SUMMARY_KEY, {"profile_hash": profile_hash, "summary": summary_paragraph})
+    return summary_paragraph
 
 # ─────── Node: Generate Topics ────────────────────────────────────────────────────
 def generate_topic_integrated(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
@@ -495,28 +1136,19 @@ def generate_topic_integrated(state: IntegratedContentState, config: RunnableCon
     existing_top = store.search(namespace)
     existing_topics = existing_top[0].value if existing_top else []
 
-    # Step 1: Generate profile summary
-    summary_msg = SUMMARY_INSTRUCTION.format(user_profile=json.dumps(user_profile) if user_profile else "{}")
-    summary_response = model.invoke([SystemMessage(content=summary_msg)])
-    summary_paragraph = summary_response.content.strip()
+    # Step 1: Generate profile summary (memoized in the store until the profile changes)
+    summary_paragraph = get_profile_summary(store, user_id, user_profile)
 
-    # Step 2: Generate new topics
-    gen_msg = TOPIC_GENERATION_INSTRUCTION.format(
-        summary_paragraph=summary_paragraph,
-        topics=json.dumps(existing_topics),
-        feedback=""
-    )
-    list_response = model.invoke([SystemMessage(content=gen_msg)])
-    parsed = extract_topics(list_response.content)
-    if not parsed:
-        parsed = [list_response.content.strip()]
+    # Step 2: Generate new topics (and, in fused mode, pick the best one in the same call)
+    gen_msg, fused = build_topic_generation_prompt(summary_paragraph, existing_topics, config)
+    list_response = cached_invoke(get_model(), "topic_generation", [SystemMessage(content=gen_msg)])
+    update = parse_generated_topics(list_response.content, fused)
 
-    
-    return {
-        "temporary_topics": [parsed],
-        "final_topics": parsed,
-        "messages": [f"Generated topics for content creation: {parsed}"]
-    }
+    # Step 3: Optionally start article searches for the likely picks while the topic is selected
+    max_workers = get_config_value(config, "exa_max_concurrency", EXA_MAX_CONCURRENCY)
+    return start_article_prefetch(update, config, lambda prefetch: article_prefetcher.submit(
+        contextvars.copy_context().run, prefetch_article_plan, CachedExa(get_exa_client(), exa_search_cache), prefetch, max_workers
+    ))
 
 # ─────── Routing Functions ─────────────────────────────────────────────────────────
 def route_after_topic_generation(state: IntegratedContentState) -> Literal["select_single_topic", END]:
@@ -524,25 +1156,24 @@ def route_after_topic_generation(state: IntegratedContentState) -> Literal["sele
         return "select_single_topic"
     return END
 
-def route_after_topic_selection_enhanced(state: IntegratedContentState) -> Literal["fetch_articles_for_topic", END]:
+def route_after_topic_selection_enhanced(state: IntegratedContentState) -> List[Literal["research_articles", "analyze_competitor_content"]] | Literal[END]:
+    # Article research and competitor analysis only need the selected topic, so fan out to both
     if state.get("selected_topic"):
-        return "fetch_articles_for_topic"
+        return ["research_articles", "analyze_competitor_content"]
     return END
 
-def route_after_article_fetching(state: IntegratedContentState) -> Literal["evaluate_articles", END]:
-    if state.get("fetched_articles"):
-        return "evaluate_articles"
-    return END
+def route_after_content_creation(state: IntegratedContentState) -> Literal["optimize_linkedin_content"]:
+    return "optimize_linkedin_content"
 
-def route_after_article_evaluation(state: IntegratedContentState) -> Literal["analyze_competitor_content"]:
-    return "analyze_competitor_content"
+def collect_research(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    """Fan-in point of the article and competitor branches; content creation is routed from here."""
+    return {}
 
-def route_after_competitor_analysis(state: IntegratedContentState) -> Literal["create_linkedin_content_with_articles"]:
+def route_content_mode(state: IntegratedContentState, config: RunnableConfig) -> Literal["create_linkedin_content_with_articles", "create_optimized_linkedin_content"]:
+    if get_config_value(config, "content_mode", CONTENT_MODE) == "fast":
+        return "create_optimized_linkedin_content"
     return "create_linkedin_content_with_articles"
 
-def route_after_content_creation(state: IntegratedContentState) -> Literal["optimize_linkedin_content"]:
-    return "optimize_linkedin_content"
-
 def route_after_optimization(state: IntegratedContentState) -> Literal["process_approval_response"]:
     return "process_approval_response"
 
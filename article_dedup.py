@@ -0,0 +1,174 @@
+"""
+Near-duplicate article elimination between fetching and evaluation.
+
+The three article queries overlap, so Exa often returns the same story more
+than once: the identical URL with different tracking parameters, its AMP or
+mobile variant, or a syndicated copy on another site. Each copy would cost an
+evaluation call. An article is treated as a duplicate of an earlier one when
+
+  - their canonical URLs match (scheme, "www."/"m."/"amp." hosts, AMP paths,
+    tracking parameters, fragments and trailing slashes are normalized away), or
+  - their titles match word for word (titles of four or more words), or
+  - the estimated Jaccard similarity of their summary word shingles (the title
+    when there is no summary) is at least the threshold; syndicated copies
+    often retitle a story but keep its text. Similarity is estimated with MinHash signatures, and
+    candidate pairs are found with LSH banding so each article is compared
+    only with likely matches rather than every earlier article.
+
+The first article of each group is kept.
+"""
+
+import os
+import zlib
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from dotenv import load_dotenv
+
+from text_utils import content_words, shingles, words
+
+load_dotenv()
+
+# Minimum estimated shingle similarity for two articles to count as the same story.
+# Override per run with config["configurable"]["article_dedup_threshold"].
+ARTICLE_DEDUP_THRESHOLD = float(os.getenv("ARTICLE_DEDUP_THRESHOLD", "0.7"))
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+_ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+# 31-bit universal hashing keeps every product within a machine word's worth of digits
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def _permutations(count: int) -> List[Tuple[int, int]]:
+    # Fixed seeds so signatures are stable across runs and processes
+    params = []
+    for i in range(count):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=8).digest()
+        params.append((int.from_bytes(digest[:4], "big") % (_MERSENNE_PRIME - 1) + 1, int.from_bytes(digest[4:], "big") % _MERSENNE_PRIME))
+    return params
+
+
+_PERMUTATIONS = _permutations(MINHASH_PERMUTATIONS)
+
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid", "_hsenc", "_hsmi",
+    "ref", "ref_src", "referrer", "cmpid", "sharesource", "smid",
+    "amp", "outputtype", "ito", "mbid", "ncid", "sr_share", "trk", "trkcampaign",
+})
+
+
+# ─────── URL canonicalization ──────────────────────────────────────────────────────
+def canonicalize_url(url: str) -> str:
+    """Reduce a URL to a form shared by its tracking-tagged, www, mobile and AMP variants."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "amp.", "mobile."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    path = parts.path or "/"
+    segments = [s for s in path.split("/") if s]
+    if segments and segments[-1].lower() in ("amp", "amp.html"):
+        segments = segments[:-1]
+    if segments and segments[0].lower() == "amp":
+        segments = segments[1:]
+    if segments and segments[-1].lower().endswith(".amp"):
+        segments[-1] = segments[-1][:-4]
+    if segments and segments[-1].lower().endswith(".amp.html"):
+        segments[-1] = segments[-1][:-9] + ".html"
+    path = "/" + "/".join(segments)
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=False)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, path.rstrip("/") or "/", urlencode(query), ""))
+
+
+# ─────── MinHash signatures ────────────────────────────────────────────────────────
+def minhash_signature(text: str) -> Optional[Tuple[int, ...]]:
+    """MinHash of the text's 3-word shingles; None when there is too little text to compare."""
+    shingle_set = shingles(content_words(text))
+    if not shingle_set:
+        return None
+    hashes = [zlib.crc32(s.encode()) & _MERSENNE_PRIME for s in shingle_set]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [(i, signature[i * _ROWS_PER_BAND:(i + 1) * _ROWS_PER_BAND]) for i in range(LSH_BANDS)]
+
+
+# ─────── Deduplication ─────────────────────────────────────────────────────────────
+def _field(article: Any, name: str) -> str:
+    value = article.get(name) if isinstance(article, dict) else getattr(article, name, None)
+    return value or ""
+
+
+def deduplicate_articles(articles: List[Any], threshold: float = ARTICLE_DEDUP_THRESHOLD) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """Split articles into (unique, duplicates), keeping the first of each group.
+
+    Each duplicate is reported as {"title", "url", "duplicate_of", "reason"},
+    where reason is "url", "title" or "similar".
+    """
+    unique: List[Any] = []
+    duplicates: List[Dict[str, Any]] = []
+    by_url: Dict[str, int] = {}
+    by_title: Dict[str, int] = {}
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    signatures: List[Optional[Tuple[int, ...]]] = []
+
+    for article in articles:
+        title, url = _field(article, "title"), _field(article, "url")
+        canonical = canonicalize_url(url)
+        title_key = " ".join(words(title))
+        signature = minhash_signature(_field(article, "summary") or title)
+
+        match, reason = None, None
+        if canonical and canonical in by_url:
+            match, reason = by_url[canonical], "url"
+        elif len(title_key.split()) >= 4 and title_key in by_title:
+            match, reason = by_title[title_key], "title"
+        elif signature is not None:
+            candidates = {i for band in _bands(signature) for i in buckets.get(band, [])}
+            for i in sorted(candidates):
+                if estimated_similarity(signature, signatures[i]) >= threshold:
+                    match, reason = i, "similar"
+                    break
+
+        if match is not None:
+            kept = unique[match]
+            duplicates.append({"title": title, "url": url, "duplicate_of": _field(kept, "url"), "reason": reason})
+            continue
+
+        index = len(unique)
+        unique.append(article)
+        signatures.append(signature)
+        if canonical:
+            by_url.setdefault(canonical, index)
+        if title_key:
+            by_title.setdefault(title_key, index)
+        if signature is not None:
+            for band in _bands(signature):
+                buckets.setdefault(band, []).append(index)
+    return unique, duplicates
+
+
+__all__ = [
+    "ARTICLE_DEDUP_THRESHOLD",
+    "canonicalize_url",
+    "minhash_signature",
+    "estimated_similarity",
+    "deduplicate_articles",
+]
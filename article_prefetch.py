@@ -0,0 +1,210 @@
+"""
+Speculative article prefetch for candidate topics.
+
+`select_single_topic` spends a full LLM round trip choosing among the
+generated topics while the article searches for every candidate sit idle.
+With speculative prefetch enabled, topic generation starts the article plan
+(see exa_planner.py) for the top-k candidates in the background:
+
+  1. only the metadata search rounds run speculatively; summaries, the
+     expensive part, are requested by `fetch_articles_for_topic` for the
+     winning topic alone,
+  2. every search counts against a per-run cap (SPECULATIVE_PREFETCH_MAX_SEARCHES);
+     a plan that hits the cap stops and the fetch node finishes it,
+  3. the fetch node claims the selected topic's plan, and the other
+     candidates are cancelled after their current round.
+
+`prefetch_stats` accumulates hits, misses and the searches spent on losing
+candidates across runs. The drivers that run the searches live next to
+`run_exa_plan` in agent_nodes.py (`prefetch_article_plan`) and async_nodes.py
+(`aprefetch_article_plan`).
+"""
+
+import os
+import re
+import time
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from exa_planner import ExaResultPlanner
+
+load_dotenv()
+
+# Candidate topics prefetched per run; 0 disables speculative prefetch. Override
+# per run with config["configurable"]["speculative_prefetch_topics"].
+SPECULATIVE_PREFETCH_TOPICS = int(os.getenv("SPECULATIVE_PREFETCH_TOPICS", "0"))
+# Most Exa searches one run may spend speculatively, across all candidates. Override
+# per run with config["configurable"]["speculative_prefetch_max_searches"].
+SPECULATIVE_PREFETCH_MAX_SEARCHES = int(os.getenv("SPECULATIVE_PREFETCH_MAX_SEARCHES", "12"))
+# Threads running sync prefetches, shared by all runs in the process
+SPECULATIVE_PREFETCH_WORKERS = int(os.getenv("SPECULATIVE_PREFETCH_WORKERS", "8"))
+
+# Unclaimed prefetches (e.g. a run that ended before fetching) are dropped after this long
+PREFETCH_MAX_AGE_SECONDS = 600
+
+
+def normalize_topic(topic: str) -> str:
+    """Case, quotes and surrounding punctuation differ between generated and selected topics."""
+    return re.sub(r"\s+", " ", topic.strip().strip("\"'`*.-").strip()).lower()
+
+
+class SpeculativeBudget:
+    """Thread-safe count of the speculative searches one run may still make."""
+
+    def __init__(self, max_searches: int):
+        self._remaining = max(0, int(max_searches))
+        self._lock = threading.Lock()
+
+    def take(self, searches: int) -> bool:
+        with self._lock:
+            if searches > self._remaining:
+                return False
+            self._remaining -= searches
+            return True
+
+
+@dataclass
+class Prefetch:
+    topic: str
+    planner: ExaResultPlanner
+    budget: SpeculativeBudget
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    searches: int = 0
+    # concurrent.futures.Future (sync graph) or asyncio.Task (async graph)
+    handle: Any = None
+
+    def next_searches(self) -> List[tuple]:
+        """The planner's next round, or nothing once cancelled or over the speculative budget."""
+        if self.cancelled.is_set() or not self.budget.take(self.planner.next_round_size):
+            return []
+        searches = self.planner.next_searches()
+        self.searches += len(searches)
+        return searches
+
+
+@dataclass
+class _Run:
+    prefetches: Dict[str, Prefetch]
+    started: float
+
+
+class ArticlePrefetcher:
+    """Per-run registry of speculative article plans, keyed by the graph thread_id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[str, _Run] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, fn: Callable, *args) -> Any:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=SPECULATIVE_PREFETCH_WORKERS, thread_name_prefix="article-prefetch")
+        return self._executor.submit(fn, *args)
+
+    def start(self, run_key: str, topics: List[str], make_planner: Callable[[str], ExaResultPlanner], max_searches: int, spawn: Callable[[Prefetch], Any]) -> List[str]:
+        """Start a prefetch per topic through `spawn` and register them; returns the topics started."""
+        budget = SpeculativeBudget(max_searches)
+        prefetches: Dict[str, Prefetch] = {}
+        for topic in topics:
+            key = normalize_topic(topic)
+            if key and key not in prefetches:
+                prefetches[key] = Prefetch(topic=topic, planner=make_planner(topic), budget=budget)
+        self.discard(run_key)
+        with self._lock:
+            now = time.monotonic()
+            for stale in [k for k, run in self._runs.items() if now - run.started > PREFETCH_MAX_AGE_SECONDS]:
+                self._cancel(self._runs.pop(stale).prefetches.values())
+            self._runs[run_key] = _Run(prefetches, now)
+        for prefetch in prefetches.values():
+            prefetch.handle = spawn(prefetch)
+        return [p.topic for p in prefetches.values()]
+
+    def claim(self, run_key: str, topic: str) -> Optional[Prefetch]:
+        """Take the selected topic's prefetch and cancel the rest; None on a miss or when nothing was prefetched."""
+        with self._lock:
+            run = self._runs.pop(run_key, None)
+        if run is None:
+            return None
+        winner = run.prefetches.get(normalize_topic(topic))
+        losers = [p for p in run.prefetches.values() if p is not winner]
+        self._cancel(losers)
+        # A sync prefetch still queued behind other runs' work is cheaper to redo than to wait for
+        if winner is not None and isinstance(winner.handle, Future) and winner.handle.cancel():
+            losers.append(winner)
+            winner = None
+        prefetch_stats.record(hit=winner is not None, prefetched=len(run.prefetches), searches=sum(p.searches for p in run.prefetches.values()), wasted=sum(p.searches for p in losers))
+        return winner
+
+    def discard(self, run_key: str) -> None:
+        with self._lock:
+            run = self._runs.pop(run_key, None)
+        if run is not None:
+            self._cancel(run.prefetches.values())
+
+    @staticmethod
+    def _cancel(prefetches) -> None:
+        for prefetch in prefetches:
+            # Running prefetches stop after their current round
+            prefetch.cancelled.set()
+
+
+# ─────── Hit-rate statistics ───────────────────────────────────────────────────────
+class PrefetchStats:
+    """Running totals of speculative prefetch hits and the searches spent on losing topics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Counter = Counter()
+
+    def record(self, hit: bool, prefetched: int, searches: int, wasted: int) -> None:
+        with self._lock:
+            self._totals.update({
+                "runs": 1,
+                "hits": int(hit),
+                "misses": int(not hit),
+                "topics_prefetched": prefetched,
+                "searches": searches,
+                "wasted_searches": wasted,
+            })
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = Counter(self._totals)
+        stats: Dict[str, Any] = {
+            key: counts[key]
+            for key in ("runs", "hits", "misses", "topics_prefetched", "searches", "wasted_searches")
+        }
+        stats["hit_rate"] = round(counts["hits"] / counts["runs"], 3) if counts["runs"] else None
+        return stats
+
+
+def format_prefetch_stats(stats: Dict[str, Any]) -> str:
+    if not stats["runs"]:
+        return "Speculative prefetch: no runs"
+    return (
+        f"Speculative prefetch: {stats['hits']}/{stats['runs']} hits; "
+        f"{stats['wasted_searches']}/{stats['searches']} speculative searches spent on other topics"
+    )
+
+
+prefetch_stats = PrefetchStats()
+article_prefetcher = ArticlePrefetcher()
+
+
+__all__ = [
+    "SPECULATIVE_PREFETCH_TOPICS",
+    "SPECULATIVE_PREFETCH_MAX_SEARCHES",
+    "normalize_topic",
+    "Prefetch",
+    "ArticlePrefetcher",
+    "article_prefetcher",
+    "PrefetchStats",
+    "prefetch_stats",
+    "format_prefetch_stats",
+]
@@ -0,0 +1,232 @@
+"""
+Local pre-filter in front of the LLM article evaluation.
+
+Every article gets a 0..1 score from cheap lexical and heuristic features:
+summary length, press-release/announcement phrasing versus analysis phrasing,
+the source domain (newswires vs. analysis outlets) and overlap with the topic
+terms. Articles scoring below the bad threshold are marked "bad" and those at
+or above the good threshold "good" without an LLM call; only the uncertain
+band in between goes to ARTICLE_EVALUATION_PROMPT. The bad comparison is
+strict and no negative category costs more than 0.25 (announcement phrasing
+costs 0.2 however many phrases match), so a single negative signal is never
+enough to drop an article on its own. Weak positives add up, so "good" additionally
+needs one strong signal (STRONG_REASONS): an analysis domain, or analysis
+phrasing with at least STRONG_INSIGHT_TERMS distinct terms.
+
+A small, deterministic sample of the locally decided articles (PREFILTER_AUDIT_RATE)
+is also sent to the LLM so the pre-filter's agreement with the model can be
+tracked; `prefilter_stats` accumulates it across runs.
+"""
+
+import os
+import re
+import zlib
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+from text_utils import content_words, words
+
+load_dotenv()
+
+# Scores below / at or above these are decided locally. Override per run with
+# config["configurable"]["prefilter_bad_threshold"] / ["prefilter_good_threshold"];
+# 0 and 1 send everything to the LLM.
+PREFILTER_BAD_THRESHOLD = float(os.getenv("PREFILTER_BAD_THRESHOLD", "0.25"))
+PREFILTER_GOOD_THRESHOLD = float(os.getenv("PREFILTER_GOOD_THRESHOLD", "0.9"))
+# Distinct INSIGHT_RE terms that make analysis phrasing a strong signal on its own
+STRONG_INSIGHT_TERMS = int(os.getenv("PREFILTER_STRONG_INSIGHT_TERMS", "3"))
+# Share of locally decided articles also sent to the LLM to measure agreement.
+# Override per run with config["configurable"]["prefilter_audit_rate"].
+PREFILTER_AUDIT_RATE = float(os.getenv("PREFILTER_AUDIT_RATE", "0.1"))
+
+LOW_SIGNAL_DOMAINS = frozenset({
+    "prnewswire.com", "businesswire.com", "globenewswire.com", "einpresswire.com", "accesswire.com",
+    "newswire.com", "openpr.com", "prweb.com", "issuewire.com", "newsfilecorp.com", "marketscreener.com",
+})
+HIGH_SIGNAL_DOMAINS = frozenset({
+    "hbr.org", "mckinsey.com", "sloanreview.mit.edu", "technologyreview.com", "a16z.com", "bain.com",
+    "bcg.com", "gartner.com", "forrester.com", "economist.com", "ft.com", "wsj.com", "stratechery.com",
+    "firstround.com", "review.firstround.com", "deloitte.com", "pwc.com",
+})
+
+ANNOUNCEMENT_RE = re.compile(
+    r"\b(today announced|announces|announced|is pleased to|are pleased to|press release|launches|launched|"
+    r"now available|unveils|unveiled|partners with|partnership with|to acquire|acquires|has appointed|"
+    r"appoints|named .{0,40} (ceo|cto|cfo)|funding round|raises \$|series [a-e]\b|award[- ]winning|"
+    r"for more information|about [a-z0-9 .,&-]{2,40}:|forward-looking statements|nasdaq:|nyse:)",
+    re.IGNORECASE,
+)
+INSIGHT_RE = re.compile(
+    r"\b(analysis|lessons|why|how to|research|study|survey|data shows|findings|framework|playbook|"
+    r"trends?|case study|benchmark|insights?|strategy|implications|what we learned|deep dive)\b",
+    re.IGNORECASE,
+)
+# A "good" verdict needs at least one of these besides the score
+STRONG_REASONS = frozenset({"analysis domain", "in-depth analysis phrasing"})
+
+
+@dataclass
+class PrefilterDecision:
+    score: float
+    # "good" or "bad" when decided locally; None means the LLM decides
+    verdict: Optional[str]
+    # Locally decided but also sent to the LLM to measure agreement
+    audit: bool = False
+    reasons: List[str] = field(default_factory=list)
+
+
+def _field(article: Any, name: str) -> str:
+    value = article.get(name) if isinstance(article, dict) else getattr(article, name, None)
+    return value or ""
+
+
+def _domain(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _domain_in(domain: str, domains: frozenset) -> bool:
+    return any(domain == d or domain.endswith("." + d) for d in domains)
+
+
+def score_article(article: Any, topic: str) -> tuple:
+    """Heuristic quality score in [0, 1] and the reasons that moved it from 0.5."""
+    title, summary = _field(article, "title"), _field(article, "summary")
+    text = f"{title} {summary}"
+    score, reasons = 0.5, []
+
+    summary_words = len(words(summary))
+    if summary_words < 25:
+        score -= 0.25
+        reasons.append("short summary")
+    elif summary_words > 80:
+        score += 0.1
+        reasons.append("long summary")
+
+    # Announcement phrases tend to come in clusters, so more of them is no extra evidence
+    if ANNOUNCEMENT_RE.search(text):
+        score -= 0.2
+        reasons.append("announcement phrasing")
+    insights = {m.lower() for m in INSIGHT_RE.findall(text)}
+    if insights:
+        score += min(0.2, 0.1 * len(insights))
+        reasons.append("in-depth analysis phrasing" if len(insights) >= STRONG_INSIGHT_TERMS else "analysis phrasing")
+
+    domain = _domain(_field(article, "url"))
+    if _domain_in(domain, LOW_SIGNAL_DOMAINS):
+        score -= 0.2
+        reasons.append("newswire domain")
+    elif _domain_in(domain, HIGH_SIGNAL_DOMAINS):
+        score += 0.2
+        reasons.append("analysis domain")
+
+    topic_terms = set(content_words(topic))
+    if topic_terms:
+        overlap = len(topic_terms & set(content_words(text))) / len(topic_terms)
+        if overlap == 0:
+            score -= 0.2
+            reasons.append("off-topic")
+        elif overlap >= 0.5:
+            score += 0.15
+            reasons.append("on-topic")
+
+    return min(1.0, max(0.0, score)), reasons
+
+
+def is_audited(article: Any, audit_rate: float) -> bool:
+    # Deterministic per URL so re-runs audit the same articles
+    key = _field(article, "url") or _field(article, "title")
+    return zlib.crc32(key.encode("utf-8")) % 1000 < audit_rate * 1000
+
+
+def prefilter_articles(
+    articles: List[Any],
+    topic: str,
+    bad_threshold: float = PREFILTER_BAD_THRESHOLD,
+    good_threshold: float = PREFILTER_GOOD_THRESHOLD,
+    audit_rate: float = PREFILTER_AUDIT_RATE,
+) -> List[PrefilterDecision]:
+    decisions = []
+    for article in articles:
+        score, reasons = score_article(article, topic)
+        if score < bad_threshold:
+            verdict = "bad"
+        elif score >= good_threshold and STRONG_REASONS.intersection(reasons):
+            verdict = "good"
+        else:
+            verdict = None
+        audit = verdict is not None and is_audited(article, audit_rate)
+        decisions.append(PrefilterDecision(score=round(score, 3), verdict=verdict, audit=audit, reasons=reasons))
+    return decisions
+
+
+# ─────── Agreement statistics ──────────────────────────────────────────────────────
+class PrefilterStats:
+    """Running totals of local decisions and their agreement with audited LLM verdicts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Counter = Counter()
+
+    def record(self, decisions: List[PrefilterDecision], llm_verdicts: Dict[int, str]) -> Dict[str, Any]:
+        """Tally one evaluation run; `llm_verdicts` maps article index to a successful LLM verdict."""
+        run: Counter = Counter()
+        for i, decision in enumerate(decisions):
+            if decision.verdict is None:
+                run["sent_to_llm"] += 1
+                continue
+            run[f"local_{decision.verdict}"] += 1
+            if decision.audit and i in llm_verdicts:
+                run["audited"] += 1
+                run["agreed"] += int(llm_verdicts[i] == decision.verdict)
+                run[f"local_{decision.verdict}_llm_{llm_verdicts[i]}"] += 1
+        with self._lock:
+            self._totals.update(run)
+        return _with_rate(run)
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            return _with_rate(Counter(self._totals))
+
+
+def _with_rate(counts: Counter) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {
+        key: counts[key]
+        for key in ("local_good", "local_bad", "sent_to_llm", "audited", "agreed")
+    }
+    stats.update({k: v for k, v in counts.items() if "_llm_" in k})
+    stats["agreement_rate"] = round(counts["agreed"] / counts["audited"], 3) if counts["audited"] else None
+    return stats
+
+
+def format_prefilter_stats(stats: Dict[str, Any]) -> str:
+    decided = stats["local_good"] + stats["local_bad"]
+    line = (
+        f"Pre-filter decided {decided}/{decided + stats['sent_to_llm']} articles locally "
+        f"({stats['local_good']} good, {stats['local_bad']} bad); {stats['sent_to_llm']} left to the LLM"
+    )
+    if stats["audited"]:
+        line += f"; audit agreement {stats['agreed']}/{stats['audited']}"
+    return line
+
+
+prefilter_stats = PrefilterStats()
+
+
+__all__ = [
+    "PREFILTER_BAD_THRESHOLD",
+    "PREFILTER_GOOD_THRESHOLD",
+    "PREFILTER_AUDIT_RATE",
+    "STRONG_REASONS",
+    "PrefilterDecision",
+    "score_article",
+    "prefilter_articles",
+    "PrefilterStats",
+    "prefilter_stats",
+    "format_prefilter_stats",
+]
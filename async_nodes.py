@@ -0,0 +1,468 @@
+"""
+Native async versions of the graph nodes in agent_nodes.py.
+
+Each node awaits the model (`ainvoke`/`abatch`), the store and Exa instead of
+blocking a worker thread, so a single event loop can drive many concurrent
+pipeline runs. Prompt building and response parsing are shared with the sync
+nodes; only the I/O differs. agent.py compiles these into the async graph
+returned by `get_async_enhanced_graph`, to be driven with `ainvoke`/`astream`.
+"""
+
+import time
+import uuid
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.store.base import BaseStore
+
+from clients import get_async_exa_client, get_async_http_client
+from exa_cache import CachedAsyncExa, served_from_cache
+from exa_planner import (
+    COMPETITOR_POST_TARGET,
+    EXA_PAGE_SIZE,
+    ExaResultPlanner,
+    format_plan_report,
+    record_plan,
+)
+from llm_cache import cached_ainvoke, cached_abatch
+from article_prefilter import format_prefilter_stats
+from prompt_budget import format_prompt_usage
+from resilience import CircuitOpenError
+from tracing import record_external_call, traced_node
+
+import agent_nodes
+from agent_nodes import (
+    IntegratedContentState,
+    UpdateMemory,
+    ARTICLE_EVAL_BATCH_SIZE,
+    ARTICLE_EVAL_TARGET_GOOD,
+    EXA_MAX_CONCURRENCY,
+    EXA_SEARCH_DEADLINE,
+    PROFILE_SUMMARY_KEY,
+    LINKEDIN_UGC_POSTS_URL,
+    get_model,
+    get_profile_extractor,
+    get_config_value,
+    build_topic_selection_prompt,
+    pass_through_best_topic,
+    build_topic_generation_prompt,
+    parse_generated_topics,
+    build_competitor_searches,
+    web_research_from,
+    build_competitor_analysis_prompt,
+    parse_competitor_insights,
+    serve_cached_research,
+    store_shared_research,
+    research_cache_value,
+    research_competitor_content,
+    build_article_planner,
+    start_article_prefetch,
+    claim_article_prefetch,
+    format_prefetch_claim,
+    build_article_eval_inputs,
+    deduplicate_fetched_articles,
+    merge_branch_update,
+    plan_article_evaluations,
+    has_evaluation_verdict,
+    enough_good_articles,
+    next_wave_size,
+    collect_evaluations,
+    format_evaluation_summary,
+    build_content_creation_prompt,
+    build_trustcall_messages,
+    build_linkedin_post_request,
+    linkedin_post_result,
+    format_search_timings,
+    hash_profile,
+)
+from prompts import (
+    CONTENT_OPTIMIZATION_PROMPT,
+    FAST_CONTENT_CREATION_PROMPT,
+    SUMMARY_INSTRUCTION,
+    MODEL_SYSTEM_MESSAGE,
+)
+
+
+# ─────── Helpers: Async Store & Exa Access ────────────────────────────────────────
+async def aget_user_profile(store: BaseStore, user_id: str) -> Dict[str, Any]:
+    profile_memories = await store.asearch(("profile", user_id))
+    return profile_memories[0].value if profile_memories else {}
+
+def get_async_exa():
+    # Looked up through agent_nodes so the cache can be swapped out (e.g. by the benchmarks)
+    return CachedAsyncExa(get_async_exa_client(), agent_nodes.exa_search_cache)
+
+async def arun_exa_searches(exa: Any, searches: List[tuple], max_concurrency: int, deadline: Optional[float] = None, method: str = "search_and_contents") -> List[Dict[str, Any]]:
+    """Async `run_exa_searches`: the same outcome dicts, with searches run as tasks on the event loop."""
+    semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+    async def run(query: str, search_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            started_at, started = time.time(), time.perf_counter()
+            cache_hit = False
+            try:
+                response = await getattr(exa, method)(query, **search_kwargs)
+                results, status, cache_hit = response.results, "ok", served_from_cache(response)
+            except CircuitOpenError:
+                results, status = [], "circuit_open"
+            except Exception:
+                results, status = [], "error"
+            seconds = time.perf_counter() - started
+            record_external_call("exa", query, started_at, seconds, status="cache_hit" if cache_hit else status, results=len(results))
+            return {"query": query, "results": results, "seconds": seconds, "status": status}
+
+    started = time.perf_counter()
+    # Tasks copy the caller's context, so their trace spans land on the calling node
+    tasks = [asyncio.create_task(run(query, search_kwargs)) for query, search_kwargs in searches]
+    if tasks:
+        await asyncio.wait(tasks, timeout=deadline)
+
+    outcomes = []
+    for (query, _), task in zip(searches, tasks):
+        if task.done() and not task.cancelled():
+            outcomes.append(task.result())
+        else:
+            task.cancel()
+            outcomes.append({"query": query, "results": [], "seconds": time.perf_counter() - started, "status": "timeout"})
+    return outcomes
+
+async def arun_exa_plan(exa: Any, planner: ExaResultPlanner, label: str, max_concurrency: int, deadline: Optional[float] = None) -> tuple:
+    """Async `run_exa_plan`: returns (consumed results, plan report); `deadline` also bounds the contents call."""
+    started_at, started = time.time(), time.perf_counter()
+    remaining = lambda: None if deadline is None else deadline - (time.perf_counter() - started)
+    while searches := planner.next_searches():
+        left = remaining()
+        if left is not None and left <= 0:
+            break
+        planner.add_outcomes(await arun_exa_searches(exa, searches, max_concurrency, left, method="search"))
+
+    contents = None
+    urls, contents_kwargs = planner.contents_request()
+    if urls:
+        call_started_at, call_started = time.time(), time.perf_counter()
+        timeout = remaining()
+        if timeout is not None and timeout <= 0:
+            status = "skipped"
+        else:
+            try:
+                response = await asyncio.wait_for(exa.get_contents(urls, **contents_kwargs), timeout)
+                contents, status = response.results, "cache_hit" if served_from_cache(response) else "ok"
+            except asyncio.TimeoutError:
+                status = "timeout"
+            except Exception:
+                status = "error"
+        record_external_call(
+            "exa", f"contents for {len(urls)} {label}", call_started_at, time.perf_counter() - call_started,
+            status=status, results=len(contents or []),
+        )
+    consumed = planner.finish(contents)
+    return consumed, record_plan(label, planner, started_at, time.perf_counter() - started)
+
+async def aprefetch_article_plan(exa: Any, prefetch: Any, max_concurrency: int) -> ExaResultPlanner:
+    """Async `prefetch_article_plan`: a speculative plan's metadata search rounds."""
+    while searches := prefetch.next_searches():
+        prefetch.planner.add_outcomes(await arun_exa_searches(exa, searches, max_concurrency, method="search"))
+    return prefetch.planner
+
+
+# ─────── Node: Select Single Topic ─────────────────────────────────────────────────
+async def aselect_single_topic(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    """Select one topic from generated topics for content creation"""
+    user_id = config["configurable"]["user_id"]
+    user_profile = await aget_user_profile(store, user_id)
+
+    topics = state.get("final_topics", [])
+    if not topics or not topics[0]:
+        return {"messages": ["No topics found to select from"], "selected_topic": ""}
+
+    if state.get("best_topic"):
+        return pass_through_best_topic(state["best_topic"])
+
+    selection_prompt = build_topic_selection_prompt(topics, user_profile)
+    selected_topic_response = await cached_ainvoke(get_model(), "topic_selection", [SystemMessage(content=selection_prompt)])
+    selected_topic = selected_topic_response.content.strip()
+
+    return {
+        "selected_topic": selected_topic,
+        "messages": [f"Selected topic for content creation: {selected_topic}"]
+    }
+
+# ─────── Node: Analyze Competitor Content ──────────────────────────────────────────
+async def aanalyze_competitor_content(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    topic = state.get("selected_topic", "")
+    if not topic:
+        return {"messages": ["No topic selected for competitor analysis"]}
+
+    # Background refreshes run the sync research on a worker thread, outliving this event loop
+    cached = serve_cached_research(topic, config, lambda: research_competitor_content(topic, config)[1])
+    if cached is not None:
+        return cached
+    update, value = await aresearch_competitor_content(topic, config)
+    store_shared_research(topic, value)
+    return update
+
+async def aresearch_competitor_content(topic: str, config: RunnableConfig) -> tuple:
+    """Async `research_competitor_content`: returns (node update, shareable cache value or None)."""
+    exa = get_async_exa()
+    deadline = get_config_value(config, "exa_search_deadline", EXA_SEARCH_DEADLINE)
+    research_search, *competitor_searches = build_competitor_searches(topic)
+    research_task = asyncio.create_task(arun_exa_searches(exa, [research_search], 1, deadline))
+    planner = ExaResultPlanner(
+        competitor_searches,
+        target=get_config_value(config, "competitor_post_target", COMPETITOR_POST_TARGET),
+        page_size=get_config_value(config, "exa_page_size", EXA_PAGE_SIZE),
+    )
+    competitor_content, plan_report = await arun_exa_plan(exa, planner, "competitor posts", len(competitor_searches), deadline)
+    research_outcome = (await research_task)[0]
+    web_research = web_research_from(topic, research_outcome)
+
+    analysis_prompt, prompt_tokens = build_competitor_analysis_prompt(topic, competitor_content, web_research)
+    analysis_response = await cached_ainvoke(get_model(), "competitor_analysis", [SystemMessage(content=analysis_prompt)])
+    insights = parse_competitor_insights(analysis_response.content)
+
+    update = {
+        "competitor_insights": insights,
+        "web_research_data": web_research,
+        "messages": [
+            f"Enhanced analysis completed: {len(competitor_content)} posts analyzed.",
+            format_search_timings([research_outcome] + planner.outcomes),
+            format_plan_report("competitor posts", plan_report),
+            format_prompt_usage(prompt_tokens)
+        ]
+    }
+    return update, research_cache_value(competitor_content, insights, web_research)
+
+# ─────── Node: Optimize LinkedIn Content ───────────────────────────────────────────
+async def aoptimize_linkedin_content(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    draft = state.get("content_draft", "")
+    if not draft:
+        return {"messages": ["No content draft found to optimize"]}
+
+    optimization_prompt = CONTENT_OPTIMIZATION_PROMPT.format(content=draft)
+    optimized_response = await cached_ainvoke(get_model(), "content_optimization", [SystemMessage(content=optimization_prompt)])
+    optimized_content = optimized_response.content.strip()
+
+    return {
+        "optimized_content": optimized_content,
+        "messages": [f"{optimized_content}"]
+    }
+
+# ─────── Node: Fetch Articles for Topic ────────────────────────────────────────────
+async def afetch_articles_for_topic(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    topic = state.get("selected_topic", "")
+    if not topic:
+        return {"messages": ["No topic selected for article fetching"]}
+
+    max_concurrency = get_config_value(config, "exa_max_concurrency", EXA_MAX_CONCURRENCY)
+    messages = []
+    prefetch = claim_article_prefetch(topic, config)
+    planner = None
+    if prefetch is not None:
+        try:
+            planner = await prefetch.handle
+            messages.append(format_prefetch_claim(prefetch))
+        except Exception:
+            planner = None
+    planner = planner or build_article_planner(topic, config)
+    fetched, plan_report = await arun_exa_plan(get_async_exa(), planner, "articles", max_concurrency)
+
+    return {
+        "fetched_articles": fetched,
+        "messages": [
+            f"Fetched {len(fetched)} articles for topic: {topic}",
+            *messages,
+            format_plan_report("articles", plan_report),
+        ]
+    }
+
+# ─────── Node: Evaluate Articles ──────────────────────────────────────────────────
+async def aevaluate_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    dedup = deduplicate_fetched_articles(state, config, store)
+    articles_list = dedup["unique_articles"]
+    if not articles_list:
+        return {**dedup, "messages": dedup["messages"] + ["No articles to evaluate"]}
+
+    decisions, queue = plan_article_evaluations(articles_list, state.get("selected_topic", ""), config)
+    batch_size = max(1, int(get_config_value(config, "article_eval_batch_size", ARTICLE_EVAL_BATCH_SIZE)))
+    target_good = int(get_config_value(config, "article_eval_target_good", ARTICLE_EVAL_TARGET_GOOD))
+    eval_responses: Dict[int, Any] = {}
+    while queue and not enough_good_articles(decisions, eval_responses, target_good):
+        wave_size = next_wave_size(decisions, eval_responses, target_good, batch_size, len(queue), config)
+        wave, queue = queue[:wave_size], queue[wave_size:]
+        responses = await cached_abatch(
+            get_model(),
+            "article_evaluation",
+            build_article_eval_inputs([articles_list[i] for i in wave]),
+            config={"max_concurrency": batch_size},
+            return_exceptions=True,
+            cacheable=has_evaluation_verdict,
+        )
+        eval_responses.update(zip(wave, responses))
+    evaluated, good, stats = collect_evaluations(articles_list, decisions, eval_responses)
+
+    return {
+        **dedup,
+        "evaluated_articles": evaluated,
+        "good_articles": good,
+        "prefilter_stats": stats,
+        "messages": dedup["messages"] + [
+            format_evaluation_summary(evaluated, good, target_good),
+            format_prefilter_stats(stats),
+        ]
+    }
+
+# ─────── Node: Research Articles (fetch -> evaluate) ───────────────────────────────
+ARTICLE_BRANCH_STEPS = (
+    traced_node("fetch_articles_for_topic", afetch_articles_for_topic),
+    traced_node("evaluate_articles", aevaluate_articles),
+)
+
+async def aresearch_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    """Async `research_articles`: the article branch as one node."""
+    state, combined = dict(state), {}
+    for step in ARTICLE_BRANCH_STEPS:
+        merge_branch_update(state, combined, await step(state, config, store))
+    return combined
+
+# ─────── Node: Create LinkedIn Content with Articles ──────────────────────────────
+async def acreate_linkedin_content_with_articles(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    user_id = config["configurable"]["user_id"]
+    user_profile = await aget_user_profile(store, user_id)
+    good_articles = state.get("good_articles", [])
+
+    content_prompt, prompt_tokens = build_content_creation_prompt(state, user_profile)
+    content_response = await cached_ainvoke(get_model(), "content_creation", [SystemMessage(content=content_prompt)])
+    draft = content_response.content.strip()
+
+    return {
+        "content_draft": draft,
+        "messages": [
+            f"Created LinkedIn content incorporating {len(good_articles)} quality articles",
+            format_prompt_usage(prompt_tokens)
+        ]
+    }
+
+# ─────── Node: Create Optimized LinkedIn Content (fast mode) ───────────────────────
+async def acreate_optimized_linkedin_content(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    user_id = config["configurable"]["user_id"]
+    user_profile = await aget_user_profile(store, user_id)
+    good_articles = state.get("good_articles", [])
+
+    content_prompt, prompt_tokens = build_content_creation_prompt(
+        state, user_profile, FAST_CONTENT_CREATION_PROMPT, "content_creation_fast"
+    )
+    content_response = await cached_ainvoke(get_model(), "content_creation_fast", [SystemMessage(content=content_prompt)])
+    optimized_content = content_response.content.strip()
+
+    return {
+        "content_draft": optimized_content,
+        "optimized_content": optimized_content,
+        "messages": [
+            f"Created optimized LinkedIn content in a single call incorporating {len(good_articles)} quality articles",
+            format_prompt_usage(prompt_tokens),
+            f"{optimized_content}"
+        ]
+    }
+
+# ─────── Node: Master Node (Memory-driven) ────────────────────────────────────────
+async def amaster_node(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    response = await get_model().bind_tools([UpdateMemory], parallel_tool_calls=False).ainvoke(
+        [SystemMessage(content=MODEL_SYSTEM_MESSAGE)] + state["messages"]
+    )
+    return {"messages": [response]}
+
+# ─────── Node: Update Profile ─────────────────────────────────────────────────────
+async def aupdate_profile(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    user_id = config["configurable"]["user_id"]
+    namespace = ("profile", user_id)
+    existing = await store.asearch(namespace)
+    existing_memories = (
+        [(item.key, "Profile", item.value) for item in existing]
+        if existing else None
+    )
+
+    result = await get_profile_extractor().ainvoke({
+        "messages": build_trustcall_messages(state),
+        "existing": existing_memories
+    })
+    for r, meta in zip(result["responses"], result["response_metadata"]):
+        await store.aput(
+            namespace,
+            meta.get("json_doc_id", str(uuid.uuid4())),
+            r.model_dump(mode="json")
+        )
+    if result["responses"]:
+        # The memoized summary describes the old profile
+        await store.adelete(("profile_summary", user_id), PROFILE_SUMMARY_KEY)
+
+    tool_calls = state["messages"][-1].tool_calls
+    return {"messages": [{"role": "tool", "content": "updated profile", "tool_call_id": tool_calls[0]["id"]}]}
+
+# ─────── Node: Post to LinkedIn ───────────────────────────────────────────────────
+async def apost_to_linkedin(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    optimized_content = state.get("optimized_content", "")
+    try:
+        headers, post_data = build_linkedin_post_request(optimized_content)
+        response = await get_async_http_client().post(LINKEDIN_UGC_POSTS_URL, headers=headers, json=post_data)
+        return linkedin_post_result(response, optimized_content)
+    except Exception as e:
+        return {"messages": [f"❌ Error posting to LinkedIn: {str(e)}"]}
+
+# ─────── Helper: Memoized Profile Summary ─────────────────────────────────────────
+async def aget_profile_summary(store: BaseStore, user_id: str, user_profile: Optional[List[Any]]) -> str:
+    """Async `get_profile_summary`, sharing the same memo entry in the store."""
+    profile_json, profile_hash = hash_profile(user_profile)
+
+    namespace = ("profile_summary", user_id)
+    memo = await store.aget(namespace, PROFILE_SUMMARY_KEY)
+    if memo and memo.value.get("profile_hash") == profile_hash:
+        return memo.value["summary"]
+
+    summary_msg = SUMMARY_INSTRUCTION.format(user_profile=profile_json)
+    summary_response = await cached_ainvoke(get_model(), "summary", [SystemMessage(content=summary_msg)])
+    summary_paragraph = summary_response.content.strip()
+    await store.aput(namespace, PROFILE_SUMMARY_KEY, {"profile_hash": profile_hash, "summary": summary_paragraph})
+    return summary_paragraph
+
+# ─────── Node: Generate Topics ────────────────────────────────────────────────────
+async def agenerate_topic_integrated(state: IntegratedContentState, config: RunnableConfig, store: BaseStore):
+    user_id = config["configurable"]["user_id"]
+    existing_profile, existing_top = await asyncio.gather(
+        store.asearch(("profile", user_id)),
+        store.asearch(("topic", user_id)),
+    )
+    user_profile = [(item.key, "Profile", item.value) for item in existing_profile] if existing_profile else None
+    existing_topics = existing_top[0].value if existing_top else []
+
+    summary_paragraph = await aget_profile_summary(store, user_id, user_profile)
+
+    gen_msg, fused = build_topic_generation_prompt(summary_paragraph, existing_topics, config)
+    list_response = await cached_ainvoke(get_model(), "topic_generation", [SystemMessage(content=gen_msg)])
+    update = parse_generated_topics(list_response.content, fused)
+
+    # Tasks run on the graph's event loop and are awaited by afetch_articles_for_topic
+    max_concurrency = get_config_value(config, "exa_max_concurrency", EXA_MAX_CONCURRENCY)
+    return start_article_prefetch(update, config, lambda prefetch: asyncio.create_task(
+        aprefetch_article_plan(get_async_exa(), prefetch, max_concurrency)
+    ))
+
+
+__all__ = [
+    "arun_exa_searches",
+    "arun_exa_plan",
+    "aprefetch_article_plan",
+    "aselect_single_topic",
+    "aanalyze_competitor_content",
+    "aoptimize_linkedin_content",
+    "afetch_articles_for_topic",
+    "aevaluate_articles",
+    "aresearch_articles",
+    "acreate_linkedin_content_with_articles",
+    "acreate_optimized_linkedin_content",
+    "amaster_node",
+    "aupdate_profile",
+    "apost_to_linkedin",
+    "agenerate_topic_integrated",
+]
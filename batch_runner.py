@@ -0,0 +1,212 @@
+"""
+Headless batch runner: generate LinkedIn content for many users without the UI.
+
+Each user runs through `enhanced_graph` on its own thread_id, many users at a
+time under a global concurrency limit. Results (selected topic, draft and
+optimized content) are appended to a JSON-lines output file as each user
+finishes, so a long overnight run can be inspected or resumed at any point.
+
+Examples:
+    python batch_runner.py --users alice bob carol --concurrency 4 --output drafts.jsonl
+    python batch_runner.py --users-file users.txt --output drafts.jsonl
+    python batch_runner.py --profiles profiles.jsonl --concurrency 8 --output drafts.jsonl
+    python batch_runner.py --users-file users.txt --async --concurrency 50 --output drafts.jsonl
+
+With --async, users run as tasks on one event loop through the native async
+graph (`async_enhanced_graph`) instead of on a thread pool.
+
+A profiles file has one JSON object per line with a `user_id` and a `profile`,
+which is either the pasted profile text (run through the profile-update flow
+first) or an already-structured profile dict (written to the store directly).
+
+At the end, the per-provider rate-limit, retry and circuit-breaker metrics
+(see resilience.py) are printed to stderr after the result counts.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage
+
+from agent import get_enhanced_graph, get_async_enhanced_graph
+from article_prefetch import prefetch_stats
+from research_cache import get_research_cache
+from resilience import resilience_metrics
+
+CONTENT_REQUEST = "Generate topics and create LinkedIn content with article research"
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+
+def load_jobs(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    jobs: List[Dict[str, Any]] = [{"user_id": u} for u in args.users or []]
+    if args.users_file:
+        with open(args.users_file, encoding="utf-8") as f:
+            jobs += [{"user_id": line.strip()} for line in f if line.strip()]
+    if args.profiles:
+        with open(args.profiles, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    jobs.append({"user_id": str(record["user_id"]), "profile": record.get("profile")})
+    return jobs
+
+
+def completed_user_ids(path: str) -> set:
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record["user_id"])
+    return done
+
+
+def new_run_config(user_id: str) -> Dict[str, Any]:
+    thread_id = f"batch-{user_id}-{uuid.uuid4().hex[:8]}"
+    return {"configurable": {"thread_id": thread_id, "user_id": user_id, "trace_id": thread_id}}
+
+
+def ok_result(user_id: str, config: Dict[str, Any], state: Dict[str, Any], started: float) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "thread_id": config["configurable"]["thread_id"],
+        "status": "ok" if state.get("optimized_content") else "no_content",
+        "selected_topic": state.get("selected_topic", ""),
+        "content_draft": state.get("content_draft", ""),
+        "optimized_content": state.get("optimized_content", ""),
+        "good_articles": len(state.get("good_articles", []) or []),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def error_result(user_id: str, config: Dict[str, Any], error: Exception, started: float) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "thread_id": config["configurable"]["thread_id"],
+        "status": "error",
+        "error": f"{type(error).__name__}: {error}",
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def run_user(graph, job: Dict[str, Any]) -> Dict[str, Any]:
+    user_id = job["user_id"]
+    config = new_run_config(user_id)
+    started = time.perf_counter()
+    try:
+        profile = job.get("profile")
+        if isinstance(profile, dict):
+            graph.store.put(("profile", user_id), "profile", profile)
+        elif isinstance(profile, str) and profile.strip():
+            graph.invoke({"messages": [HumanMessage(content=profile)]}, config)
+
+        state = graph.invoke({"messages": [HumanMessage(content=CONTENT_REQUEST)]}, config)
+        return ok_result(user_id, config, state, started)
+    except Exception as e:
+        return error_result(user_id, config, e, started)
+
+
+async def arun_user(graph, job: Dict[str, Any]) -> Dict[str, Any]:
+    user_id = job["user_id"]
+    config = new_run_config(user_id)
+    started = time.perf_counter()
+    try:
+        profile = job.get("profile")
+        if isinstance(profile, dict):
+            await graph.store.aput(("profile", user_id), "profile", profile)
+        elif isinstance(profile, str) and profile.strip():
+            await graph.ainvoke({"messages": [HumanMessage(content=profile)]}, config)
+
+        state = await graph.ainvoke({"messages": [HumanMessage(content=CONTENT_REQUEST)]}, config)
+        return ok_result(user_id, config, state, started)
+    except Exception as e:
+        return error_result(user_id, config, e, started)
+
+
+def record_result(out, counts: Dict[str, int], total: int, result: Dict[str, Any]) -> None:
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+    counts[result["status"]] += 1
+    print(
+        f"[{sum(counts.values())}/{total}] {result['user_id']}: {result['status']} in {result['seconds']}s",
+        file=sys.stderr
+    )
+
+
+def run_batch(jobs: List[Dict[str, Any]], output: str, concurrency: int, graph=None) -> Dict[str, int]:
+    graph = graph or get_enhanced_graph()
+    write_lock = threading.Lock()
+    counts = {"ok": 0, "no_content": 0, "error": 0}
+
+    out_dir = os.path.dirname(os.path.abspath(output))
+    os.makedirs(out_dir, exist_ok=True)
+    with open(output, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(run_user, graph, job): job["user_id"] for job in jobs}
+        for future in as_completed(futures):
+            with write_lock:
+                record_result(out, counts, len(jobs), future.result())
+    return counts
+
+
+async def arun_batch(jobs: List[Dict[str, Any]], output: str, concurrency: int, graph=None) -> Dict[str, int]:
+    """`run_batch` on one event loop: each user is a task, at most `concurrency` in flight."""
+    graph = graph or get_async_enhanced_graph()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    counts = {"ok": 0, "no_content": 0, "error": 0}
+
+    async def bounded(job):
+        async with semaphore:
+            return await arun_user(graph, job)
+
+    out_dir = os.path.dirname(os.path.abspath(output))
+    os.makedirs(out_dir, exist_ok=True)
+    with open(output, "a", encoding="utf-8") as out:
+        for next_result in asyncio.as_completed([bounded(job) for job in jobs]):
+            record_result(out, counts, len(jobs), await next_result)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", nargs="*", help="user ids to generate content for")
+    parser.add_argument("--users-file", help="text file with one user id per line")
+    parser.add_argument("--profiles", help="JSONL file of {user_id, profile} records")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="maximum users processed at once")
+    parser.add_argument("--output", default="batch_output.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="run users as tasks on one event loop with the async graph")
+    parser.add_argument("--skip-completed", action="store_true", help="skip users that already have an ok result in --output")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args)
+    if args.skip_completed:
+        done = completed_user_ids(args.output)
+        jobs = [job for job in jobs if job["user_id"] not in done]
+    if not jobs:
+        parser.error("no users to process (use --users, --users-file or --profiles)")
+
+    if args.use_async:
+        counts = asyncio.run(arun_batch(jobs, args.output, args.concurrency))
+    else:
+        counts = run_batch(jobs, args.output, args.concurrency)
+    print(json.dumps(counts), file=sys.stderr)
+    research_cache = get_research_cache()
+    research = research_cache.stats() if research_cache is not None else None
+    print(json.dumps({"providers": resilience_metrics(), "prefetch": prefetch_stats.totals(), "research_cache": research}), file=sys.stderr)
+    return 0 if counts["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
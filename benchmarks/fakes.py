@@ -0,0 +1,333 @@
+"""
+Offline stand-ins for the Azure chat model, the trustcall extractor and Exa.
+
+Each fake has configurable latency and response size and counts its calls, so
+the graph can be benchmarked end to end without network access or API spend.
+`install_fakes` patches them into agent_nodes and turns the on-disk caches off.
+"""
+
+import re
+import json
+import time
+import random
+import uuid
+import asyncio
+import zlib
+import inspect
+import threading
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from exa_py import Exa
+from exa_py.api import CONTENTS_ENDPOINT_OPTIONS_TYPES, CONTENTS_OPTIONS_TYPES, SEARCH_OPTIONS_TYPES, validate_search_options
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers each pipeline prompt with a canned, well-formed reply."""
+
+    latency: float = 0.0
+    # Seconds per output word on top of `latency`, so long replies cost more than short ones
+    token_latency: float = 0.0
+    response_chars: int = 1200
+    good_ratio: float = 0.5
+    _calls: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages) -> AIMessage:
+        last = messages[-1]
+        prompt = messages[0].content if messages else ""
+        if isinstance(last, ToolMessage) or getattr(last, "type", "") == "tool":
+            return AIMessage(content="Done, your profile is up to date.")
+        if "helpful chatbot" in prompt:
+            if "topic" in str(last.content).lower():
+                return AIMessage(content="topic")
+            return AIMessage(
+                content="",
+                tool_calls=[{"name": "UpdateMemory", "args": {"update_type": "user"}, "id": f"call_{uuid.uuid4().hex[:8]}"}]
+            )
+        if "AI evaluator" in prompt:
+            # Deterministic per article so runs are comparable
+            verdict = "good" if (zlib.crc32(prompt.encode()) % 100) < self.good_ratio * 100 else "bad"
+            return AIMessage(content=f'{{"evaluation": "{verdict}"}}')
+        if "specialized topic generator" in prompt:
+            topics = "<topics>\n- AI for lead generation\n- Sales automation playbooks\n- Founder-led content\n</topics>"
+            if "<best_topic>" in prompt:
+                topics += "\n<best_topic>AI for lead generation</best_topic>"
+            return AIMessage(content=topics)
+        if "SINGLE BEST topic" in prompt:
+            return AIMessage(content="AI for lead generation")
+        if "AI content strategist" in prompt:
+            return AIMessage(content='{"high_performing_formats": ["story posts"], "viral_hooks": ["surprising statistics"]}')
+        return AIMessage(content=("Lorem ipsum dolor sit amet. " * (self.response_chars // 28 + 1))[:self.response_chars])
+
+    def _delay(self, reply: AIMessage) -> float:
+        return self.latency + self.token_latency * len(str(reply.content).split())
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        with self._lock:
+            self._calls += 1
+        reply = self._reply(messages)
+        time.sleep(self._delay(reply))
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Used when the graph is streamed with stream_mode="messages"; long-form replies come word by word
+        with self._lock:
+            self._calls += 1
+        time.sleep(self.latency)
+        reply = self._reply(messages)
+        if reply.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": i}
+                for i, tc in enumerate(reply.tool_calls)
+            ]))
+            return
+        for piece in re.findall(r"\S+\s*", reply.content) or [reply.content]:
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        with self._lock:
+            self._calls += 1
+        reply = self._reply(messages)
+        await asyncio.sleep(self._delay(reply))
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+
+class FakeProfileExtractor:
+    """Mimics `create_extractor(...).invoke` for the Profile schema."""
+
+    def __init__(self, model: FakeChatModel):
+        self.model = model
+
+    def invoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        self.model.invoke(inputs["messages"])
+        return self._result(inputs)
+
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        await self.model.ainvoke(inputs["messages"])
+        return self._result(inputs)
+
+    def _result(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        from agent_nodes import Profile
+
+        existing = inputs.get("existing") or []
+        doc_id = existing[0][0] if existing else str(uuid.uuid4())
+        profile = Profile(name="Benchmark User", current_work="Founder", content_theme="AI for lead generation")
+        return {"responses": [profile], "response_metadata": [{"json_doc_id": doc_id}]}
+
+
+@dataclass
+class FakeResult:
+    title: str
+    url: str
+    summary: Optional[str]
+    id: str = ""
+    published_date: Optional[str] = None
+
+
+@dataclass
+class FakeSearchResponse:
+    results: List[FakeResult]
+
+
+SUMMARY_VOCABULARY = (
+    "adoption pipeline revenue buyers automation survey growth founders teams outbound intent data "
+    "qualification agents forecast budget churn retention pricing enterprise startups hiring vendors "
+    "compliance analytics workflow benchmark quarter margin partnership launch customers market"
+).split()
+
+
+def check_exa_call(method: str, first: Any, kwargs: Dict[str, Any]) -> None:
+    """Raise as the installed exa-py would for arguments `Exa.<method>` rejects.
+
+    `search` has keyword-only parameters, checked by binding its signature;
+    `search_and_contents` and `get_contents` take **kwargs and validate them
+    against exa-py's option tables, which is done here the same way.
+    """
+    if method == "search":
+        inspect.signature(Exa.search).bind(None, first, **kwargs)
+        return
+    expected = {**CONTENTS_OPTIONS_TYPES, **CONTENTS_ENDPOINT_OPTIONS_TYPES}
+    options = {k: v for k, v in kwargs.items() if v is not None and k not in ("betas", "extra_body")}
+    if method == "search_and_contents":
+        expected.update(SEARCH_OPTIONS_TYPES)
+        options["query"] = first
+    else:
+        options["urls"] = first
+    validate_search_options(options, expected)
+
+
+class FakeExa:
+    """Exa client whose search_and_contents returns synthetic results after a fixed delay.
+
+    Each result has its own summary. With `duplicate_ratio` > 0, that share of
+    results is instead one of a pool of stories every query returns (under a
+    tracking-tagged URL), like the overlap between real Exa queries. With
+    `press_release_ratio` > 0, that share of results is a short newswire
+    announcement the article pre-filter should reject without the LLM.
+
+    `search` returns the same results without summaries and `get_contents`
+    fills them in by URL; `summaries` counts every summary handed out.
+
+    Every call's arguments are checked against the installed exa-py (see
+    `check_exa_call`). A call the real client would reject raises here too and
+    is kept in `rejected`; the nodes swallow Exa errors, so the benchmark checks
+    that list.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        summary_chars: int = 400,
+        max_results: Optional[int] = None,
+        duplicate_ratio: float = 0.0,
+        press_release_ratio: float = 0.0,
+    ):
+        self.latency = latency
+        self.summary_chars = summary_chars
+        self.max_results = max_results
+        self.duplicate_ratio = duplicate_ratio
+        self.press_release_ratio = press_release_ratio
+        self.calls = 0
+        self.summaries = 0
+        self.rejected: List[str] = []
+        self._lock = threading.Lock()
+        self._by_url: Dict[str, FakeResult] = {}
+
+    def search_and_contents(self, query: str, **kwargs) -> FakeSearchResponse:
+        self._count_call("search_and_contents", query, kwargs)
+        time.sleep(self.latency)
+        return self._summarized(self._response(query, kwargs).results)
+
+    def search(self, query: str, **kwargs) -> FakeSearchResponse:
+        self._count_call("search", query, kwargs)
+        time.sleep(self.latency)
+        return self._metadata(self._response(query, kwargs).results)
+
+    def get_contents(self, urls: List[str], **kwargs) -> FakeSearchResponse:
+        self._count_call("get_contents", urls, kwargs)
+        time.sleep(self.latency)
+        return self._summarized([self._by_url[url] for url in urls if url in self._by_url])
+
+    def _count_call(self, method: str, first: Any, kwargs: Dict[str, Any]) -> None:
+        try:
+            check_exa_call(method, first, kwargs)
+        except (TypeError, ValueError) as e:
+            with self._lock:
+                self.rejected.append(f"{method}: {e}")
+            raise
+        with self._lock:
+            self.calls += 1
+
+    def _summarized(self, results: List[FakeResult]) -> FakeSearchResponse:
+        with self._lock:
+            self.summaries += len(results)
+        return FakeSearchResponse(results=results)
+
+    def _metadata(self, results: List[FakeResult]) -> FakeSearchResponse:
+        with self._lock:
+            self._by_url.update((r.url, r) for r in results)
+        return FakeSearchResponse(results=[dataclasses.replace(r, summary=None) for r in results])
+
+    def _summary(self, seed: str) -> str:
+        rng = random.Random(seed)
+        text = ""
+        while len(text) < self.summary_chars:
+            text += "Key finding: " + " ".join(rng.choice(SUMMARY_VOCABULARY) for _ in range(10)) + ". "
+        return text[:self.summary_chars]
+
+    def _press_release(self, seed: str) -> str:
+        rng = random.Random(seed)
+        pick = lambda n: " ".join(rng.choice(SUMMARY_VOCABULARY) for _ in range(n))
+        return f"Acme {pick(1).title()} (NASDAQ: ACME) today announced {pick(3)} for {pick(3)} teams, now available."
+
+    def _response(self, query: str, kwargs: Dict[str, Any]) -> FakeSearchResponse:
+        count = self.max_results if self.max_results is not None else kwargs.get("num_results", 10)
+        query_id = zlib.crc32(query.encode()) % 10_000
+        results = []
+        for i in range(count):
+            if zlib.crc32(f"pr-{query_id}-{i}".encode()) % 100 < self.press_release_ratio * 100:
+                results.append(FakeResult(
+                    title=f"Acme Corp launches {query} #{i}",
+                    url=f"https://www.prnewswire.com/news-releases/acme-{query_id}-{i}.html",
+                    summary=self._press_release(f"pr-{query_id}-{i}"),
+                    id=f"pr-{query_id}-{i}",
+                ))
+            elif zlib.crc32(f"{query_id}-{i}".encode()) % 100 < self.duplicate_ratio * 100:
+                results.append(FakeResult(
+                    title=f"Shared story #{i}",
+                    url=f"https://example.com/shared/{i}?utm_source=q{query_id}",
+                    summary=self._summary(f"shared-{i}"),
+                    id=f"shared-{i}",
+                ))
+            else:
+                results.append(FakeResult(
+                    title=f"{query} #{i}",
+                    url=f"https://example.com/{query_id}/{i}",
+                    summary=self._summary(f"{query_id}-{i}"),
+                    id=f"{query_id}-{i}",
+                ))
+        return FakeSearchResponse(results=results)
+
+
+class FakeAsyncExa(FakeExa):
+    """`AsyncExa` stand-in: search_and_contents is a coroutine that awaits the delay."""
+
+    async def search_and_contents(self, query: str, **kwargs) -> FakeSearchResponse:
+        self._count_call("search_and_contents", query, kwargs)
+        await asyncio.sleep(self.latency)
+        return self._summarized(self._response(query, kwargs).results)
+
+    async def search(self, query: str, **kwargs) -> FakeSearchResponse:
+        self._count_call("search", query, kwargs)
+        await asyncio.sleep(self.latency)
+        return self._metadata(self._response(query, kwargs).results)
+
+    async def get_contents(self, urls: List[str], **kwargs) -> FakeSearchResponse:
+        self._count_call("get_contents", urls, kwargs)
+        await asyncio.sleep(self.latency)
+        return self._summarized([self._by_url[url] for url in urls if url in self._by_url])
+
+
+def install_fakes(model: FakeChatModel, exa: FakeExa, async_exa: Optional[FakeAsyncExa] = None) -> None:
+    """Route the nodes' model, extractor and Exa clients to the fakes and disable the caches."""
+    import agent_nodes
+    import async_nodes
+    import llm_cache
+    import research_cache
+
+    agent_nodes._model = model
+    agent_nodes._profile_extractor = FakeProfileExtractor(model)
+    agent_nodes.get_exa_client = lambda: exa
+    if async_exa is None:
+        async_exa = FakeAsyncExa(
+            latency=exa.latency,
+            summary_chars=exa.summary_chars,
+            max_results=exa.max_results,
+            duplicate_ratio=exa.duplicate_ratio,
+            press_release_ratio=exa.press_release_ratio,
+        )
+    async_nodes.get_async_exa_client = lambda: async_exa
+    agent_nodes.exa_search_cache = None
+    research_cache.set_research_cache(None)
+    llm_cache.llm_response_cache = None
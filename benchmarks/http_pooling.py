@@ -0,0 +1,95 @@
+"""
+Per-call latency of pooled vs. unpooled HTTP clients against a local stand-in server.
+
+Compares a bare `requests.post` (new connection per call, as `Exa` and the old
+`post_to_linkedin` did) with the shared keep-alive session from clients.py, and
+a plain `Exa` client with `PooledExa`, all hitting a local HTTP server that
+mimics the Exa search endpoint.
+
+Run from the repo root:
+    python -m benchmarks.http_pooling --calls 200
+"""
+
+import json
+import time
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+import requests
+from exa_py import Exa
+
+from clients import PooledExa, build_http_session
+
+SEARCH_RESPONSE = json.dumps({
+    "requestId": "bench",
+    "results": [
+        {"id": f"doc-{i}", "url": f"https://example.com/{i}", "title": f"Result {i}", "summary": "Stand-in summary."}
+        for i in range(5)
+    ],
+}).encode("utf-8")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True  # avoid delayed-ACK stalls on reused connections
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(SEARCH_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(SEARCH_RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def time_calls(fn: Callable[[], object], calls: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    payload = {"query": "bench", "numResults": 5}
+
+    session = build_http_session()
+    plain_exa = Exa(api_key="bench", base_url=base_url)
+    pooled_exa = PooledExa(api_key="bench", session=build_http_session(), base_url=base_url)
+
+    scenarios = {
+        "requests.post (no pool)": lambda: requests.post(base_url + "/search", json=payload).json(),
+        "pooled session.post": lambda: session.post(base_url + "/search", json=payload).json(),
+        "Exa.search_and_contents": lambda: plain_exa.search_and_contents("bench", num_results=5),
+        "PooledExa.search_and_contents": lambda: pooled_exa.search_and_contents("bench", num_results=5),
+    }
+    print(f"{'scenario':<32}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, fn in scenarios.items():
+        fn()  # warm-up
+        stats = time_calls(fn, args.calls)
+        print(f"{name:<32}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Offline end-to-end benchmark of `enhanced_graph` with stand-in LLM and Exa clients.
+
+Runs the real graph (same nodes, edges and routing) against the fakes in
+benchmarks/fakes.py and reports, per scenario:
+  - wall time of every node execution
+  - total run latency
+  - peak Python memory (tracemalloc)
+  - number of LLM and Exa calls, and of Exa summaries generated
+
+With --content-mode compare, content_flow and large_fetch run once in the
+standard mode (draft, then optimize) and once in the fast mode (a single
+draft+optimize call), and the report ends with their latency difference.
+--llm-token-latency makes fake replies cost time per output word, which is
+what the fast mode saves. --topic-selection-mode fused picks the topic in the
+topic-generation call instead of a separate selection call. --prefetch-topics K
+starts the article searches for the top K generated topics while the topic is
+being selected, and the report ends with the prefetch hit rate.
+--research-cache shares one in-memory research cache across the runs, so every
+content run after the first serves competitor research from it.
+
+Scenarios:
+  profile_update   a pasted profile routed through master_node -> update_profile
+  content_flow     the full topic -> research -> draft -> optimize flow
+  large_fetch      content_flow with a large fetched_articles list; the article
+                   fetch target is raised so every fetched result is kept
+
+Run from the repo root:
+    python -m benchmarks.pipeline --llm-latency 0.2 --exa-latency 0.5
+    python -m benchmarks.pipeline --scenario large_fetch --articles-per-query 100 --json
+    python -m benchmarks.pipeline --scenario content_flow --content-mode compare --llm-token-latency 0.01
+"""
+
+import json
+import time
+import uuid
+import argparse
+import threading
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.store.memory import InMemoryStore
+
+from article_prefetch import format_prefetch_stats, prefetch_stats
+from article_prefilter import format_prefilter_stats
+from benchmarks.fakes import FakeChatModel, FakeExa, install_fakes
+from research_cache import ResearchCache, set_research_cache
+
+PROFILE_TEXT = (
+    "I'm the founder of a B2B SaaS startup that uses AI to qualify inbound leads. "
+    "Previously led growth at two fintech companies; I want to be known for practical AI in sales."
+)
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Records wall time of each graph node execution from LangChain chain callbacks."""
+
+    def __init__(self):
+        self._starts: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+        self.spans: List[Dict[str, Any]] = []
+        self.origin = time.perf_counter()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            with self._lock:
+                self._starts[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id):
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+            if started:
+                node, t0 = started
+                self.spans.append({
+                    "node": node,
+                    "start_s": t0 - self.origin,
+                    "seconds": time.perf_counter() - t0,
+                })
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+
+def build_graph():
+    from agent import builder
+
+    # A throwaway store keeps benchmark runs off the on-disk profile store
+    return builder.compile(checkpointer=MemorySaver(), store=InMemoryStore())
+
+
+def run_scenario(name: str, args: argparse.Namespace, content_mode: str = "standard", research: Optional[ResearchCache] = None) -> Dict[str, Any]:
+    model = FakeChatModel(latency=args.llm_latency, token_latency=args.llm_token_latency, response_chars=args.response_chars)
+    exa = FakeExa(
+        latency=args.exa_latency,
+        summary_chars=args.summary_chars,
+        max_results=args.articles_per_query if name == "large_fetch" else None,
+        duplicate_ratio=args.duplicate_ratio,
+        press_release_ratio=args.press_release_ratio,
+    )
+    install_fakes(model, exa)
+    if research is not None:
+        set_research_cache(research)
+    graph = build_graph()
+
+    user_id = "bench-user"
+    if name != "profile_update":
+        graph.store.put(("profile", user_id), "profile", {"name": "Benchmark User", "content_theme": "AI for lead generation"})
+        message = "Generate topics and create LinkedIn content with article research"
+    else:
+        message = PROFILE_TEXT
+    config = {
+        "configurable": {
+            "thread_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "content_mode": content_mode,
+            "topic_selection_mode": args.topic_selection_mode,
+            "speculative_prefetch_topics": args.prefetch_topics,
+        },
+        "callbacks": [NodeTimer()],
+    }
+    if name == "large_fetch":
+        # The default ARTICLE_FETCH_TARGET would stop the article plan at 10 results
+        from agent_nodes import build_article_searches
+        config["configurable"]["article_fetch_target"] = args.articles_per_query * len(build_article_searches(""))
+    timer = config["callbacks"][0]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    final_state = graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The nodes turn Exa errors into empty results, so a call the real client rejects fails here
+    if exa.rejected:
+        raise RuntimeError(f"{name}: {len(exa.rejected)} Exa calls the installed exa-py would reject, e.g. {exa.rejected[0]}")
+
+    per_node = defaultdict(float)
+    for span in timer.spans:
+        per_node[span["node"]] += span["seconds"]
+    return {
+        "scenario": name,
+        "content_mode": content_mode,
+        "total_seconds": total,
+        "peak_memory_mb": peak / (1024 * 1024),
+        "llm_calls": model.calls,
+        "exa_calls": exa.calls,
+        "exa_summaries": exa.summaries,
+        "fetched_articles": len(final_state.get("fetched_articles", []) or []),
+        "unique_articles": len(final_state.get("unique_articles", []) or []),
+        "prefilter_stats": final_state.get("prefilter_stats") or {},
+        "node_seconds": dict(per_node),
+        "spans": sorted(timer.spans, key=lambda s: s["start_s"]),
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"\n== {result['scenario']} ({result['content_mode']}) ==")
+    print(
+        f"total {result['total_seconds']:.3f}s | peak mem {result['peak_memory_mb']:.1f} MB | "
+        f"LLM calls {result['llm_calls']} | Exa calls {result['exa_calls']} ({result['exa_summaries']} summaries) | "
+        f"articles {result['fetched_articles']} ({result['unique_articles']} unique)"
+    )
+    if pre := result["prefilter_stats"]:
+        print(f"  {format_prefilter_stats(pre)}")
+    print(f"  {'node':<40}{'start s':>10}{'wall s':>10}")
+    for span in result["spans"]:
+        print(f"  {span['node']:<40}{span['start_s']:>10.3f}{span['seconds']:>10.3f}")
+
+
+def print_mode_comparison(results: List[Dict[str, Any]]) -> None:
+    by_key = {(r["scenario"], r["content_mode"]): r for r in results}
+    print("\n== content modes ==")
+    print(f"  {'scenario':<16}{'standard s':>12}{'fast s':>10}{'saved s':>10}{'LLM calls':>12}")
+    for (scenario, mode), standard in by_key.items():
+        fast = by_key.get((scenario, "fast"))
+        if mode != "standard" or not fast:
+            continue
+        saved = standard["total_seconds"] - fast["total_seconds"]
+        print(
+            f"  {scenario:<16}{standard['total_seconds']:>12.3f}{fast['total_seconds']:>10.3f}{saved:>10.3f}"
+            f"{standard['llm_calls']:>6} -> {fast['llm_calls']}"
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=["profile_update", "content_flow", "large_fetch", "all"], default="all")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake LLM call")
+    parser.add_argument("--llm-token-latency", type=float, default=0.0, help="extra seconds per output word of fake LLM replies")
+    parser.add_argument("--exa-latency", type=float, default=0.1, help="seconds per fake Exa call")
+    parser.add_argument("--response-chars", type=int, default=1200, help="length of long-form fake LLM replies")
+    parser.add_argument("--summary-chars", type=int, default=400, help="length of fake Exa summaries")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0, help="share of Exa results repeated across queries")
+    parser.add_argument("--press-release-ratio", type=float, default=0.0, help="share of Exa results that are newswire announcements")
+    parser.add_argument("--articles-per-query", type=int, default=100, help="Exa results per query in large_fetch")
+    parser.add_argument(
+        "--content-mode", choices=["standard", "fast", "compare"], default="standard",
+        help="content creation path; compare runs the content scenarios in both modes"
+    )
+    parser.add_argument(
+        "--topic-selection-mode", choices=["separate", "fused"], default="separate",
+        help="fused has the topic-generation call pick the topic, skipping the selection call"
+    )
+    parser.add_argument("--prefetch-topics", type=int, default=0, help="candidate topics to prefetch articles for; 0 disables")
+    parser.add_argument("--research-cache", action="store_true", help="share an in-memory research cache across the runs")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    scenarios = ["profile_update", "content_flow", "large_fetch"] if args.scenario == "all" else [args.scenario]
+    modes = ["standard", "fast"] if args.content_mode == "compare" else [args.content_mode]
+    research = ResearchCache(":memory:") if args.research_cache else None
+    results = []
+    for name in scenarios:
+        # profile_update never reaches content creation, so one run covers every mode
+        for mode in (modes[:1] if name == "profile_update" else modes):
+            results.append(run_scenario(name, args, mode, research))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print_report(result)
+        if args.content_mode == "compare":
+            print_mode_comparison(results)
+        if args.prefetch_topics:
+            print(f"\n{format_prefetch_stats(prefetch_stats.totals())}")
+        if research is not None:
+            print(f"\nResearch cache: {research.stats()}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
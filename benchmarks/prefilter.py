@@ -0,0 +1,112 @@
+"""
+Calibration cases for the local article pre-filter (article_prefilter.py).
+
+Scores a fixed set of labelled articles against one topic and reports each
+score, verdict and the reasons behind it. Every case names the verdict it must
+get ("bad", "good", or "llm" for the uncertain band); the run exits non-zero
+when one does not, so threshold or weight changes can be checked offline.
+
+Run from the repo root:
+    python -m benchmarks.prefilter
+    python -m benchmarks.prefilter --bad-threshold 0.3 --json
+"""
+
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Optional
+
+from article_prefilter import PREFILTER_BAD_THRESHOLD, PREFILTER_GOOD_THRESHOLD, prefilter_articles
+
+TOPIC = "AI lead generation for B2B startups"
+
+CASES = [
+    {
+        "name": "short, on-topic",
+        "expect": "llm",
+        "title": "Scoring inbound lead forms with AI",
+        "summary": "Notes from a founder on qualifying inbound forms automatically.",
+        "url": "https://example.com/notes/inbound-scoring",
+    },
+    {
+        "name": "short, closely on-topic",
+        "expect": "llm",
+        "title": "AI lead generation at a seed-stage B2B startup",
+        "summary": "Three tools we tried and what each one cost us.",
+        "url": "https://example.com/blog/three-tools",
+    },
+    {
+        "name": "newswire announcement",
+        "expect": "bad",
+        "title": "Acme launches LeadBot for B2B startups",
+        "summary": "Acme (NASDAQ: ACME) today announced LeadBot for lead generation, now available.",
+        "url": "https://www.prnewswire.com/news-releases/acme-leadbot.html",
+    },
+    {
+        "name": "short, off-topic",
+        "expect": "bad",
+        "title": "Quarterly office update",
+        "summary": "Our new office opens in March.",
+        "url": "https://example.com/news/office",
+    },
+    {
+        "name": "long analysis from an analysis outlet",
+        "expect": "good",
+        "title": "Why AI lead generation stalls after the pilot at B2B startups",
+        "summary": "A survey of 400 sales teams. " + "Findings on adoption, pipeline quality and cost per qualified lead across segments. " * 8,
+        "url": "https://hbr.org/2025/03/ai-lead-generation",
+    },
+    {
+        "name": "long, on-topic, a couple of insight words",
+        "expect": "llm",
+        "title": "AI lead generation for B2B startups: our strategy",
+        "summary": "What changed in our pipeline. " + "We moved outbound to an AI assistant and tracked replies, meetings and trends by segment. " * 6,
+        "url": "https://example.com/blog/ai-outbound",
+    },
+    {
+        "name": "repeated announcement phrasing only",
+        "expect": "llm",
+        "title": "Acme launches and unveils an outreach assistant for startups",
+        "summary": "The assistant drafts outreach for each account, scores replies and books meetings. "
+                   "It reads the CRM history first, so sequences match where each account already is in the funnel.",
+        "url": "https://example.com/blog/acme-assistant",
+    },
+]
+
+
+def run_cases(bad_threshold: float, good_threshold: float) -> List[Dict[str, Any]]:
+    decisions = prefilter_articles(CASES, TOPIC, bad_threshold, good_threshold, audit_rate=0.0)
+    return [
+        {
+            "name": case["name"],
+            "expect": case["expect"],
+            "verdict": decision.verdict or "llm",
+            "score": decision.score,
+            "reasons": decision.reasons,
+        }
+        for case, decision in zip(CASES, decisions)
+    ]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bad-threshold", type=float, default=PREFILTER_BAD_THRESHOLD)
+    parser.add_argument("--good-threshold", type=float, default=PREFILTER_GOOD_THRESHOLD)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_cases(args.bad_threshold, args.good_threshold)
+    failed = [r for r in results if r["verdict"] != r["expect"]]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Topic: {TOPIC} (bad < {args.bad_threshold}, good >= {args.good_threshold})")
+        for r in results:
+            mark = "ok  " if r["verdict"] == r["expect"] else "FAIL"
+            print(f"  {mark} {r['name']:<44}{r['score']:>6.2f}  {r['verdict']:<5} (expected {r['expect']})  {', '.join(r['reasons'])}")
+        print(f"{len(results) - len(failed)}/{len(results)} cases as expected")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Key normalization cases for the shared research cache (research_cache.py).
+
+Each case stores research under one topic phrasing in an in-memory
+ResearchCache and looks it up with another. "match" pairs are phrasings of
+the same topic and must share the entry; "distinct" pairs are different
+topics and must not. Reports both normalized keys, the written-topic
+similarity and the outcome, and exits non-zero when a case goes the wrong way.
+
+Run from the repo root:
+    python -m benchmarks.research_keys
+    python -m benchmarks.research_keys --json
+"""
+
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Optional
+
+from research_cache import ResearchCache, research_topic_key, topic_similarity
+
+CASES = [
+    ("match", "AI for lead generation", "Lead generation with AI"),
+    ("match", "AI for lead generation", "ai for LEAD generation!"),
+    ("match", "AI agents for lead generation", "Lead generation with an AI agent"),
+    ("match", "Sales strategies for B2B startups", "B2B startup sales strategy"),
+    ("match", "The future of SaaS pricing", "SaaS pricing: the future"),
+    ("distinct", "Leading AI generators", "AI for lead generation"),
+    ("distinct", "AI news for founders", "New AI for founders"),
+    ("distinct", "Generating leads with AI", "AI lead generators"),
+    ("distinct", "AI for lead generation", "AI for lead generation in healthcare"),
+]
+
+
+def run_cases() -> List[Dict[str, Any]]:
+    results = []
+    for expect, stored, requested in CASES:
+        cache = ResearchCache(":memory:")
+        cache.put(stored, {"topic": stored})
+        hit = cache.get(requested, fresh_seconds=60, stale_seconds=60) is not None
+        results.append({
+            "expect": expect,
+            "stored": stored,
+            "requested": requested,
+            "stored_key": research_topic_key(stored),
+            "requested_key": research_topic_key(requested),
+            "similarity": round(topic_similarity(stored, requested), 2),
+            "outcome": "match" if hit else "distinct",
+        })
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_cases()
+    failed = [r for r in results if r["outcome"] != r["expect"]]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            mark = "ok  " if r["outcome"] == r["expect"] else "FAIL"
+            print(f"  {mark} {r['expect']:<9}{r['stored']!r} -> {r['requested']!r}")
+            print(f"       keys {r['stored_key']!r} / {r['requested_key']!r}, similarity {r['similarity']:.2f}")
+        print(f"{len(results) - len(failed)}/{len(results)} cases as expected")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
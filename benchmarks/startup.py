@@ -0,0 +1,98 @@
+"""
+Cold-start benchmark for the agent modules and the Streamlit app.
+
+Each measurement runs in a fresh interpreter so module caches don't hide
+import cost. Reports:
+  - import time of agent_nodes and agent
+  - time to build the model/extractor and compile the graph on first use
+  - time-to-first-render of streamlit_ui.py and the time of a rerun
+    (widget interaction), via Streamlit's AppTest harness
+
+Run from the repo root:
+    python -m benchmarks.startup --repeat 3
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List
+
+SNIPPETS = {
+    "import agent_nodes": """
+import time
+t = time.perf_counter()
+import agent_nodes
+print(time.perf_counter() - t)
+""",
+    "import agent": """
+import time
+t = time.perf_counter()
+import agent
+print(time.perf_counter() - t)
+""",
+    "first get_model + extractor": """
+import time
+import agent_nodes
+t = time.perf_counter()
+agent_nodes.get_model()
+agent_nodes.get_profile_extractor()
+print(time.perf_counter() - t)
+""",
+    "first get_enhanced_graph": """
+import time
+import agent
+t = time.perf_counter()
+agent.get_enhanced_graph()
+print(time.perf_counter() - t)
+""",
+    "streamlit first render": """
+import time
+from streamlit.testing.v1 import AppTest
+t = time.perf_counter()
+AppTest.from_file("streamlit_ui.py", default_timeout=120).run()
+print(time.perf_counter() - t)
+""",
+    "streamlit rerun": """
+import time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("streamlit_ui.py", default_timeout=120).run()
+t = time.perf_counter()
+at.run()
+print(time.perf_counter() - t)
+""",
+}
+
+
+def measure(snippet: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", snippet],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip().splitlines()
+    return float(out[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, snippet in SNIPPETS.items():
+        samples: List[float] = [measure(snippet) for _ in range(args.repeat)]
+        results[name] = {"median_s": statistics.median(samples), "max_s": max(samples)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'measurement':<30}{'median s':>10}{'max s':>10}")
+    for name, stats in results.items():
+        print(f"{name:<30}{stats['median_s']:>10.3f}{stats['max_s']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Shared, long-lived HTTP clients for the nodes.
+
+A single `requests.Session` with a keep-alive connection pool backs both the
+LinkedIn API calls and the Exa client, so repeated calls reuse TCP/TLS
+connections instead of paying the handshake every time. Clients are built
+lazily on first use and shared across threads.
+
+The async nodes get the same from an `httpx.AsyncClient` (and an `AsyncExa`
+built on it). An async client is bound to the event loop it was created on, so
+one is kept per running loop.
+
+Exa requests, and the Azure OpenAI requests made through
+`build_guarded_http_clients`, pass through the provider guards in
+resilience.py (rate limit, retry with backoff, circuit breaker).
+"""
+
+import os
+import json
+import asyncio
+import weakref
+import threading
+from typing import Any, Dict, Optional, Union
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from exa_py import Exa
+from exa_py.api import AsyncExa
+from exa_py.api import ExaJSONEncoder
+
+from resilience import AsyncGuardedTransport, GuardedTransport, get_guard
+
+load_dotenv()
+
+EXA_KEY = os.getenv("EXA_KEY")
+
+# Number of distinct hosts kept in the pool and connections kept per host
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
+# Connection cap of the async client; one event loop can keep many more requests in flight than a thread pool
+HTTP_ASYNC_MAX_CONNECTIONS = int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", "100"))
+
+
+def build_http_session(pool_connections: int = HTTP_POOL_CONNECTIONS, pool_maxsize: int = HTTP_POOL_MAXSIZE) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class PooledExa(Exa):
+    """`Exa` client that sends its regular (non-streaming) requests through a pooled session."""
+
+    def __init__(self, api_key: Optional[str], session: requests.Session, timeout: float = HTTP_TIMEOUT, **kwargs):
+        super().__init__(api_key=api_key, **kwargs)
+        self.session = session
+        self.timeout = timeout
+
+    def request(
+        self,
+        endpoint: str,
+        data: Optional[Union[Dict[str, Any], str]] = None,
+        method: str = "POST",
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        request_headers = {**self.headers, **(headers or {})}
+        streaming = (
+            (isinstance(data, dict) and data.get("stream"))
+            or (params and params.get("stream") == "true")
+            or request_headers.get("Accept") == "text/event-stream"
+        )
+        if streaming or method.upper() not in ("GET", "POST"):
+            return super().request(endpoint, data=data, method=method, params=params, headers=headers)
+
+        if isinstance(data, str) or data is None:
+            json_data = data
+        else:
+            json_data = json.dumps(data, cls=ExaJSONEncoder)
+        res = get_guard("exa").call(
+            self.session.request,
+            method.upper(),
+            self.base_url + endpoint,
+            data=json_data if method.upper() == "POST" else None,
+            params=params,
+            headers=request_headers,
+            timeout=self.timeout,
+        )
+        if res.status_code >= 400:
+            raise ValueError(f"Request failed with status code {res.status_code}: {res.text}")
+        return res.json()
+
+
+def build_async_http_client(max_connections: int = HTTP_ASYNC_MAX_CONNECTIONS) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=HTTP_POOL_MAXSIZE)
+    return httpx.AsyncClient(limits=limits, timeout=HTTP_TIMEOUT)
+
+
+class PooledAsyncExa(AsyncExa):
+    """`AsyncExa` client that sends its requests through a shared `httpx.AsyncClient`."""
+
+    def __init__(self, api_key: Optional[str], client: httpx.AsyncClient, **kwargs):
+        super().__init__(api_key=api_key, **kwargs)
+        # AsyncExa passes full URLs and headers on every request, so a shared client works as-is
+        self._client = client
+
+    async def async_request(self, endpoint: str, data=None, method: str = "POST", params=None, headers: Optional[Dict[str, str]] = None):
+        return await get_guard("exa").acall(
+            super().async_request, endpoint, data=data, method=method, params=params, headers=headers
+        )
+
+
+def build_guarded_http_clients(provider: str, timeout: float = HTTP_TIMEOUT) -> tuple:
+    """(httpx.Client, httpx.AsyncClient) whose requests go through the provider's guard."""
+    guard = get_guard(provider)
+    return (
+        httpx.Client(transport=GuardedTransport(guard), timeout=timeout),
+        httpx.AsyncClient(transport=AsyncGuardedTransport(guard), timeout=timeout),
+    )
+
+
+# ─────── Shared instances ──────────────────────────────────────────────────────────
+_lock = threading.Lock()
+_http_session: Optional[requests.Session] = None
+_exa_client: Optional[PooledExa] = None
+
+
+def get_http_session() -> requests.Session:
+    global _http_session
+    if _http_session is None:
+        with _lock:
+            if _http_session is None:
+                _http_session = build_http_session()
+    return _http_session
+
+
+def get_exa_client() -> PooledExa:
+    global _exa_client
+    if _exa_client is None:
+        session = get_http_session()
+        with _lock:
+            if _exa_client is None:
+                _exa_client = PooledExa(api_key=EXA_KEY, session=session)
+    return _exa_client
+
+
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_exa_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PooledAsyncExa]" = weakref.WeakKeyDictionary()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """The async HTTP client for the running event loop (must be called from a coroutine)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_http_clients.get(loop)
+        if client is None:
+            client = _async_http_clients[loop] = build_async_http_client()
+    return client
+
+
+def get_async_exa_client() -> PooledAsyncExa:
+    loop = asyncio.get_running_loop()
+    client = get_async_http_client()
+    with _lock:
+        exa = _async_exa_clients.get(loop)
+        if exa is None:
+            exa = _async_exa_clients[loop] = PooledAsyncExa(api_key=EXA_KEY, client=client)
+    return exa
+
+
+__all__ = [
+    "HTTP_TIMEOUT",
+    "PooledExa",
+    "PooledAsyncExa",
+    "build_http_session",
+    "build_async_http_client",
+    "build_guarded_http_clients",
+    "get_http_session",
+    "get_exa_client",
+    "get_async_http_client",
+    "get_async_exa_client",
+]
@@ -0,0 +1,220 @@
+"""
+Persistent on-disk cache for Exa `search_and_contents`, `search` and
+`get_contents` responses.
+
+Entries live in a small SQLite database keyed by the query text (the URL list
+for `get_contents`), domain filters, num_results and the day-rounded
+published-date window, so re-running a topic
+within the TTL never goes back to Exa. The cache is size-bounded and evicts the
+least recently used entries first.
+
+Caching is opt-in: set EXA_CACHE_ENABLED=true. Until then nothing is created
+on disk and every search goes to Exa.
+
+A response served from the cache is marked (see `served_from_cache`) so
+callers can trace it as a cache hit rather than as an Exa call.
+"""
+
+import os
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EXA_CACHE_ENABLED = os.getenv("EXA_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+EXA_CACHE_PATH = os.getenv("EXA_CACHE_PATH", os.path.join(".cache", "exa_cache.sqlite"))
+EXA_CACHE_TTL_SECONDS = int(os.getenv("EXA_CACHE_TTL_SECONDS", str(12 * 60 * 60)))
+EXA_CACHE_MAX_ENTRIES = int(os.getenv("EXA_CACHE_MAX_ENTRIES", "2000"))
+
+# Published-date kwargs are rounded to the day so runs on the same day share entries
+DATE_KWARGS = ("start_published_date", "end_published_date", "start_crawl_date", "end_crawl_date")
+
+
+def served_from_cache(response: Any) -> bool:
+    """True for a response `CachedExa` answered from the cache instead of calling Exa."""
+    return bool(getattr(response, "served_from_cache", False))
+
+
+def _mark_cached(response: Any) -> Any:
+    try:
+        response.served_from_cache = True
+    except AttributeError:
+        pass
+    return response
+
+
+def make_cache_key(query: str, search_kwargs: Dict[str, Any]) -> str:
+    normalized = {}
+    for name, value in search_kwargs.items():
+        if name in DATE_KWARGS and isinstance(value, str):
+            value = value[:10]
+        elif name in ("include_domains", "exclude_domains") and value:
+            value = sorted(value)
+        normalized[name] = value
+    payload = json.dumps({"query": query.strip(), "kwargs": normalized}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExaSearchCache:
+    """SQLite-backed TTL + LRU cache for Exa search responses."""
+
+    def __init__(self, path: str = EXA_CACHE_PATH, ttl_seconds: int = EXA_CACHE_TTL_SECONDS, max_entries: int = EXA_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS exa_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                response BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_exa_cache_last_accessed ON exa_cache (last_accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM exa_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM exa_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE exa_cache SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return pickle.loads(response)
+
+    def put(self, key: str, query: str, response: Any) -> None:
+        try:
+            blob = pickle.dumps(response)
+        except Exception:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO exa_cache (key, query, response, created_at, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, query, blob, now, now)
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def _evict_locked(self, now: float) -> None:
+        cur = self._conn.execute("DELETE FROM exa_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.evictions += cur.rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM exa_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                "DELETE FROM exa_cache WHERE key IN (SELECT key FROM exa_cache ORDER BY last_accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM exa_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM exa_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CachedExa:
+    """Drop-in wrapper around an `Exa` client that serves searches and contents from the cache."""
+
+    def __init__(self, exa: Any, cache: Optional[ExaSearchCache]):
+        self.exa = exa
+        self.cache = cache
+
+    def _key(self, method: str, query: str, kwargs: Dict[str, Any]) -> str:
+        # search_and_contents keeps its original keys so existing entries stay valid
+        return make_cache_key(query, kwargs if method == "search_and_contents" else {**kwargs, "_method": method})
+
+    def _call(self, method: str, query: str, request: Any, **kwargs):
+        if self.cache is None:
+            return getattr(self.exa, method)(request, **kwargs)
+        key = self._key(method, query, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _mark_cached(cached)
+        response = getattr(self.exa, method)(request, **kwargs)
+        self.cache.put(key, query, response)
+        return response
+
+    def search_and_contents(self, query: str, **search_kwargs):
+        return self._call("search_and_contents", query, query, **search_kwargs)
+
+    def search(self, query: str, **search_kwargs):
+        return self._call("search", query, query, **search_kwargs)
+
+    def get_contents(self, urls: List[str], **contents_kwargs):
+        return self._call("get_contents", "\n".join(urls), urls, **contents_kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self.exa, name)
+
+
+class CachedAsyncExa(CachedExa):
+    """`CachedExa` for an `AsyncExa` client: the client is awaited on a cache miss."""
+
+    async def _call(self, method: str, query: str, request: Any, **kwargs):
+        if self.cache is None:
+            return await getattr(self.exa, method)(request, **kwargs)
+        key = self._key(method, query, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _mark_cached(cached)
+        response = await getattr(self.exa, method)(request, **kwargs)
+        self.cache.put(key, query, response)
+        return response
+
+
+# ─────── Shared cache instance ─────────────────────────────────────────────────────
+exa_search_cache = ExaSearchCache() if EXA_CACHE_ENABLED else None
+
+
+__all__ = [
+    "ExaSearchCache",
+    "CachedExa",
+    "CachedAsyncExa",
+    "exa_search_cache",
+    "make_cache_key",
+    "served_from_cache",
+]
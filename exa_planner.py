@@ -0,0 +1,208 @@
+"""
+Incremental Exa result planning.
+
+Asking every query for a fixed, generous number of summarized results pays for
+summaries that are never read: competitor analysis asked for 3 x 25 and used
+20 posts. `ExaResultPlanner` instead
+
+  1. searches without contents (metadata only), starting with a small page per
+     query and asking each unfinished query for one more page per round, up
+     to the `num_results` in its search kwargs,
+  2. deduplicates results by canonical URL and title as they arrive, taking
+     them in rank order across queries,
+  3. stops as soon as it holds `target` unique, usable results, and
+  4. requests the contents (summaries, the expensive part) in a single
+     `get_contents` call for exactly those results.
+
+Exa has no result offset, so a later page re-runs the query with a larger
+`num_results` and only the results past the previous page are new. The
+planner is I/O-free: the sync and async nodes drive it with their own search
+runners (see `run_exa_plan` in agent_nodes.py and `arun_exa_plan` in async_nodes.py).
+All searches in one plan share their contents options.
+"""
+
+import os
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from article_dedup import canonicalize_url
+from text_utils import words
+from tracing import record_external_call
+
+load_dotenv()
+
+# Results requested per query in each round after the first. Override per run
+# with config["configurable"]["exa_page_size"].
+EXA_PAGE_SIZE = int(os.getenv("EXA_PAGE_SIZE", "5"))
+# Unique results consumed by competitor analysis (its prompt uses 20 posts) and
+# by article evaluation. Override with config["configurable"]["competitor_post_target"]
+# and ["article_fetch_target"].
+COMPETITOR_POST_TARGET = int(os.getenv("COMPETITOR_POST_TARGET", "20"))
+ARTICLE_FETCH_TARGET = int(os.getenv("ARTICLE_FETCH_TARGET", "10"))
+
+# Search kwargs that ask Exa for contents; the planner moves them to get_contents
+CONTENT_KWARGS = ("summary", "text", "highlights")
+# Keyword arguments `Exa.search` accepts (exa-py 2.x, pinned in requirements.txt); the
+# metadata searches pass only these, plus num_results and contents=False. Anything
+# else, such as the removed use_autoprompt, would make every search raise TypeError.
+METADATA_SEARCH_KWARGS = frozenset({
+    "include_domains", "exclude_domains", "start_crawl_date", "end_crawl_date",
+    "start_published_date", "end_published_date", "include_text", "exclude_text",
+    "type", "category", "flags", "moderation", "user_location",
+})
+
+
+def _has_url(result: Any) -> bool:
+    return bool(getattr(result, "url", None))
+
+
+@dataclass
+class _QueryState:
+    query: str
+    search_kwargs: Dict[str, Any]
+    cap: int
+    requested: int = 0
+    received: int = 0
+    done: bool = False
+
+
+class ExaResultPlanner:
+    """Round-by-round plan for a set of (query, search_kwargs) searches with one shared target."""
+
+    def __init__(self, searches: List[tuple], target: int, page_size: int = EXA_PAGE_SIZE, is_usable: Callable[[Any], bool] = _has_url):
+        self.target = max(0, int(target))
+        self.page_size = max(1, int(page_size))
+        self.is_usable = is_usable
+        self.contents_kwargs: Dict[str, Any] = {}
+        self._queries: List[_QueryState] = []
+        for query, search_kwargs in searches:
+            self.contents_kwargs = self.contents_kwargs or {k: v for k, v in search_kwargs.items() if k in CONTENT_KWARGS}
+            metadata_kwargs = {k: v for k, v in search_kwargs.items() if k in METADATA_SEARCH_KWARGS}
+            cap = int(search_kwargs.get("num_results", 10))
+            self._queries.append(_QueryState(query, metadata_kwargs, cap))
+        self._pending: List[_QueryState] = []
+        self._seen: set = set()
+        self.selected: List[Any] = []
+        self.outcomes: List[Dict[str, Any]] = []
+        self.fetched = 0
+        self.duplicates = 0
+        self.unusable = 0
+        self.summarized = 0
+
+    @property
+    def satisfied(self) -> bool:
+        return len(self.selected) >= self.target
+
+    @property
+    def next_round_size(self) -> int:
+        """Number of searches the next `next_searches` round will make."""
+        return 0 if self.satisfied else sum(1 for q in self._queries if not q.done)
+
+    def next_searches(self) -> List[tuple]:
+        """The next round of metadata-only (query, kwargs) searches; empty when the plan is finished."""
+        self._pending = [] if self.satisfied else [q for q in self._queries if not q.done]
+        if not self._pending:
+            return []
+        # The first page is sized so one round can meet the target when queries don't overlap
+        first_page = max(self.page_size, math.ceil(self.target / len(self._pending)))
+        searches = []
+        for state in self._pending:
+            state.requested = min(state.cap, state.requested + (self.page_size if state.requested else first_page))
+            searches.append((state.query, {**state.search_kwargs, "num_results": state.requested, "contents": False}))
+        return searches
+
+    def add_outcomes(self, outcomes: List[Dict[str, Any]]) -> None:
+        """Take the outcome dicts of the last `next_searches` round, in the same order."""
+        pages = []
+        for state, outcome in zip(self._pending, outcomes):
+            self.outcomes.append(outcome)
+            results = outcome["results"]
+            page = results[state.received:]
+            state.received = max(state.received, len(results))
+            self.fetched += len(page)
+            # A failed, short or capped query has nothing more to give
+            state.done = outcome["status"] != "ok" or len(results) < state.requested or state.requested >= state.cap
+            pages.append(page)
+        # Interleave by rank so every query's best results are considered first
+        for rank in range(max((len(p) for p in pages), default=0)):
+            for page in pages:
+                if rank < len(page) and not self.satisfied:
+                    self._consider(page[rank])
+        self._pending = []
+
+    def _consider(self, result: Any) -> None:
+        if not self.is_usable(result):
+            self.unusable += 1
+            return
+        keys = {("url", canonicalize_url(getattr(result, "url", "") or ""))}
+        title = " ".join(words(getattr(result, "title", "") or ""))
+        if len(title.split()) >= 4:
+            keys.add(("title", title))
+        if keys & self._seen:
+            self.duplicates += 1
+            return
+        self._seen |= keys
+        self.selected.append(result)
+
+    def contents_request(self) -> tuple:
+        """(urls, kwargs) for the single get_contents call; no urls when no contents were asked for."""
+        if not self.contents_kwargs or not self.selected:
+            return [], {}
+        return [r.url for r in self.selected], dict(self.contents_kwargs)
+
+    def finish(self, contents: Optional[List[Any]]) -> List[Any]:
+        """The consumed results, with contents where get_contents returned them.
+
+        `contents` is None when the call failed or was not needed; the metadata
+        results are returned as they are.
+        """
+        if contents is None:
+            return list(self.selected)
+        by_url = {canonicalize_url(r.url): r for r in contents if getattr(r, "url", None)}
+        consumed = [by_url.get(canonicalize_url(r.url), r) for r in self.selected]
+        self.summarized = sum(1 for r in self.selected if canonicalize_url(r.url) in by_url)
+        return consumed
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "searches": len(self.outcomes),
+            "fetched": self.fetched,
+            "duplicates": self.duplicates,
+            "unusable": self.unusable,
+            "consumed": len(self.selected),
+            "summarized": self.summarized,
+            "target": self.target,
+            "failed": sum(1 for o in self.outcomes if o["status"] != "ok"),
+        }
+
+
+def record_plan(label: str, planner: ExaResultPlanner, started_at: float, seconds: float) -> Dict[str, Any]:
+    """Record a plan's counts as an "exa_plan" span on the current trace and return them."""
+    report = planner.report()
+    record_external_call("exa_plan", label, started_at, seconds, **report)
+    return report
+
+
+def format_plan_report(label: str, report: Dict[str, Any]) -> str:
+    line = (
+        f"Exa {label}: fetched {report['fetched']} results in {report['searches']} searches, "
+        f"consumed {report['consumed']}/{report['target']} ({report['summarized']} summarized)"
+    )
+    if report["duplicates"] or report["unusable"]:
+        line += f"; dropped {report['duplicates']} duplicates, {report['unusable']} unusable"
+    if report["failed"]:
+        line = f"⚠️ {line}; {report['failed']}/{report['searches']} searches failed"
+    return line
+
+
+__all__ = [
+    "EXA_PAGE_SIZE",
+    "COMPETITOR_POST_TARGET",
+    "ARTICLE_FETCH_TARGET",
+    "ExaResultPlanner",
+    "record_plan",
+    "format_plan_report",
+]
@@ -0,0 +1,312 @@
+"""
+Opt-in, content-addressed cache for the pipeline's LLM calls.
+
+Responses are keyed by a hash of the model name, the sampling parameters and the
+fully formatted prompt, so an identical prompt (e.g. re-evaluating an article
+with the same URL and summary) is never paid for twice. Lookups go through an
+in-process LRU first and then a persistent SQLite layer; both are bounded in
+size and the disk layer also evicts entries by age.
+
+Caching is enabled with LLM_CACHE_ENABLED=true and applies only to the prompt
+types listed in LLM_CACHE_PROMPT_TYPES. Callers can pass a `cacheable` check so a
+response the pipeline cannot use (e.g. an article evaluation without a verdict)
+is returned but not cached, and the next run asks the model again.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, BaseMessage
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite"))
+LLM_CACHE_MAX_AGE_SECONDS = int(os.getenv("LLM_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+
+# Prompt types that are deterministic enough to cache. Content creation and
+# optimization are left out by default so a rerun can produce a fresh post.
+LLM_CACHE_PROMPT_TYPES = {
+    t.strip()
+    for t in os.getenv(
+        "LLM_CACHE_PROMPT_TYPES",
+        "summary,topic_generation,topic_selection,article_evaluation,competitor_analysis"
+    ).split(",")
+    if t.strip()
+}
+
+# Model attributes that change the output for the same prompt
+SAMPLING_PARAMS = ("temperature", "top_p", "max_tokens", "seed", "n", "frequency_penalty", "presence_penalty", "stop")
+
+
+def model_fingerprint(model: Any) -> Dict[str, Any]:
+    fingerprint = {
+        "model": getattr(model, "deployment_name", None) or getattr(model, "model_name", None) or type(model).__name__
+    }
+    for param in SAMPLING_PARAMS:
+        fingerprint[param] = getattr(model, param, None)
+    return fingerprint
+
+
+def make_cache_key(model: Any, messages: List[BaseMessage]) -> str:
+    payload = json.dumps(
+        {
+            "model": model_fingerprint(model),
+            "messages": [(m.type, m.content) for m in messages],
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-level (in-process LRU + SQLite) cache of LLM response text."""
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_age_seconds: int = LLM_CACHE_MAX_AGE_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        prompt_types: Optional[set] = None,
+    ):
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.prompt_types = LLM_CACHE_PROMPT_TYPES if prompt_types is None else set(prompt_types)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                prompt_type TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_accessed ON llm_cache (last_accessed)")
+        self._conn.commit()
+
+    def enabled_for(self, prompt_type: str) -> bool:
+        return prompt_type in self.prompt_types
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                content, created_at = entry
+                if now - created_at <= self.max_age_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return content
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT content, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            content, created_at = row
+            self._conn.execute("UPDATE llm_cache SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember_locked(key, content, created_at)
+            self.disk_hits += 1
+            return content
+
+    def put(self, key: str, prompt_type: str, content: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember_locked(key, content, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, prompt_type, content, created_at, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, prompt_type, content, now, now)
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def _remember_locked(self, key: str, content: str, created_at: float) -> None:
+        self._memory[key] = (content, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_locked(self, now: float) -> None:
+        cur = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.max_age_seconds,))
+        self.evictions += cur.rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            memory_entries = len(self._memory)
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "memory_entries": memory_entries,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+# ─────── Shared cache instance ─────────────────────────────────────────────────────
+llm_response_cache = LLMResponseCache() if LLM_CACHE_ENABLED else None
+
+
+def _active_cache(prompt_type: str, cache: Optional[LLMResponseCache]) -> Optional[LLMResponseCache]:
+    cache = cache or llm_response_cache
+    return cache if cache is not None and cache.enabled_for(prompt_type) else None
+
+
+def _lookup(cache: LLMResponseCache, model: Any, inputs: List[List[BaseMessage]]) -> tuple:
+    """(keys, responses with cache hits filled in, indices still to send to the model)."""
+    keys = [make_cache_key(model, messages) for messages in inputs]
+    responses: List[Any] = [None] * len(inputs)
+    pending = []
+    for i, key in enumerate(keys):
+        content = cache.get(key)
+        if content is not None:
+            responses[i] = AIMessage(content=content)
+        else:
+            pending.append(i)
+    return keys, responses, pending
+
+
+def _store(
+    cache: LLMResponseCache,
+    prompt_type: str,
+    keys: List[str],
+    responses: List[Any],
+    pending: List[int],
+    fresh: List[Any],
+    cacheable: Optional[Callable[[str], bool]] = None,
+) -> List[Any]:
+    """Fill the model's responses for `pending` into `responses` and cache the usable ones."""
+    for i, response in zip(pending, fresh):
+        responses[i] = response
+        if isinstance(response, Exception) or (cacheable is not None and not cacheable(response.content)):
+            continue
+        cache.put(keys[i], prompt_type, response.content)
+    return responses
+
+
+def cached_invoke(
+    model: Any,
+    prompt_type: str,
+    messages: List[BaseMessage],
+    cache: Optional[LLMResponseCache] = None,
+    cacheable: Optional[Callable[[str], bool]] = None,
+):
+    """`model.invoke(messages)` that serves and records responses through the cache."""
+    cache = _active_cache(prompt_type, cache)
+    if cache is None:
+        return model.invoke(messages)
+    keys, responses, pending = _lookup(cache, model, [messages])
+    if pending:
+        _store(cache, prompt_type, keys, responses, pending, [model.invoke(messages)], cacheable)
+    return responses[0]
+
+
+def cached_batch(
+    model: Any,
+    prompt_type: str,
+    inputs: List[List[BaseMessage]],
+    config: Optional[Dict[str, Any]] = None,
+    return_exceptions: bool = False,
+    cache: Optional[LLMResponseCache] = None,
+    cacheable: Optional[Callable[[str], bool]] = None,
+) -> List[Any]:
+    """`model.batch(inputs)` that only sends the inputs missing from the cache."""
+    cache = _active_cache(prompt_type, cache)
+    if cache is None:
+        return model.batch(inputs, config=config, return_exceptions=return_exceptions)
+    keys, responses, pending = _lookup(cache, model, inputs)
+    if pending:
+        fresh = model.batch([inputs[i] for i in pending], config=config, return_exceptions=return_exceptions)
+        _store(cache, prompt_type, keys, responses, pending, fresh, cacheable)
+    return responses
+
+
+async def cached_ainvoke(
+    model: Any,
+    prompt_type: str,
+    messages: List[BaseMessage],
+    cache: Optional[LLMResponseCache] = None,
+    cacheable: Optional[Callable[[str], bool]] = None,
+):
+    """Async `cached_invoke`: awaits `model.ainvoke(messages)` on a cache miss."""
+    cache = _active_cache(prompt_type, cache)
+    if cache is None:
+        return await model.ainvoke(messages)
+    keys, responses, pending = _lookup(cache, model, [messages])
+    if pending:
+        _store(cache, prompt_type, keys, responses, pending, [await model.ainvoke(messages)], cacheable)
+    return responses[0]
+
+
+async def cached_abatch(
+    model: Any,
+    prompt_type: str,
+    inputs: List[List[BaseMessage]],
+    config: Optional[Dict[str, Any]] = None,
+    return_exceptions: bool = False,
+    cache: Optional[LLMResponseCache] = None,
+    cacheable: Optional[Callable[[str], bool]] = None,
+) -> List[Any]:
+    """Async `cached_batch`: awaits `model.abatch` for the inputs missing from the cache."""
+    cache = _active_cache(prompt_type, cache)
+    if cache is None:
+        return await model.abatch(inputs, config=config, return_exceptions=return_exceptions)
+    keys, responses, pending = _lookup(cache, model, inputs)
+    if pending:
+        fresh = await model.abatch([inputs[i] for i in pending], config=config, return_exceptions=return_exceptions)
+        _store(cache, prompt_type, keys, responses, pending, fresh, cacheable)
+    return responses
+
+
+__all__ = [
+    "LLMResponseCache",
+    "llm_response_cache",
+    "cached_invoke",
+    "cached_batch",
+    "cached_ainvoke",
+    "cached_abatch",
+    "make_cache_key",
+]
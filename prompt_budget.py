@@ -0,0 +1,297 @@
+"""
+Token budgets for the large prompts, with extractive compaction of their inputs.
+
+The competitor-analysis and content-creation prompts inline Exa summaries, web
+research, the user profile and competitor insights, so their size grows with
+whatever search returned. Each prompt type has a token budget (measured with
+the local estimator in text_utils). Inputs that would push a prompt over
+budget are compacted before formatting:
+
+  1. redundant sentences (near-duplicates of an earlier one) are dropped
+  2. the remaining sentences are ranked by how central they are to the whole
+     input and how much they overlap the topic, and the best ones are kept,
+     in their original order, until the budget is met
+
+Splitting, de-duplication and ranking happen once per input (`rank_documents`);
+cutting the ranked sentences to a budget is then a cheap greedy pass. The
+builders size the inputs from the template's exact overhead, and
+`fit_to_budget` re-measures the rendered prompt and, only if it is still over,
+shrinks the input budget, dropping the lowest-ranked sentences and items,
+until the whole prompt fits.
+
+Every budgeted prompt reports its estimated token count, the budget and the
+pre-compaction size; the count is also recorded as a "prompt" span on the run
+trace. A prompt still over budget after compaction is reported as a failure.
+"""
+
+import os
+import json
+import math
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from text_utils import content_words, estimate_tokens, jaccard, split_sentences
+from tracing import record_external_call
+
+load_dotenv()
+
+PROMPT_TOKEN_BUDGETS = {
+    "competitor_analysis": int(os.getenv("COMPETITOR_ANALYSIS_TOKEN_BUDGET", "3500")),
+    "content_creation": int(os.getenv("CONTENT_CREATION_TOKEN_BUDGET", "2500")),
+    # The fast-mode prompt carries the optimization instructions as well
+    "content_creation_fast": int(os.getenv("FAST_CONTENT_CREATION_TOKEN_BUDGET", "2800")),
+}
+# Share of the competitor-analysis input budget reserved for the web research text
+WEB_RESEARCH_BUDGET_SHARE = float(os.getenv("WEB_RESEARCH_BUDGET_SHARE", "0.3"))
+# Sentences whose word sets overlap an earlier sentence at least this much are dropped
+REDUNDANT_SENTENCE_SIMILARITY = float(os.getenv("REDUNDANT_SENTENCE_SIMILARITY", "0.7"))
+# Most recent kept sentences compared per shared term, which bounds the redundancy pass
+# at O(n) comparisons on inputs where every sentence shares common terms
+REDUNDANT_SENTENCE_WINDOW = int(os.getenv("REDUNDANT_SENTENCE_WINDOW", "32"))
+
+
+# ─────── Sentence-level compaction ─────────────────────────────────────────────────
+def drop_redundant_sentences(
+    sentences: List[str],
+    threshold: float = REDUNDANT_SENTENCE_SIMILARITY,
+    window: int = REDUNDANT_SENTENCE_WINDOW,
+) -> List[int]:
+    """Indexes of the sentences that are not near-duplicates of an earlier one.
+
+    Candidates are found by prefix filtering rather than comparing every pair:
+    with each term set ordered rarest first, two sets whose Jaccard similarity
+    reaches `threshold` share a term among the first |s| - ceil(threshold * |s|) + 1
+    terms of each, so only kept sentences indexed under one of those terms are
+    compared, and of those only the last `window` per term and the ones whose
+    size allows the threshold.
+    """
+    bags = [set(content_words(s)) for s in sentences]
+    frequency = Counter(term for bag in bags for term in bag)
+    kept: List[int] = []
+    index: Dict[str, List[int]] = defaultdict(list)
+    kept_empty = False
+    for i, terms in enumerate(bags):
+        if not terms:
+            # Sentences without content words are all alike; keep the first
+            if not kept_empty:
+                kept.append(i)
+                kept_empty = True
+            continue
+        ordered = sorted(terms, key=lambda t: (frequency[t], t))
+        prefix = ordered[:len(ordered) - math.ceil(threshold * len(ordered)) + 1]
+        low, high = threshold * len(terms), len(terms) / threshold if threshold > 0 else math.inf
+        candidates = {k for term in prefix for k in index[term][-window:] if low <= len(bags[k]) <= high}
+        if any(jaccard(terms, bags[k]) >= threshold for k in candidates):
+            continue
+        kept.append(i)
+        for term in prefix:
+            index[term].append(i)
+    return kept
+
+
+def select_sentences(sentences: List[str], budget_tokens: int, focus: str = "") -> List[int]:
+    """Pick the most central, on-topic sentences that fit in `budget_tokens`; returns indexes in input order."""
+    order, costs = rank_sentences(sentences, focus)
+    return take_ranked(order, costs, budget_tokens)
+
+
+def rank_sentences(sentences: List[str], focus: str = "") -> tuple:
+    """(indexes best first, token cost of each sentence); ranking is independent of the budget."""
+    focus_terms = set(content_words(focus))
+    bags = [set(content_words(s)) for s in sentences]
+    frequency = Counter(term for bag in bags for term in bag)
+
+    def score(i: int) -> float:
+        terms = bags[i]
+        if not terms:
+            return 0.0
+        centrality = sum(frequency[t] for t in terms) / len(terms)
+        return centrality + 2.0 * len(terms & focus_terms)
+
+    order = sorted(range(len(sentences)), key=score, reverse=True)
+    return order, [estimate_tokens(s) + 1 for s in sentences]
+
+
+def take_ranked(order: List[int], costs: List[int], budget_tokens: int) -> List[int]:
+    """Greedily take ranked sentences that fit in `budget_tokens`; returns indexes in input order."""
+    chosen, used = [], 0
+    for i in order:
+        if used + costs[i] <= budget_tokens:
+            chosen.append(i)
+            used += costs[i]
+    return sorted(chosen)
+
+
+@dataclass
+class RankedDocuments:
+    """Documents split, de-duplicated and ranked once, to be cut to any budget with `take`."""
+    documents: List[str]
+    sentences: List[str]
+    owners: List[int]
+    order: List[int]
+    costs: List[int]
+    tokens: int
+
+    def take(self, budget_tokens: int) -> List[str]:
+        if self.tokens <= budget_tokens:
+            return list(self.documents)
+        compacted: List[List[str]] = [[] for _ in self.documents]
+        for i in take_ranked(self.order, self.costs, budget_tokens):
+            compacted[self.owners[i]].append(self.sentences[i])
+        return [" ".join(parts) for parts in compacted]
+
+
+def rank_documents(documents: List[str], focus: str = "") -> RankedDocuments:
+    """Prepare several texts for compaction against one shared budget; sentences repeated across documents are kept once."""
+    owners, sentences = [], []
+    for doc_index, document in enumerate(documents):
+        for sentence in split_sentences(document):
+            owners.append(doc_index)
+            sentences.append(sentence)
+    unique = drop_redundant_sentences(sentences)
+    unique_sentences = [sentences[i] for i in unique]
+    order, costs = rank_sentences(unique_sentences, focus)
+    return RankedDocuments(
+        documents=list(documents),
+        sentences=unique_sentences,
+        owners=[owners[i] for i in unique],
+        order=order,
+        costs=costs,
+        tokens=sum(estimate_tokens(d) for d in documents),
+    )
+
+
+def compact_text(text: str, budget_tokens: int, focus: str = "") -> str:
+    if estimate_tokens(text) <= budget_tokens:
+        return text
+    return rank_documents([text], focus).take(budget_tokens)[0]
+
+
+def compact_documents(documents: List[str], budget_tokens: int, focus: str = "") -> List[str]:
+    """Compact several texts against one shared budget; sentences repeated across documents are kept once."""
+    if sum(estimate_tokens(d) for d in documents) <= budget_tokens:
+        return list(documents)
+    return rank_documents(documents, focus).take(budget_tokens)
+
+
+# ─────── Structured inputs ─────────────────────────────────────────────────────────
+def drop_empty_fields(value: Any) -> Any:
+    """Recursively remove None, empty strings and empty collections from JSON-like data."""
+    if isinstance(value, dict):
+        cleaned = {k: drop_empty_fields(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        cleaned = [drop_empty_fields(v) for v in value]
+        return [v for v in cleaned if v not in (None, "", [], {})]
+    return value
+
+
+def compact_json(value: Any, budget_tokens: int, focus: str = "", max_list_items: int = 3) -> str:
+    """`json.dumps(value)` without empty fields, shortened until it fits `budget_tokens`.
+
+    Lists are cut to `max_list_items` and long strings compacted; both limits are
+    halved until the dump fits, then trailing top-level fields are dropped. The
+    result is "{}" when nothing fits.
+    """
+    value = drop_empty_fields(value)
+    dumped = json.dumps(value)
+    if estimate_tokens(dumped) <= budget_tokens:
+        return dumped
+
+    def shorten(v: Any, string_budget: int, list_items: int) -> Any:
+        if isinstance(v, dict):
+            return {k: shorten(x, string_budget, list_items) for k, x in v.items()}
+        if isinstance(v, list):
+            return [shorten(x, string_budget, list_items) for x in v[:list_items]]
+        if isinstance(v, str):
+            return compact_text(v, string_budget, focus) or v[:string_budget * 4]
+        return v
+
+    strings = max(1, dumped.count('"') // 2)
+    string_budget, list_items = max(8, budget_tokens // strings), max_list_items
+    while True:
+        shortened = shorten(value, string_budget, list_items)
+        dumped = json.dumps(shortened)
+        if estimate_tokens(dumped) <= budget_tokens:
+            return dumped
+        if string_budget <= 1 and list_items <= 1:
+            break
+        string_budget, list_items = max(1, string_budget // 2), max(1, list_items // 2)
+
+    if isinstance(shortened, dict):
+        keys = list(shortened)
+        while keys:
+            keys.pop()
+            dumped = json.dumps({k: shortened[k] for k in keys})
+            if estimate_tokens(dumped) <= budget_tokens:
+                return dumped
+    return "{}"
+
+
+# ─────── Whole-prompt fitting ──────────────────────────────────────────────────────
+def fit_to_budget(render: Callable[[int], str], budget_tokens: int, input_budget: int) -> str:
+    """Render with a shrinking input budget until the whole prompt fits `budget_tokens`.
+
+    `render(input_budget)` compacts the prompt's inputs to about `input_budget`
+    tokens and formats the prompt. Each round cuts the input budget by the
+    overshoot (at least a tenth), so lower-ranked sentences and items go first.
+    Stops when the prompt fits or no input budget is left.
+    """
+    input_budget = max(0, input_budget)
+    prompt = render(input_budget)
+    while input_budget > 0:
+        over = estimate_tokens(prompt) - budget_tokens
+        if over <= 0:
+            break
+        input_budget = max(0, input_budget - max(over, input_budget // 10, 1))
+        prompt = render(input_budget)
+    return prompt
+
+
+# ─────── Usage reporting ───────────────────────────────────────────────────────────
+def prompt_usage(prompt_type: str, prompt: str, original_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """Estimate a formatted prompt's tokens against its budget and record it on the current trace."""
+    tokens = estimate_tokens(prompt)
+    budget = PROMPT_TOKEN_BUDGETS.get(prompt_type)
+    usage = {
+        "prompt_type": prompt_type,
+        "tokens": tokens,
+        "budget": budget,
+        "original_tokens": original_tokens if original_tokens is not None else tokens,
+        "over_budget": bool(budget) and tokens > budget,
+    }
+    record_external_call("prompt", prompt_type, time.time(), 0.0, status="over_budget" if usage["over_budget"] else "ok", **usage)
+    return usage
+
+
+def format_prompt_usage(usage: Dict[str, Any]) -> str:
+    if usage.get("over_budget"):
+        return (
+            f"⚠️ Prompt {usage['prompt_type']} over budget: ~{usage['tokens']} tokens "
+            f"(budget {usage['budget']}) after compacting from ~{usage['original_tokens']}"
+        )
+    line = f"Prompt {usage['prompt_type']}: ~{usage['tokens']} tokens"
+    if usage["budget"]:
+        line += f" (budget {usage['budget']})"
+    if usage["original_tokens"] > usage["tokens"]:
+        line += f", compacted from ~{usage['original_tokens']}"
+    return line
+
+
+__all__ = [
+    "PROMPT_TOKEN_BUDGETS",
+    "WEB_RESEARCH_BUDGET_SHARE",
+    "compact_text",
+    "compact_documents",
+    "RankedDocuments",
+    "rank_documents",
+    "compact_json",
+    "fit_to_budget",
+    "drop_empty_fields",
+    "prompt_usage",
+    "format_prompt_usage",
+]
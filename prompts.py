@@ -99,6 +99,16 @@ PLEASE STRICTLY ADHERE TO THIS FORMAT
 '''
 
 
+# Topic generation that also picks the topic to write about, saving the TOPIC_SELECTION_PROMPT call
+FUSED_TOPIC_GENERATION_INSTRUCTION = TOPIC_GENERATION_INSTRUCTION + '''
+**Best Topic Selection:**
+After the topics, select the SINGLE BEST topic from your list for immediate LinkedIn content creation.
+Weigh engagement potential (30%), authority match with the user's expertise (25%), market demand (25%)
+and content opportunity (20%).
+Return it exactly as written in your list, wrapped in `<best_topic>` tags on its own line:
+<best_topic>Topic 2</best_topic>
+
+'''
 
 TOPIC_SELECTION_PROMPT = """
 You are an expert LinkedIn content strategist. Your task is to evaluate and select the SINGLE BEST topic from the provided list for immediate LinkedIn content creation.
@@ -524,3 +534,20 @@ You are a professional, strategic LinkedIn content creator. Your mission is to c
 ————————————
 Produce the fully formatted LinkedIn post as described—ready for copy-paste into the LinkedIn composer. Do not include any commentary or extra explanation. Only output the post text itself.
 """
+
+# Fast mode: one call writes the post and applies the CONTENT_OPTIMIZATION_PROMPT pass itself
+FAST_CONTENT_CREATION_PROMPT = ENHANCED_CONTENT_CREATION_PROMPT + """
+————————————
+✨ OPTIMIZATION PASS (apply before you answer)
+————————————
+Review your post as a viral LinkedIn optimization expert would, and output only the improved version:
+• **Hook**: the first 2 lines must stop the scroll (compelling statistic, question or bold statement).
+• **Structure**: hook → context/problem → main insight or story → key takeaway → call-to-action question.
+• **Engagement**: 2–3 discussion-worthy questions, a professional but debatable viewpoint, personal experience.
+• **Formatting**: mobile-friendly line breaks, paragraphs of 2–3 lines, 2–4 relevant emojis, **bold** key points.
+• **Hashtags**: 3–5 relevant hashtags mixing trending and niche, placed at the end.
+• **CTA**: end with a specific, actionable question.
+• Maximum 3,000 characters.
+
+ONLY return the final optimized post exactly as it should appear on LinkedIn—no drafts, explanations or headers.
+"""
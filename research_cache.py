@@ -0,0 +1,249 @@
+"""
+Cross-user cache of topic-level competitor research.
+
+`analyze_competitor_content` depends only on the selected topic, so its
+output (`competitor_insights` and `web_research_data`) is shared between
+users. Entries are keyed by a normalized form of the topic (lowercased, stop
+words removed, plurals folded and sorted), so "AI for lead generation" and
+"Lead generation with AI" share one entry. On a hit the stored topic is
+compared with the requested one as written (`topic_similarity`), and a pair
+below RESEARCH_CACHE_MIN_TOPIC_SIMILARITY counts as a miss, so a key
+collision never serves research for a different topic.
+
+Each entry is
+  - fresh for RESEARCH_CACHE_FRESH_SECONDS: served as is,
+  - stale until RESEARCH_CACHE_STALE_SECONDS: served at once while a single
+    background refresh recomputes it (stale-while-revalidate),
+  - expired after that: recomputed in the request.
+
+The cache is opt-in (RESEARCH_CACHE_ENABLED=true), since it serves one user's
+research to others. `get_research_cache` opens it on first use, so importing
+the agent never creates the database.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from text_utils import STOP_WORDS, stem, words
+
+load_dotenv()
+
+RESEARCH_CACHE_ENABLED = os.getenv("RESEARCH_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+RESEARCH_CACHE_PATH = os.getenv("RESEARCH_CACHE_PATH", os.path.join(".cache", "research_cache.sqlite"))
+RESEARCH_CACHE_MAX_ENTRIES = int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "1000"))
+# Freshness windows; override per run with config["configurable"]["research_cache_fresh_seconds"]
+# and ["research_cache_stale_seconds"].
+RESEARCH_CACHE_FRESH_SECONDS = int(os.getenv("RESEARCH_CACHE_FRESH_SECONDS", str(6 * 60 * 60)))
+RESEARCH_CACHE_STALE_SECONDS = int(os.getenv("RESEARCH_CACHE_STALE_SECONDS", str(48 * 60 * 60)))
+# Threads running background refreshes, shared by all runs in the process
+RESEARCH_CACHE_REFRESH_WORKERS = int(os.getenv("RESEARCH_CACHE_REFRESH_WORKERS", "2"))
+# Least `topic_similarity` between the stored and the requested topic for a hit to be served
+RESEARCH_CACHE_MIN_TOPIC_SIMILARITY = float(os.getenv("RESEARCH_CACHE_MIN_TOPIC_SIMILARITY", "0.8"))
+
+
+def research_topic_key(topic: str) -> str:
+    """Normalized topic form; unlike `content_words`, short terms such as "ai" and "b2b" are kept."""
+    terms = sorted({stem(w) for w in words(topic) if w not in STOP_WORDS})
+    return " ".join(terms)
+
+
+def topic_similarity(a: str, b: str) -> float:
+    """0..1 similarity of two topics' words as written (unstemmed), ignoring order and stop words.
+
+    Plural variants stay close ("sales strategy" / "sales strategies" ~0.87);
+    words the key normalization folded together but that are spelled apart
+    pull it down.
+    """
+    def written(topic: str) -> str:
+        return " ".join(sorted({w for w in words(topic) if w not in STOP_WORDS}))
+    return SequenceMatcher(None, written(a), written(b)).ratio()
+
+
+class ResearchCache:
+    """SQLite-backed cache of research results with fresh/stale windows and background refresh."""
+
+    def __init__(
+        self,
+        path: str = RESEARCH_CACHE_PATH,
+        max_entries: int = RESEARCH_CACHE_MAX_ENTRIES,
+        min_topic_similarity: float = RESEARCH_CACHE_MIN_TOPIC_SIMILARITY,
+    ):
+        self.max_entries = max_entries
+        self.min_topic_similarity = min_topic_similarity
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.topic_mismatches = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refreshing: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS research_cache (
+                key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_research_cache_last_accessed ON research_cache (last_accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(topic: str) -> str:
+        return hashlib.sha256(research_topic_key(topic).encode("utf-8")).hexdigest()
+
+    def get(self, topic: str, fresh_seconds: float, stale_seconds: float) -> Optional[tuple]:
+        """(value, "fresh" | "stale", age in seconds), or None on a miss, an expired entry or a topic mismatch."""
+        key, now = self.make_key(topic), time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, topic FROM research_cache WHERE key = ?", (key,)
+            ).fetchone()
+            age = now - row[1] if row else None
+            if row is None or age > max(fresh_seconds, stale_seconds):
+                self.misses += 1
+                return None
+            # Same key, but the topics as written differ too much: recompute (and replace) instead
+            if topic_similarity(topic, row[2]) < self.min_topic_similarity:
+                self.misses += 1
+                self.topic_mismatches += 1
+                return None
+            self._conn.execute("UPDATE research_cache SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            status = "fresh" if age <= fresh_seconds else "stale"
+            if status == "fresh":
+                self.fresh_hits += 1
+            else:
+                self.stale_hits += 1
+        return json.loads(row[0]), status, age
+
+    def put(self, topic: str, value: Dict[str, Any]) -> None:
+        try:
+            blob = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research_cache (key, topic, value, created_at, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                (self.make_key(topic), topic, blob, now, now)
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def refresh_in_background(self, topic: str, compute: Callable[[], Optional[Dict[str, Any]]]) -> bool:
+        """Recompute a stale entry on a worker thread; False when a refresh for it is already running.
+
+        `compute` returns the new value, or None when the result should not be cached.
+        """
+        key = self.make_key(topic)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=RESEARCH_CACHE_REFRESH_WORKERS, thread_name_prefix="research-refresh")
+
+        def refresh():
+            try:
+                value = compute()
+                if value is not None:
+                    self.put(topic, value)
+                with self._lock:
+                    self.refreshes += 1
+            except Exception:
+                with self._lock:
+                    self.refresh_errors += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
+        return True
+
+    def _evict_locked(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM research_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM research_cache WHERE key IN (SELECT key FROM research_cache ORDER BY last_accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM research_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM research_cache").fetchone()
+            hits = self.fresh_hits + self.stale_hits
+            lookups = hits + self.misses
+            return {
+                "fresh_hits": self.fresh_hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "topic_mismatches": self.topic_mismatches,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "entries": entries,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+
+def format_research_cache_hit(topic: str, status: str, age: float, refreshing: bool) -> str:
+    line = f"Competitor research for '{topic}' served from the shared cache ({status}, {age / 60:.0f} min old)"
+    return line + "; refreshing in the background" if refreshing else line
+
+
+# ─────── Shared cache instance ─────────────────────────────────────────────────────
+_UNSET = object()
+_research_cache: Any = _UNSET
+_research_cache_lock = threading.Lock()
+
+
+def get_research_cache() -> Optional[ResearchCache]:
+    """The process-wide cache, opened on first use; None when RESEARCH_CACHE_ENABLED is off."""
+    global _research_cache
+    if _research_cache is _UNSET:
+        with _research_cache_lock:
+            if _research_cache is _UNSET:
+                _research_cache = ResearchCache() if RESEARCH_CACHE_ENABLED else None
+    return _research_cache
+
+
+def set_research_cache(cache: Optional[ResearchCache]) -> None:
+    """Replace the process-wide cache (e.g. with an in-memory one); None turns it off."""
+    global _research_cache
+    with _research_cache_lock:
+        _research_cache = cache
+
+
+__all__ = [
+    "RESEARCH_CACHE_FRESH_SECONDS",
+    "RESEARCH_CACHE_STALE_SECONDS",
+    "RESEARCH_CACHE_MIN_TOPIC_SIMILARITY",
+    "research_topic_key",
+    "topic_similarity",
+    "ResearchCache",
+    "format_research_cache_hit",
+    "get_research_cache",
+    "set_research_cache",
+]
@@ -0,0 +1,343 @@
+"""
+Process-wide rate limiting, retries and circuit breaking for the Azure OpenAI
+and Exa calls.
+
+Every request to a provider goes through that provider's `ProviderGuard`:
+
+  - a token bucket caps the request rate (callers wait for a token instead of
+    collecting 429s); the bucket is shared by all threads and event loops
+  - rate-limit (429), server (5xx) and connection errors are retried with
+    exponential backoff and full jitter, honouring Retry-After when present
+  - a circuit breaker opens after consecutive calls have failed with their
+    retries exhausted (a retried attempt is not a failure yet) and rejects calls with
+    `CircuitOpenError` until a cool-down has passed, so callers fail fast
+    while a provider is down instead of each waiting out its own timeout;
+    one trial call then decides whether it closes again
+
+The guards sit at the transport level: `clients.py` routes the Exa clients
+through them and builds the guarded HTTP clients agent_nodes.get_model hands
+the Azure model (with the SDK's own retries off).
+`resilience_metrics()` reports each guard's state and counters.
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Sustained requests per second and burst size per provider
+AZURE_RATE_LIMIT_PER_SECOND = float(os.getenv("AZURE_RATE_LIMIT_PER_SECOND", "8"))
+AZURE_RATE_LIMIT_BURST = int(os.getenv("AZURE_RATE_LIMIT_BURST", "16"))
+EXA_RATE_LIMIT_PER_SECOND = float(os.getenv("EXA_RATE_LIMIT_PER_SECOND", "5"))
+EXA_RATE_LIMIT_BURST = int(os.getenv("EXA_RATE_LIMIT_BURST", "10"))
+
+# Attempts per call (first try included) and the backoff bounds in seconds
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "20"))
+
+# Consecutive calls that fail after all their attempts open the breaker, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+# exa_py reports HTTP errors as ValueError("Request failed with status code N: ...")
+_STATUS_IN_MESSAGE_RE = re.compile(r"status code (\d{3})")
+_TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, httpx.TransportError, ConnectionError, TimeoutError)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+# ─────── Token bucket ──────────────────────────────────────────────────────────────
+class TokenBucket:
+    """Thread-safe token bucket; `reserve` takes a token and returns how long to wait for it."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Tokens may go negative: later callers queue up behind earlier reservations
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def available(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return round(min(self.burst, self._tokens + elapsed * self.rate), 2)
+
+
+# ─────── Circuit breaker ───────────────────────────────────────────────────────────
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failed calls -> half-open after `reset_seconds`."""
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self, provider: str) -> None:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            if self.state != "closed":
+                raise CircuitOpenError(f"{provider} circuit is {self.state}; failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+# ─────── Retry classification ──────────────────────────────────────────────────────
+def _retry_after(headers: Any) -> Optional[float]:
+    try:
+        return float(headers.get("retry-after")) if headers is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_exception(exc: BaseException) -> tuple:
+    """(retryable, retry_after seconds or None) for an exception raised by a provider call."""
+    if isinstance(exc, CircuitOpenError):
+        return False, None
+    status = getattr(exc, "status_code", None)
+    if status is None and isinstance(exc, ValueError):
+        match = _STATUS_IN_MESSAGE_RE.search(str(exc))
+        status = int(match.group(1)) if match else None
+    if status is not None:
+        response = getattr(exc, "response", None)
+        return status in RETRYABLE_STATUS, _retry_after(getattr(response, "headers", None))
+    return isinstance(exc, _TRANSIENT_ERRORS), None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff for the given (1-based) failed attempt."""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, RETRY_MAX_DELAY))
+    return delay
+
+
+# ─────── Provider guard ────────────────────────────────────────────────────────────
+class ProviderGuard:
+    """Rate limit, retry and circuit-break the calls to one provider.
+
+    `call`/`acall` run `fn` and retry on retryable exceptions. A result with a
+    retryable `status_code` (an HTTP response) is retried too; the last such
+    response is returned rather than raised, so the caller's own error handling
+    still sees it.
+    """
+
+    def __init__(self, name: str, bucket: TokenBucket, breaker: CircuitBreaker, max_attempts: int = RETRY_MAX_ATTEMPTS):
+        self.name = name
+        self.bucket = bucket
+        self.breaker = breaker
+        self.max_attempts = max(1, max_attempts)
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, **amounts: float) -> None:
+        with self._lock:
+            self.counters.update(amounts)
+
+    def _before_attempt(self, attempt: int) -> float:
+        # The breaker admits calls, not attempts: a call's retries (a half-open trial's
+        # included) go ahead unless other calls have opened the breaker in the meantime
+        try:
+            if attempt == 1:
+                self.breaker.before_call(self.name)
+            elif self.breaker.state == "open":
+                raise CircuitOpenError(f"{self.name} circuit opened during retries; failing fast")
+        except CircuitOpenError:
+            self._count(rejected=1)
+            raise
+        wait = self.bucket.reserve()
+        self._count(attempts=1, throttled=int(wait > 0), throttle_seconds=wait)
+        return wait
+
+    def _failed(self, attempt: int, retry_after: Optional[float]) -> Optional[float]:
+        """Record a failed attempt; returns the backoff before the next one, or None when out of attempts."""
+        self._count(failures=1)
+        if attempt >= self.max_attempts:
+            # Only a call that has used up its retries counts against the breaker
+            self.breaker.record_failure()
+            self._count(exhausted=1)
+            return None
+        self._count(retries=1)
+        return backoff_delay(attempt, retry_after)
+
+    def _succeeded(self) -> None:
+        self.breaker.record_success()
+        self._count(successes=1)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self._count(calls=1)
+        for attempt in range(1, self.max_attempts + 1):
+            time.sleep(self._before_attempt(attempt))
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                retryable, retry_after = classify_exception(exc)
+                if not retryable:
+                    # The provider answered; a client-side error says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                delay = self._failed(attempt, retry_after)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            if getattr(result, "status_code", None) in RETRYABLE_STATUS:
+                delay = self._failed(attempt, _retry_after(getattr(result, "headers", None)))
+                if delay is None:
+                    return result
+                result.close()
+                time.sleep(delay)
+                continue
+            self._succeeded()
+            return result
+
+    async def acall(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self._count(calls=1)
+        for attempt in range(1, self.max_attempts + 1):
+            await asyncio.sleep(self._before_attempt(attempt))
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as exc:
+                retryable, retry_after = classify_exception(exc)
+                if not retryable:
+                    # The provider answered; a client-side error says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                delay = self._failed(attempt, retry_after)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            if getattr(result, "status_code", None) in RETRYABLE_STATUS:
+                delay = self._failed(attempt, _retry_after(getattr(result, "headers", None)))
+                if delay is None:
+                    return result
+                await result.aclose()
+                await asyncio.sleep(delay)
+                continue
+            self._succeeded()
+            return result
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "times_opened": self.breaker.times_opened,
+            "tokens_available": self.bucket.available(),
+            **{key: counters.get(key, 0) for key in ("calls", "attempts", "successes", "retries", "failures", "exhausted", "rejected", "throttled")},
+            "throttle_seconds": round(counters.get("throttle_seconds", 0.0), 3),
+        }
+
+
+# ─────── Guarded HTTP transports ───────────────────────────────────────────────────
+class GuardedTransport(httpx.BaseTransport):
+    """httpx transport that sends every request through a ProviderGuard."""
+
+    def __init__(self, guard: ProviderGuard, transport: Optional[httpx.BaseTransport] = None):
+        self.guard = guard
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.guard.call(self.transport.handle_request, request)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncGuardedTransport(httpx.AsyncBaseTransport):
+    """Async `GuardedTransport`."""
+
+    def __init__(self, guard: ProviderGuard, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.guard = guard
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.guard.acall(self.transport.handle_async_request, request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+# ─────── Shared guards ─────────────────────────────────────────────────────────────
+_guards: Dict[str, ProviderGuard] = {
+    "azure_openai": ProviderGuard(
+        "azure_openai",
+        TokenBucket(AZURE_RATE_LIMIT_PER_SECOND, AZURE_RATE_LIMIT_BURST),
+        CircuitBreaker(),
+    ),
+    "exa": ProviderGuard(
+        "exa",
+        TokenBucket(EXA_RATE_LIMIT_PER_SECOND, EXA_RATE_LIMIT_BURST),
+        CircuitBreaker(),
+    ),
+}
+
+
+def get_guard(provider: str) -> ProviderGuard:
+    return _guards[provider]
+
+
+def resilience_metrics() -> Dict[str, Dict[str, Any]]:
+    return {name: guard.metrics() for name, guard in _guards.items()}
+
+
+__all__ = [
+    "CircuitOpenError",
+    "TokenBucket",
+    "CircuitBreaker",
+    "ProviderGuard",
+    "GuardedTransport",
+    "AsyncGuardedTransport",
+    "classify_exception",
+    "get_guard",
+    "resilience_metrics",
+]
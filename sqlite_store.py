@@ -0,0 +1,233 @@
+"""
+Durable SQLite-backed `BaseStore` for profile, topic and summary memories.
+
+Drop-in replacement for `InMemoryStore`: items live on disk in a WAL-mode
+database with a `(namespace, key)` primary key, so memory stays flat as users
+accumulate and nothing is lost on restart. Each thread gets its own
+connection (WAL lets readers proceed while a write is in flight) and writes
+from a single `batch` call are applied in one transaction.
+
+Semantic search and TTLs are not supported: a `SearchOp` with a `query` or a
+`PutOp` with a `ttl` raises `ValueError` instead of being silently served as a
+plain filter search or stored without expiry.
+"""
+
+import os
+import json
+import asyncio
+import contextlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from langgraph.store.base import (
+    BaseStore,
+    GetOp,
+    Item,
+    ListNamespacesOp,
+    MatchCondition,
+    Op,
+    PutOp,
+    Result,
+    SearchItem,
+    SearchOp,
+)
+
+load_dotenv()
+
+STORE_PATH = os.getenv("STORE_PATH", os.path.join("data", "store.sqlite"))
+
+# Namespace tuples are stored as one string joined on the ASCII unit separator,
+# which sorts below every printable character so prefix scans stay on the index.
+NAMESPACE_SEP = "\x1f"
+
+
+def encode_namespace(namespace: Tuple[str, ...]) -> str:
+    return NAMESPACE_SEP.join(namespace)
+
+
+def decode_namespace(encoded: str) -> Tuple[str, ...]:
+    return tuple(encoded.split(NAMESPACE_SEP)) if encoded else ()
+
+
+def matches_filter(value: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    if not filter:
+        return True
+    for field, expected in filter.items():
+        actual = value.get(field)
+        if isinstance(expected, dict) and any(k.startswith("$") for k in expected):
+            for operator, operand in expected.items():
+                try:
+                    ok = {
+                        "$eq": lambda: actual == operand,
+                        "$ne": lambda: actual != operand,
+                        "$gt": lambda: actual > operand,
+                        "$gte": lambda: actual >= operand,
+                        "$lt": lambda: actual < operand,
+                        "$lte": lambda: actual <= operand,
+                    }[operator]()
+                except (KeyError, TypeError):
+                    ok = False
+                if not ok:
+                    return False
+        elif actual != expected:
+            return False
+    return True
+
+
+def matches_condition(condition: MatchCondition, namespace: Tuple[str, ...]) -> bool:
+    path = condition.path
+    if len(namespace) < len(path):
+        return False
+    pairs = zip(namespace, path) if condition.match_type == "prefix" else zip(reversed(namespace), reversed(path))
+    return all(p == "*" or n == p for n, p in pairs)
+
+
+class SQLiteStore(BaseStore):
+    """`BaseStore` persisted to a WAL-mode SQLite database."""
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._memory_conn = None
+        if path == ":memory:":
+            # A private in-memory database only exists on the connection that created it
+            self._memory_conn = sqlite3.connect(path, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS store (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._memory_conn is not None:
+            return self._memory_conn
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── BaseStore interface ──────────────────────────────────────────────────────
+    def batch(self, ops: Iterable[Op]) -> List[Result]:
+        ops = list(ops)
+        # Checked up front so an unsupported op does not leave the batch half applied
+        for op in ops:
+            if isinstance(op, SearchOp) and op.query:
+                raise ValueError("SQLiteStore does not support semantic search; search without `query`")
+            if isinstance(op, PutOp) and op.ttl is not None:
+                raise ValueError("SQLiteStore does not support TTLs; put without `ttl`")
+        results: List[Result] = [None] * len(ops)
+        # Later puts to the same (namespace, key) win, as in InMemoryStore
+        puts: Dict[Tuple[Tuple[str, ...], str], PutOp] = {}
+
+        conn = self._connection()
+        lock = self._write_lock if self._memory_conn is not None else contextlib.nullcontext()
+        with lock:
+            for i, op in enumerate(ops):
+                if isinstance(op, GetOp):
+                    results[i] = self._get(conn, op)
+                elif isinstance(op, SearchOp):
+                    results[i] = self._search(conn, op)
+                elif isinstance(op, ListNamespacesOp):
+                    results[i] = self._list_namespaces(conn, op)
+                elif isinstance(op, PutOp):
+                    puts[(op.namespace, op.key)] = op
+                else:
+                    raise ValueError(f"Unknown operation type: {type(op)}")
+
+        if puts:
+            self._apply_puts(conn, list(puts.values()))
+        return results
+
+    async def abatch(self, ops: Iterable[Op]) -> List[Result]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.batch, list(ops))
+
+    # ── Operation handlers ───────────────────────────────────────────────────────
+    def _get(self, conn: sqlite3.Connection, op: GetOp) -> Optional[Item]:
+        row = conn.execute(
+            "SELECT namespace, key, value, created_at, updated_at FROM store WHERE namespace = ? AND key = ?",
+            (encode_namespace(op.namespace), op.key)
+        ).fetchone()
+        return self._row_to_item(row, Item) if row else None
+
+    def _search(self, conn: sqlite3.Connection, op: SearchOp) -> List[SearchItem]:
+        prefix = encode_namespace(op.namespace_prefix)
+        sql = "SELECT namespace, key, value, created_at, updated_at FROM store"
+        params: List[Any] = []
+        if prefix:
+            # Exact namespace or any child namespace, as an index range scan
+            sql += " WHERE (namespace = ? OR (namespace >= ? AND namespace < ?))"
+            params += [prefix, prefix + NAMESPACE_SEP, prefix + chr(ord(NAMESPACE_SEP) + 1)]
+        sql += " ORDER BY rowid"
+        if not op.filter:
+            sql += " LIMIT ? OFFSET ?"
+            params += [op.limit, op.offset]
+            return [self._row_to_item(row, SearchItem) for row in conn.execute(sql, params)]
+
+        items = [
+            self._row_to_item(row, SearchItem)
+            for row in conn.execute(sql, params)
+        ]
+        items = [item for item in items if matches_filter(item.value, op.filter)]
+        return items[op.offset:op.offset + op.limit]
+
+    def _list_namespaces(self, conn: sqlite3.Connection, op: ListNamespacesOp) -> List[Tuple[str, ...]]:
+        namespaces = set()
+        for (encoded,) in conn.execute("SELECT DISTINCT namespace FROM store"):
+            namespace = decode_namespace(encoded)
+            if op.match_conditions and not all(matches_condition(c, namespace) for c in op.match_conditions):
+                continue
+            if op.max_depth is not None:
+                namespace = namespace[:op.max_depth]
+            namespaces.add(namespace)
+        return sorted(namespaces)[op.offset:op.offset + op.limit]
+
+    def _apply_puts(self, conn: sqlite3.Connection, puts: List[PutOp]) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        deletes = [(encode_namespace(op.namespace), op.key) for op in puts if op.value is None]
+        upserts = [
+            (encode_namespace(op.namespace), op.key, json.dumps(op.value), now, now)
+            for op in puts if op.value is not None
+        ]
+        with self._write_lock:
+            with conn:
+                if deletes:
+                    conn.executemany("DELETE FROM store WHERE namespace = ? AND key = ?", deletes)
+                if upserts:
+                    conn.executemany(
+                        """INSERT INTO store (namespace, key, value, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at""",
+                        upserts
+                    )
+
+    @staticmethod
+    def _row_to_item(row: tuple, item_cls: type):
+        namespace, key, value, created_at, updated_at = row
+        return item_cls(
+            namespace=decode_namespace(namespace),
+            key=key,
+            value=json.loads(value),
+            created_at=datetime.fromisoformat(created_at),
+            updated_at=datetime.fromisoformat(updated_at),
+        )
+
+
+__all__ = ["SQLiteStore"]
@@ -1,12 +1,18 @@
 import streamlit as st
 import uuid
+import time
+import altair as alt
+import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Any
 
 from langchain_core.messages import HumanMessage
 
-from agent import enhanced_graph, InMemoryStore, MemorySaver, RunnableConfig
-from agent_nodes import post_to_linkedin, update_profile
+from agent import get_enhanced_graph, InMemoryStore, MemorySaver, RunnableConfig
+from agent_nodes import CONTENT_MODE, post_to_linkedin, update_profile
+from article_prefetch import prefetch_stats
+from resilience import resilience_metrics
+from tracing import TRACE_FILE, get_trace, export_trace, trace_to_jsonl
 
 # 
 # --- Page Configuration ---
@@ -17,11 +23,23 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# --- Shared Resources ---
+# Built once per server process and reused across reruns and sessions
+@st.cache_resource
+def load_graph():
+    return get_enhanced_graph()
+
+enhanced_graph = load_graph()
+
 # --- Session State Initialization ---
 if "thread_id" not in st.session_state:
     st.session_state.thread_id = str(uuid.uuid4())
 if "user_id" not in st.session_state:
     st.session_state.user_id = None
+if "trace_id" not in st.session_state:
+    st.session_state.trace_id = None
+if "content_mode" not in st.session_state:
+    st.session_state.content_mode = CONTENT_MODE
 if "store" not in st.session_state:
     st.session_state.store = enhanced_graph.store
     st.session_state.saver = MemorySaver()
@@ -30,14 +48,41 @@ if "store" not in st.session_state:
 
 graph = enhanced_graph
 
+# Nodes of the content flow in execution order; drives the progress bar
+CONTENT_FLOW_NODES = [
+    "master_node",
+    "generate_topic",
+    "select_single_topic",
+    "research_articles",
+    "analyze_competitor_content",
+    "collect_research",
+    "create_linkedin_content_with_articles",
+    "optimize_linkedin_content",
+]
+# Fast mode drafts and optimizes in a single node
+FAST_CONTENT_FLOW_NODES = CONTENT_FLOW_NODES[:-2] + ["create_optimized_linkedin_content"]
+# Nodes whose LLM output is streamed token by token, and the workflow_data key it ends up in
+STREAMED_NODES = {
+    "create_linkedin_content_with_articles": ("✍️ Draft Content", "content_draft"),
+    "optimize_linkedin_content": ("✨ Optimized Content", "optimized_content"),
+    "create_optimized_linkedin_content": ("✨ Optimized Content", "optimized_content"),
+}
+STREAM_REFRESH_SECONDS = 0.1
+
 def get_config() -> RunnableConfig:
     return {
         "configurable": {
             "thread_id": st.session_state.thread_id,
-            "user_id": st.session_state.user_id
+            "user_id": st.session_state.user_id,
+            "trace_id": st.session_state.trace_id,
+            "content_mode": st.session_state.content_mode
         }
     }
 
+def start_trace():
+    # Each action gets its own trace so the Analytics waterfall shows one run
+    st.session_state.trace_id = str(uuid.uuid4())
+
 def add_to_log(message: str, msg_type: str = "info"):
     st.session_state.status_log.append({
         "time": datetime.now().strftime("%H:%M:%S"),
@@ -61,32 +106,68 @@ def display_log():
         fn = mapping.get(entry["type"], st.info)
         fn(f"[{entry['time']}] {entry['text']}")
 
-def stream_workflow(messages: List[HumanMessage], action: str):
+def content_flow_nodes() -> List[str]:
+    return FAST_CONTENT_FLOW_NODES if st.session_state.content_mode == "fast" else CONTENT_FLOW_NODES
+
+def stream_workflow(messages: List[HumanMessage], action: str, expected_nodes: List[str] = None):
+    expected_nodes = expected_nodes or content_flow_nodes()
+    start_trace()
     cfg = get_config()
     try:
         add_to_log(f"▶️ {action} started")
-        with st.spinner(f"{action}..."):
-            prog = st.progress(0)
-            step = 0
-            for chunk in graph.stream({"messages": messages}, cfg, stream_mode="values"):
-                step += 1
-                prog.progress(min(step * 10, 100))
-                for m in chunk.get("messages", []):
-                    add_to_log(m.content)
+        prog = st.progress(0, text=f"{action}: starting…")
+        live = {}
+        done = []
+        for mode, chunk in graph.stream({"messages": messages}, cfg, stream_mode=["updates", "messages"]):
+            if mode == "messages":
+                # Token chunks from the drafting/optimizing LLM calls, rendered as they arrive
+                token, metadata = chunk
+                node = metadata.get("langgraph_node")
+                if node not in STREAMED_NODES or not token.content:
+                    continue
+                if node not in live:
+                    label = STREAMED_NODES[node][0]
+                    live[node] = {"box": st.expander(f"{label} (streaming)", expanded=True).empty(), "text": "", "shown": 0.0}
+                view = live[node]
+                view["text"] += token.content
+                if time.monotonic() - view["shown"] >= STREAM_REFRESH_SECONDS:
+                    render_stream(node, view)
+                continue
+
+            for node, update in chunk.items():
+                done.append(node)
+                finished = len(set(done) & set(expected_nodes))
+                prog.progress(min(finished / len(expected_nodes), 1.0), text=f"{action}: {node} done")
+                if node in live:
+                    render_stream(node, live[node])
+                for m in (update or {}).get("messages", []):
+                    content = getattr(m, "content", m)
+                    if isinstance(content, str) and content:
+                        add_to_log(content, "warning" if content.startswith("⚠️") else "info")
                 for key in [
                     "temporary_topics", "final_topics", "selected_topic",
-                    "fetched_articles", "good_articles", "competitor_insights",
+                    "fetched_articles", "unique_articles", "duplicate_articles",
+                    "prefilter_stats", "evaluated_articles", "good_articles", "competitor_insights",
                     "content_draft", "optimized_content", "approved_for_posting",
                     "posted_content_id"
                 ]:
-                    if key in chunk:
-                        st.session_state.workflow_data[key] = chunk[key]
+                    if key in (update or {}):
+                        st.session_state.workflow_data[key] = update[key]
                         add_to_log(f"{key} updated", "success")
-            prog.progress(100)
+        prog.progress(1.0, text=f"{action}: complete")
+        # The finished draft and optimized text are shown under Workflow Results
+        for view in live.values():
+            view["box"].empty()
         add_to_log(f"✅ {action} completed", "success")
     except Exception as e:
         add_to_log(f"❌ {action} error: {e}", "error")
         st.error(f"{action} failed: {e}")
+
+def render_stream(node: str, view: Dict[str, Any]):
+    # Plain markdown rather than a widget: replacing it keeps no widget state between refreshes
+    view["box"].markdown(view["text"])
+    view["shown"] = time.monotonic()
+
 def reset_topics():
     # 1. Clear UI workflow data
     st.session_state.workflow_data.clear()
@@ -139,6 +220,7 @@ if st.sidebar.button("🔄 Update Profile", use_container_width=True):
             
             # Prepare the input for the graph
             profile_input = [HumanMessage(content=profile_text)]
+            start_trace()
             config = get_config()
 
             # Stream the graph directly
@@ -167,6 +249,12 @@ if st.sidebar.button("🔄 Update Profile", use_container_width=True):
 
 
 # Content Generation
+fast_mode = st.sidebar.checkbox(
+    "⚡ Fast mode (single-call draft + optimize)",
+    value=st.session_state.content_mode == "fast",
+    help="Write the optimized post in one LLM call instead of drafting and then optimizing it."
+)
+st.session_state.content_mode = "fast" if fast_mode else "standard"
 if st.sidebar.button("📝 Generate Topics & Create Content", use_container_width=True):
     stream_workflow(
         [HumanMessage(content="Generate topics and create LinkedIn content with article research")],
@@ -245,7 +333,12 @@ with tabs[0]:
                     for a in arts:
                         st.write(f"- {getattr(a, 'title', '<no title>')}")
                     good = data.get("good_articles", [])
-                    st.write(f"👍 Good: {len(good)} / {len(arts)}")
+                    unique = data.get("unique_articles", arts)
+                    st.write(f"🧹 Unique: {len(unique)} / {len(arts)}")
+                    st.write(f"👍 Good: {len(good)} / {len(unique)}")
+                    evaluated = data.get("evaluated_articles", [])
+                    if skipped := sum(1 for e in evaluated if e.get("evaluation") == "skipped"):
+                        st.write(f"⏭️ Skipped after enough good articles: {skipped}")
 
             if draft := data.get("content_draft"):
                 with st.expander("✍️ Draft Content", expanded=True):
@@ -276,9 +369,60 @@ with tabs[0]:
             total, good = len(arts), len(st.session_state.workflow_data.get("good_articles", []))
             rate = f"{good/total*100:.1f}%" if total else "N/A"
             st.metric("Articles Analyzed", total)
+            dupes = st.session_state.workflow_data.get("duplicate_articles", [])
+            pre = st.session_state.workflow_data.get("prefilter_stats", {})
+            local = pre.get("local_good", 0) + pre.get("local_bad", 0) - pre.get("audited", 0)
+            evaluated = st.session_state.workflow_data.get("evaluated_articles", [])
+            skipped = sum(1 for e in evaluated if e.get("evaluation") == "skipped")
+            if saved := len(dupes) + local + skipped:
+                st.metric("Evaluation Calls Saved", saved)
+            if pre.get("agreement_rate") is not None:
+                st.metric("Pre-filter Agreement", f"{pre['agreement_rate']*100:.0f}%")
             st.metric("High-Quality", good)
             st.metric("Quality Rate", rate)
 
+        if st.session_state.trace_id and (trace := get_trace(st.session_state.trace_id)):
+            st.divider()
+            st.markdown("**⏱️ Last Run Waterfall**")
+            waterfall = pd.DataFrame(trace.waterfall())
+            if not waterfall.empty:
+                st.altair_chart(
+                    alt.Chart(waterfall).mark_bar().encode(
+                        x=alt.X("start_s:Q", title="seconds"),
+                        x2="end_s:Q",
+                        y=alt.Y("node:N", sort=None, title=None),
+                        tooltip=["node", "start_s", "end_s"]
+                    ),
+                    use_container_width=True
+                )
+            summary = pd.DataFrame(trace.node_summary())
+            if not summary.empty:
+                st.metric("Total LLM Calls", int(summary["llm_calls"].sum()))
+                st.metric("Total Tokens", int(summary["prompt_tokens"].sum() + summary["completion_tokens"].sum()))
+                st.dataframe(summary, hide_index=True, use_container_width=True)
+            st.download_button(
+                "⬇️ Download Trace (JSONL)",
+                trace_to_jsonl(st.session_state.trace_id),
+                file_name=f"trace-{st.session_state.trace_id[:8]}.jsonl",
+                mime="application/jsonl",
+                use_container_width=True
+            )
+            if st.button("💾 Export Trace to File", use_container_width=True):
+                count = export_trace(st.session_state.trace_id, TRACE_FILE)
+                st.success(f"Wrote {count} spans to {TRACE_FILE}")
+
+        st.divider()
+        st.markdown("**🛡️ Provider Health**")
+        health = pd.DataFrame([{"provider": name, **m} for name, m in resilience_metrics().items()])
+        st.dataframe(health, hide_index=True, use_container_width=True)
+        prefetch = prefetch_stats.totals()
+        if prefetch["runs"]:
+            st.metric(
+                "⚡ Prefetch Hit Rate",
+                f"{prefetch['hit_rate']*100:.0f}%",
+                help=f"{prefetch['wasted_searches']}/{prefetch['searches']} speculative searches spent on other topics"
+            )
+
 with tabs[1]:
     st.subheader("👤 Stored Profile Data")
     namespace = ("profile", st.session_state.user_id)
@@ -0,0 +1,100 @@
+"""
+Small, dependency-free text helpers: a local token estimator, sentence and word
+splitting, plural folding, word shingles and set-overlap similarity.
+"""
+
+import re
+from typing import Iterable, List, Set
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)?")
+_TOKEN_PIECE_RE = re.compile(r"[A-Za-z]+|[0-9]+|[^\sA-Za-z0-9]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9])|\n+")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her here
+hers herself him himself his how i if in into is it its itself just me more most my myself no nor not now of
+off on once only or other our ours ourselves out over own same she should so some such than that the their
+theirs them themselves then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+# (suffix, replacement) pairs tried in order by `stem`; the ones mapping to themselves
+# keep singular words such as "business", "analysis", "status", "news" and "SaaS" intact
+_STEM_RULES = (
+    ("sses", "ss"), ("ss", "ss"), ("is", "is"), ("us", "us"), ("news", "news"), ("aas", "aas"),
+    ("ies", "y"), ("s", ""),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of BPE tokens in `text` without a tokenizer.
+
+    Words of up to six letters usually map to one token and longer ones to
+    about one per four characters; digits group in threes and punctuation is
+    a token of its own. Close enough on English prose to size a prompt budget,
+    without downloading a tokenizer vocabulary.
+    """
+    if not text:
+        return 0
+    count = 0
+    for piece in _TOKEN_PIECE_RE.findall(text):
+        if piece.isalpha():
+            count += 1 if len(piece) <= 6 else (len(piece) + 3) // 4
+        elif piece.isdigit():
+            count += (len(piece) + 2) // 3
+        else:
+            count += 1
+    return count
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if s and s.strip()]
+
+
+def words(text: str) -> List[str]:
+    return [w.lower() for w in _WORD_RE.findall(text or "")]
+
+
+def content_words(text: str) -> List[str]:
+    """Lowercased words with stop words and one- and two-letter words removed."""
+    return [w for w in words(text) if len(w) > 2 and w not in STOP_WORDS]
+
+
+def stem(word: str) -> str:
+    """Fold plurals to the singular so "strategies" meets "strategy" and "agents" meets "agent".
+
+    Deliberately conservative: verb and derivational suffixes are kept, since
+    "leading" is not "lead" and "generators" is not "generation" in a topic.
+    A stem always keeps at least three letters.
+    """
+    for suffix, replacement in _STEM_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= 3:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def jaccard(a: Set, b: Set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def shingles(tokens: Iterable[str], size: int = 3) -> Set[str]:
+    """Overlapping `size`-word sequences; a text shorter than `size` words is one shingle."""
+    tokens = list(tokens)
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+__all__ = [
+    "STOP_WORDS",
+    "estimate_tokens",
+    "split_sentences",
+    "words",
+    "content_words",
+    "stem",
+    "jaccard",
+    "shingles",
+]
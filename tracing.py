@@ -0,0 +1,294 @@
+"""
+Per-run tracing of graph nodes, LLM calls and Exa calls.
+
+Every node registered in agent.py is wrapped with `traced_node`, which opens a
+node span and makes it the parent for the LLM and Exa calls made inside it.
+LLM spans (wall time, prompt/completion tokens as reported by the API, plus a
+local prompt-size estimate) come from `llm_trace_handler`, a LangChain callback
+attached to the model; Exa spans are recorded by the search helpers and
+budgeted-prompt spans by prompt_budget.py, both via `record_external_call`.
+
+Spans are kept in memory per trace (the `trace_id` from the run config, or the
+thread_id) for the Streamlit Analytics panel, and can be written out as
+JSON lines with `export_trace`. Setting TRACE_EXPORT_PATH also appends every
+span to that file as it finishes.
+"""
+
+import os
+import json
+import time
+import uuid
+import inspect
+import functools
+import threading
+import contextvars
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+
+from text_utils import estimate_tokens
+
+load_dotenv()
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+TRACE_FILE = TRACE_EXPORT_PATH or os.path.join("data", "traces.jsonl")
+TRACE_MAX_RUNS = int(os.getenv("TRACE_MAX_RUNS", "100"))
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+_current_node: contextvars.ContextVar = contextvars.ContextVar("current_node", default=None)
+
+
+class RunTrace:
+    """Spans collected for one run of the graph."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_span(self, span: Dict[str, Any]) -> None:
+        span = {"trace_id": self.trace_id, "span_id": uuid.uuid4().hex[:16], **span}
+        with self._lock:
+            self.spans.append(span)
+        if TRACE_EXPORT_PATH:
+            _append_jsonl(TRACE_EXPORT_PATH, [span])
+
+    def node_summary(self) -> List[Dict[str, Any]]:
+        """Wall time, LLM/Exa call counts and token totals per node, in execution order."""
+        with self._lock:
+            spans = list(self.spans)
+        summary: Dict[str, Dict[str, Any]] = OrderedDict()
+        for span in sorted(spans, key=lambda s: s["start"]):
+            node = span.get("node") or span["name"]
+            row = summary.setdefault(node, defaultdict(float, node=node))
+            if span["kind"] == "node":
+                row["wall_s"] += span["duration_s"]
+            elif span["kind"] == "llm":
+                row["llm_calls"] += 1
+                row["prompt_tokens"] += span.get("prompt_tokens") or 0
+                row["completion_tokens"] += span.get("completion_tokens") or 0
+                row["est_prompt_tokens"] += span.get("est_prompt_tokens") or 0
+            elif span["kind"] == "exa":
+                # Responses served by the Exa cache never reached Exa
+                row["exa_cache_hits" if span.get("status") == "cache_hit" else "exa_calls"] += 1
+        return [
+            {
+                "node": row["node"],
+                "wall_s": round(row["wall_s"], 3),
+                "llm_calls": int(row["llm_calls"]),
+                "exa_calls": int(row["exa_calls"]),
+                "exa_cache_hits": int(row["exa_cache_hits"]),
+                "prompt_tokens": int(row["prompt_tokens"]),
+                "completion_tokens": int(row["completion_tokens"]),
+                "est_prompt_tokens": int(row["est_prompt_tokens"]),
+            }
+            for row in summary.values()
+        ]
+
+    def waterfall(self) -> List[Dict[str, Any]]:
+        """Node spans as offsets from the start of the run, for charting."""
+        with self._lock:
+            nodes = [s for s in self.spans if s["kind"] == "node"]
+        if not nodes:
+            return []
+        origin = min(s["start"] for s in nodes)
+        return [
+            {"node": s["name"], "start_s": round(s["start"] - origin, 3), "end_s": round(s["end"] - origin, 3)}
+            for s in sorted(nodes, key=lambda s: s["start"])
+        ]
+
+
+# ─────── Trace registry ────────────────────────────────────────────────────────────
+_traces: "OrderedDict[str, RunTrace]" = OrderedDict()
+_traces_lock = threading.Lock()
+
+
+def get_trace(trace_id: str) -> Optional[RunTrace]:
+    with _traces_lock:
+        return _traces.get(trace_id)
+
+
+def _get_or_create_trace(trace_id: str) -> RunTrace:
+    with _traces_lock:
+        trace = _traces.get(trace_id)
+        if trace is None:
+            trace = _traces[trace_id] = RunTrace(trace_id)
+            while len(_traces) > TRACE_MAX_RUNS:
+                _traces.popitem(last=False)
+        return trace
+
+
+def _append_jsonl(path: str, spans: List[Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for span in spans:
+            f.write(json.dumps(span, default=str) + "\n")
+
+
+def trace_spans(trace_id: str) -> List[Dict[str, Any]]:
+    trace = get_trace(trace_id)
+    if trace is None:
+        return []
+    with trace._lock:
+        return sorted(trace.spans, key=lambda s: s["start"])
+
+
+def trace_to_jsonl(trace_id: str) -> str:
+    return "".join(json.dumps(span, default=str) + "\n" for span in trace_spans(trace_id))
+
+
+def export_trace(trace_id: str, path: str) -> int:
+    """Append a run's spans to `path` as JSON lines; returns the number of spans written."""
+    spans = trace_spans(trace_id)
+    if spans:
+        _append_jsonl(path, spans)
+    return len(spans)
+
+
+# ─────── Node instrumentation ──────────────────────────────────────────────────────
+def traced_node(name: str, fn: Callable) -> Callable:
+    """Wrap a graph node (sync or async) so its wall time and the calls it makes are recorded."""
+
+    def start_span(config):
+        configurable = config.get("configurable", {})
+        trace_id = configurable.get("trace_id") or configurable.get("thread_id") or "default"
+        trace = _get_or_create_trace(trace_id)
+        tokens = (_current_trace.set(trace), _current_node.set(name))
+        return trace, tokens, time.time(), time.perf_counter()
+
+    def end_span(trace, tokens, start, t0, status):
+        duration = time.perf_counter() - t0
+        trace.add_span({
+            "kind": "node",
+            "name": name,
+            "node": name,
+            "start": start,
+            "end": start + duration,
+            "duration_s": duration,
+            "status": status,
+        })
+        _current_node.reset(tokens[1])
+        _current_trace.reset(tokens[0])
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state, config, store):
+            span = start_span(config)
+            status = "ok"
+            try:
+                return await fn(state, config, store)
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                end_span(*span, status)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state, config, store):
+        span = start_span(config)
+        status = "ok"
+        try:
+            return fn(state, config, store)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            end_span(*span, status)
+
+    return wrapper
+
+
+def record_external_call(kind: str, name: str, start: float, duration_s: float, **attrs: Any) -> None:
+    """Record a call made inside the current node (no-op outside a traced node)."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    trace.add_span({
+        "kind": kind,
+        "name": name,
+        "node": _current_node.get(),
+        "start": start,
+        "end": start + duration_s,
+        "duration_s": duration_s,
+        **attrs,
+    })
+
+
+class LLMTraceHandler(BaseCallbackHandler):
+    """LangChain callback that records one span per chat model call."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._pending: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        # Local estimate, so every call has a prompt size even when the API reports no usage
+        est_prompt_tokens = sum(estimate_tokens(str(m.content)) for batch in messages for m in batch)
+        with self._lock:
+            self._pending[run_id] = (trace, _current_node.get(), time.time(), time.perf_counter(), est_prompt_tokens)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, "ok", usage_from_result(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "error", {})
+
+    def _finish(self, run_id, status: str, usage: Dict[str, int]) -> None:
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        trace, node, start, t0, est_prompt_tokens = pending
+        duration = time.perf_counter() - t0
+        trace.add_span({
+            "kind": "llm",
+            "name": "chat_model",
+            "node": node,
+            "start": start,
+            "end": start + duration,
+            "duration_s": duration,
+            "status": status,
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "est_prompt_tokens": est_prompt_tokens,
+        })
+
+
+def usage_from_result(response) -> Dict[str, int]:
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    if token_usage:
+        return {
+            "prompt_tokens": token_usage.get("prompt_tokens"),
+            "completion_tokens": token_usage.get("completion_tokens"),
+        }
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {"prompt_tokens": usage.get("input_tokens"), "completion_tokens": usage.get("output_tokens")}
+    return {}
+
+
+llm_trace_handler = LLMTraceHandler()
+
+
+__all__ = [
+    "RunTrace",
+    "get_trace",
+    "trace_spans",
+    "trace_to_jsonl",
+    "export_trace",
+    "traced_node",
+    "record_external_call",
+    "llm_trace_handler",
+]